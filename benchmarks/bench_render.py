@@ -0,0 +1,90 @@
+# benchmarks/bench_render.py
+#
+# CPU cost of rendering a synthetic 20k-token streamed response.
+#   python -m benchmarks.bench_render --tokens 20000
+#
+# The naive renderer (Markdown(full_response) on every chunk, as the chat loop
+# used to do) is quadratic, so by default it only runs over a prefix of the
+# stream; use --naive-tokens to change that.
+
+import argparse
+import io
+import random
+import time
+
+from rich.console import Console
+from rich.live import Live
+from rich.markdown import Markdown
+
+from octo_cl.renderer import StreamRenderer
+
+WORDS = "the model streams tokens while octo renders markdown blocks for users".split()
+
+
+def synthetic_stream(tokens: int, seed: int = 0):
+    """Yields ~`tokens` chunks of prose, lists and fenced code."""
+    rng = random.Random(seed)
+    emitted = 0
+    while emitted < tokens:
+        kind = rng.random()
+        if kind < 0.6:
+            block = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))) + ".\n\n"
+        elif kind < 0.8:
+            block = "".join(f"- item {rng.choice(WORDS)} {i}\n" for i in range(rng.randint(3, 8))) + "\n"
+        else:
+            body = "".join(f"    value_{i} = compute({i})\n" for i in range(rng.randint(5, 20)))
+            block = f"```python\ndef handler():\n{body}```\n\n"
+        for i in range(0, len(block), 4):
+            yield block[i:i + 4]
+            emitted += 1
+            if emitted >= tokens:
+                return
+
+
+def make_console():
+    return Console(file=io.StringIO(), width=100, force_terminal=True)
+
+
+def bench_naive(tokens: int) -> float:
+    console = make_console()
+    start = time.perf_counter()
+    full = ""
+    with Live("", console=console, refresh_per_second=10) as live:
+        for chunk in synthetic_stream(tokens):
+            full += chunk
+            live.update(Markdown(full))
+    return time.perf_counter() - start
+
+
+def bench_renderer(tokens: int, plain: bool) -> float:
+    console = make_console()
+    start = time.perf_counter()
+    with StreamRenderer(console, plain=plain) as renderer:
+        for chunk in synthetic_stream(tokens):
+            renderer.feed(chunk)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--naive-tokens", type=int, default=3000)
+    args = parser.parse_args()
+
+    naive = bench_naive(args.naive_tokens)
+    incremental = bench_renderer(args.tokens, plain=False)
+    plain = bench_renderer(args.tokens, plain=True)
+    # A stream consumed with no rendering at all, to show the fixed per-chunk cost.
+    start = time.perf_counter()
+    for _ in synthetic_stream(args.tokens):
+        pass
+    baseline = time.perf_counter() - start
+
+    print(f"naive (first {args.naive_tokens:,} tokens): {naive * 1000:9.1f} ms")
+    print(f"incremental ({args.tokens:,} tokens)  : {incremental * 1000:9.1f} ms")
+    print(f"plain ({args.tokens:,} tokens)        : {plain * 1000:9.1f} ms")
+    print(f"stream only ({args.tokens:,} tokens)  : {baseline * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
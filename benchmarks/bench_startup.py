@@ -0,0 +1,107 @@
+# benchmarks/bench_startup.py
+#
+# CLI startup cost: module import time (via `python -X importtime`) and
+# wall-clock time from launching `octo` to the first prompt, against a fake
+# Ollama server and a synthetic project.
+#   python -m benchmarks.bench_startup --runs 5
+
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.bench_tree import make_tree
+from tests.fake_ollama import FakeOllamaServer
+
+READY_MARKER = "is ready"
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(module: str = "octo_cl.main") -> Dict[str, int]:
+    """Cumulative import time in microseconds of `module` and of each of its direct imports."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True)
+    children: Dict[str, int] = {}
+    for line in out.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if not m:
+            continue
+        # Children are listed before their parent, one level deeper.
+        depth, name, cumulative = len(m.group(3)), m.group(4), int(m.group(2))
+        if depth == 3:
+            children[name] = cumulative
+        elif depth == 1:
+            if name == module:
+                return {module: cumulative, **children}
+            children = {}
+    return {}
+
+
+def time_to_prompt(project: Path, ollama_url: str) -> float:
+    """Launches the chat command in `project` and returns seconds until the prompt is printed."""
+    repo_root = str(Path(__file__).resolve().parent.parent)
+    pythonpath = os.pathsep.join(filter(None, [repo_root, os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, PYTHONPATH=pythonpath, OLLAMA_URL=ollama_url, OCTO_MODEL="qwen2.5-coder:7b", TERM="dumb")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "from octo_cl.main import cli; cli()"],
+        cwd=project, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    output = []
+    for line in proc.stdout:
+        output.append(line)
+        if READY_MARKER in line:
+            elapsed = time.perf_counter() - start
+            break
+    else:
+        proc.wait()
+        raise RuntimeError("octo exited before showing the prompt:\n" + "".join(output))
+    proc.stdin.write("exit\n")
+    proc.stdin.close()
+    proc.wait(timeout=10)
+    return elapsed
+
+
+def summarize(label: str, samples: List[float]):
+    print(f"{label:28} median {statistics.median(samples) * 1000:7.1f} ms   min {min(samples) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--dirs", type=int, default=300)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--top", type=int, default=12, help="Slowest imports to list.")
+    args = parser.parse_args()
+
+    profile = import_profile()
+    print(f"import octo_cl.main: {profile.get('octo_cl.main', 0) / 1000:.1f} ms")
+    children = sorted(((us, name) for name, us in profile.items() if name != "octo_cl.main"), reverse=True)
+    for us, name in children[:args.top]:
+        print(f"  {name:30} {us / 1000:7.1f} ms")
+    print()
+
+    project = Path(tempfile.mkdtemp(prefix="octo-bench-startup-"))
+    try:
+        make_tree(project, args.dirs, args.files)
+        with FakeOllamaServer(tokens_per_second=0) as server:
+            cold, warm = [], []
+            for _ in range(args.runs):
+                shutil.rmtree(project / ".octo", ignore_errors=True)
+                cold.append(time_to_prompt(project, server.url))
+                warm.append(time_to_prompt(project, server.url))
+    finally:
+        shutil.rmtree(project)
+
+    summarize("time to prompt (cold cache)", cold)
+    summarize("time to prompt (warm cache)", warm)
+
+
+if __name__ == "__main__":
+    main()
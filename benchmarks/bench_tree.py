@@ -0,0 +1,60 @@
+# benchmarks/bench_tree.py
+#
+# Cold vs. warm ContextBuilder.get_directory_tree on a synthetic project.
+#   python -m benchmarks.bench_tree --dirs 2000 --files 50
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from octo_cl.context_builder import ContextBuilder
+
+
+def make_tree(root: Path, dirs: int, files_per_dir: int, fanout: int = 10):
+    """Creates `dirs` directories (fanout-ary tree) holding `files_per_dir` files each."""
+    (root / ".gitignore").write_text("*.log\nbuild/\n")
+    paths = [root]
+    for i in range(dirs):
+        parent = paths[i // fanout]
+        d = parent / f"d{i}"
+        d.mkdir()
+        paths.append(d)
+        for j in range(files_per_dir):
+            (d / f"f{j}.{'log' if j % 10 == 0 else 'py'}").touch()
+    (root / "build").mkdir()
+    (root / "build" / "artifact.o").touch()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dirs", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=50)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="octo-bench-tree-"))
+    try:
+        make_tree(root, args.dirs, args.files)
+        print(f"synthetic tree: {args.dirs} dirs x {args.files} files")
+
+        uncached, base = timed(lambda: ContextBuilder(str(root), use_cache=False).get_directory_tree())
+        cold, tree = timed(lambda: ContextBuilder(str(root)).get_directory_tree())
+        warm, warm_tree = timed(lambda: ContextBuilder(str(root)).get_directory_tree())
+        assert tree == base == warm_tree, "cached tree differs from a fresh walk"
+
+        print(f"uncached walk : {uncached * 1000:8.1f} ms")
+        print(f"cold (+save)  : {cold * 1000:8.1f} ms")
+        print(f"warm          : {warm * 1000:8.1f} ms  ({uncached / warm:.1f}x faster)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# benchmarks/run_all.py
+#
+# Offline benchmark suite: measures octo-cl's own overhead against a local
+# fake Ollama server, so results don't depend on model speed.
+#   python -m benchmarks.run_all                      # run and save results
+#   python -m benchmarks.run_all --compare latest     # ...and diff against the last saved run
+#
+# Results are written to benchmarks/results/<commit>-<timestamp>.json.
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from rich.console import Console
+
+import octo_cl.main as octo_main
+from benchmarks.bench_tree import make_tree
+from octo_cl.context_builder import ContextBuilder
+from octo_cl.llm_interface import OllamaClient
+from octo_cl.main import parse_tool_calls, process_ai_response
+from octo_cl.telemetry import SessionTelemetry
+from octo_cl.tool_parser import StreamingToolParser
+from octo_cl.tools import ToolRegistry
+from tests.fake_ollama import FakeOllamaServer
+
+RESULTS_DIR = Path(__file__).parent / "results"
+FIRST_WORD = "Looking"
+# Lower is better for every metric except throughput.
+HIGHER_IS_BETTER = {"parse_mb_per_s", "stream_parse_mb_per_s"}
+
+
+class FirstWriteClock(io.StringIO):
+    """Console file that remembers when the response's first word was written."""
+
+    def __init__(self):
+        super().__init__()
+        self.first_render: Optional[float] = None
+
+    def write(self, text):
+        if self.first_render is None and FIRST_WORD in text:
+            self.first_render = time.perf_counter()
+        return super().write(text)
+
+
+def scripted_response(words: int):
+    body = " ".join(f"word{i % 50}" for i in range(words))
+
+    def respond(messages):
+        if messages and messages[-1]["content"].startswith("Tool Result"):
+            return "The file defines `answer`. Done."
+        return f'{FIRST_WORD} at the code.\n\n{body}\n\n<tool_call:read_file path="app.py" />'
+    return respond
+
+
+def bench_end_to_end(words: int, rate: float, plain: bool) -> Dict[str, float]:
+    project = Path(tempfile.mkdtemp(prefix="octo-bench-e2e-"))
+    (project / "app.py").write_text("answer = 42\n")
+    clock = FirstWriteClock()
+    console = octo_main.console
+    octo_main.console = Console(file=clock, force_terminal=True, width=100)
+    try:
+        with FakeOllamaServer(scripted_response(words), tokens_per_second=rate) as server:
+            client = OllamaClient(server.url)
+            telemetry = SessionTelemetry()
+            messages = [{"role": "user", "content": "What does app.py do?"}]
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                process_ai_response(client, messages, ToolRegistry(root_dir=str(project)), plain=plain, telemetry=telemetry)
+            wall = time.perf_counter() - start
+            client.close()
+    finally:
+        octo_main.console = console
+        shutil.rmtree(project)
+
+    stats = telemetry.summary()
+    # The server's own streaming time is what a real model would cost; the rest is us.
+    return {
+        "wall_s": wall,
+        "client_overhead_s": wall - stats["eval_s"],
+        "first_render_s": (clock.first_render or start) - start,
+        "render_s": stats["render_s"],
+        "turns": stats["turns"],
+    }
+
+
+def bench_parse(megabytes: float) -> Dict[str, float]:
+    unit = "Some reasoning about the change. " * 30 + '<tool_call:read_file path="src/module.py" />\n'
+    text = unit * int(megabytes * 1024 * 1024 / len(unit))
+    size_mb = len(text) / (1024 * 1024)
+
+    start = time.perf_counter()
+    calls = parse_tool_calls(text)
+    whole = time.perf_counter() - start
+
+    parser = StreamingToolParser()
+    start = time.perf_counter()
+    for i in range(0, len(text), 16):
+        parser.feed(text[i:i + 16])
+    streamed = time.perf_counter() - start
+    assert len(calls) == len(parser.calls)
+    return {"parse_mb_per_s": size_mb / whole, "stream_parse_mb_per_s": size_mb / streamed}
+
+
+def bench_tree(dirs: int, files: int) -> Dict[str, float]:
+    root = Path(tempfile.mkdtemp(prefix="octo-bench-tree-"))
+    try:
+        make_tree(root, dirs, files)
+        start = time.perf_counter()
+        ContextBuilder(str(root)).get_directory_tree()
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        ContextBuilder(str(root)).get_directory_tree()
+        warm = time.perf_counter() - start
+    finally:
+        shutil.rmtree(root)
+    return {"tree_cold_s": cold, "tree_warm_s": warm}
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_baseline(compare: Optional[str]) -> Optional[dict]:
+    if not compare:
+        return None
+    if compare == "latest":
+        runs = sorted(RESULTS_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        if not runs:
+            return None
+        compare = str(runs[-1])
+    with open(compare) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, default=2000, help="Words in the scripted model response.")
+    parser.add_argument("--rate", type=float, default=400.0, help="Fake server tokens per second.")
+    parser.add_argument("--parse-mb", type=float, default=4.0)
+    parser.add_argument("--tree-dirs", type=int, default=500)
+    parser.add_argument("--tree-files", type=int, default=20)
+    parser.add_argument("--compare", help="Results file to compare against, or 'latest'.")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.compare)
+    results: Dict[str, float] = {}
+    for mode, plain in (("markdown", False), ("plain", True)):
+        for key, value in bench_end_to_end(args.words, args.rate, plain).items():
+            results[f"e2e_{mode}_{key}"] = value
+    results.update(bench_parse(args.parse_mb))
+    results.update(bench_tree(args.tree_dirs, args.tree_files))
+
+    record = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "params": vars(args),
+        "results": results,
+    }
+
+    old = baseline["results"] if baseline else {}
+    print(f"{'metric':36} {'value':>12}" + (f" {'baseline':>12} {'change':>8}" if baseline else ""))
+    for key, value in results.items():
+        line = f"{key:36} {value:12.4f}"
+        if key in old and old[key]:
+            change = (value - old[key]) / old[key] * 100
+            worse = change < 0 if key in HIGHER_IS_BETTER else change > 0
+            line += f" {old[key]:12.4f} {change:+7.1f}%{' !' if worse and abs(change) > 10 else ''}"
+        print(line)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{record['commit']}-{record['timestamp'].replace(':', '')}.json"
+        with open(path, "w") as f:
+            json.dump(record, f, indent=2)
+        print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
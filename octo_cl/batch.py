@@ -0,0 +1,229 @@
+# octo_cl/batch.py
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import pathspec
+
+from octo_cl.context_builder import ContextBuilder
+from octo_cl.history import HistoryManager
+from octo_cl.llm_interface import ERROR_PREFIX, OllamaClient
+from octo_cl.scheduler import ToolScheduler
+from octo_cl.telemetry import SessionTelemetry
+from octo_cl.tool_parser import StreamingToolParser
+from octo_cl.tools import ToolRegistry
+
+# Results with these statuses are not run again when a batch is resumed; tasks
+# that failed or ran out of turns are retried.
+FINISHED_STATUSES = {"ok"}
+
+
+def load_tasks(source: str, context: ContextBuilder, prompt_template: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Reads tasks from a JSONL file or expands a file glob into one task per file.
+
+    JSONL lines look like {"id": "...", "prompt": "...", "files": ["a.py"]};
+    only "prompt" is required. Glob tasks use `prompt_template` with `{path}`
+    replaced by each (non-ignored) matching file, which is also attached.
+    """
+    path = context.root_dir / source
+    if source.endswith(".jsonl"):
+        if not path.is_file():
+            raise ValueError(f"Task file not found: {source}")
+        tasks = []
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                task = json.loads(line)
+                if "prompt" not in task:
+                    raise ValueError(f"{source}:{number}: task has no 'prompt'")
+                task.setdefault("id", str(number))
+                tasks.append(task)
+        return tasks
+
+    if not prompt_template:
+        raise ValueError("A prompt template (--prompt) is required when the source is a file glob.")
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", [source])
+    return [
+        {"id": rel_path, "prompt": prompt_template.replace("{path}", rel_path), "files": [rel_path]}
+        for rel_path in sorted(context.list_files())
+        if spec.match_file(rel_path)
+    ]
+
+
+def finished_ids(output_path: Path) -> Set[str]:
+    """Ids of tasks that already have a finished result in `output_path`."""
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if result.get("status") in FINISHED_STATUSES:
+                done.add(str(result["id"]))
+    return done
+
+
+class BatchRunner:
+    """
+    Runs independent, non-interactive agent sessions over a list of tasks.
+
+    At most `concurrency` sessions talk to Ollama at once. Each worker thread
+    has its own client, and each task gets its own tools and history. Read-only
+    tools always run; mutating tools run only if listed in `allowed_tools`.
+    Results are appended to a JSONL file as tasks finish, so an interrupted
+    batch can be resumed.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], OllamaClient],
+        context: ContextBuilder,
+        concurrency: int = 2,
+        max_turns: int = 10,
+        allowed_tools: Iterable[str] = (),
+        retrieval_top_k: int = 0,
+        retrieval_min_score: float = 0.0,
+        history_tokens: int = 12000,
+        tool_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.client_factory = client_factory
+        self.context = context
+        self.concurrency = max(1, concurrency)
+        self.max_turns = max_turns
+        self.allowed_tools = set(allowed_tools)
+        self.retrieval_top_k = retrieval_top_k
+        self.retrieval_min_score = retrieval_min_score
+        self.history_tokens = history_tokens
+        self.tool_options = tool_options or {}
+        self._local = threading.local()
+        self._clients: List[OllamaClient] = []
+        self._clients_lock = threading.Lock()
+
+    def _client(self) -> OllamaClient:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+            with self._clients_lock:
+                self._clients.append(client)
+        return client
+
+    def _confirm(self, call: Dict[str, Any]) -> bool:
+        return call["name"] in self.allowed_tools
+
+    def _initial_messages(self, task: Dict[str, Any]) -> List[Dict[str, str]]:
+        system_prompt = self.context.build_system_prompt(query=task["prompt"], wait_for_map=True)
+        messages = [{"role": "system", "content": system_prompt}]
+        for rel_path in task.get("files", []):
+            messages.append({"role": "user", "content": f"Content of {rel_path}:\n{self.context.get_file_content(rel_path)}"})
+        prompt = task["prompt"]
+        snippets = self.context.get_relevant_snippets(prompt, top_k=self.retrieval_top_k, min_score=self.retrieval_min_score, wait=True)
+        if snippets:
+            prompt = f"{prompt}\n\nPossibly relevant code from the project:\n{snippets}"
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _run_pending(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        # The prompt and context are built on the worker, so a large batch doesn't prepare every task up front.
+        return self.run_task(task, self._initial_messages(task))
+
+    def run_task(self, task: Dict[str, Any], messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Runs one agent session to completion (no more tool calls) or `max_turns`."""
+        client = self._client()
+        tools = ToolRegistry(root_dir=str(self.context.root_dir), **self.tool_options)
+        history = HistoryManager(token_budget=self.history_tokens)
+        telemetry = SessionTelemetry(model=client.model)
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"id": task["id"], "status": "incomplete", "response": "", "tool_calls": []}
+        for rel_path in task.get("files", []):
+            tools.file_tracker.record(rel_path)
+
+        with ToolScheduler(tools) as scheduler:
+            for _ in range(self.max_turns):
+                history.compact(messages)
+                parser = StreamingToolParser()
+                response = ""
+                for chunk in client.chat(messages):
+                    if chunk.startswith(ERROR_PREFIX):
+                        result.update(status="error", error=chunk[len(ERROR_PREFIX):])
+                        break
+                    response += chunk
+                    parser.feed(chunk)
+                messages.append({"role": "assistant", "content": response})
+                result["response"] = response
+                if result["status"] == "error":
+                    break
+
+                for call, observation in scheduler.run(parser.calls, confirm=self._confirm):
+                    result["tool_calls"].append(call["name"])
+                    if observation is None:
+                        messages.append({"role": "user", "content": f"Tool '{call['name']}' is not allowed in batch mode."})
+                    else:
+                        messages.append({"role": "user", "content": f"Tool Result ({call['name']}):\n{observation}"})
+                telemetry.record_turn(client.last_stats, tools=tools.drain_timings())
+                if not parser.calls:
+                    result["status"] = "ok"
+                    break
+                changes = tools.file_tracker.poll()
+                if changes:
+                    messages.append({"role": "user", "content": changes})
+
+        stats = telemetry.summary()
+        result.update(
+            turns=stats["turns"],
+            prompt_tokens=stats["prompt_tokens"],
+            eval_tokens=stats["eval_tokens"],
+            eval_s=stats["eval_s"],
+            wall_s=time.perf_counter() - started,
+        )
+        return result
+
+    def run(
+        self,
+        tasks: List[Dict[str, Any]],
+        output_path: str,
+        resume: bool = True,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Runs every task not already finished in `output_path` and returns a throughput summary."""
+        output = Path(output_path)
+        done = finished_ids(output) if resume else set()
+        pending = [task for task in tasks if str(task["id"]) not in done]
+        summary = {"total": len(tasks), "skipped": len(tasks) - len(pending), "ok": 0, "incomplete": 0, "error": 0, "eval_tokens": 0}
+
+        started = time.perf_counter()
+        try:
+            with open(output, "a" if resume else "w") as out, ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = {pool.submit(self._run_pending, task): task for task in pending}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"id": futures[future]["id"], "status": "error", "error": str(e)}
+                    summary[result["status"]] += 1
+                    summary["eval_tokens"] += result.get("eval_tokens", 0)
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+                    if on_result:
+                        on_result(result)
+        finally:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+
+        elapsed = time.perf_counter() - started
+        ran = len(pending)
+        summary.update(
+            elapsed_s=elapsed,
+            tasks_per_min=ran / elapsed * 60 if elapsed else 0.0,
+            tokens_per_s=summary["eval_tokens"] / elapsed if elapsed else 0.0,
+        )
+        return summary
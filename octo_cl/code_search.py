@@ -0,0 +1,206 @@
+# octo_cl/code_search.py
+
+import os
+import re
+import threading
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Deque, List, Optional, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+# (line number, is a match rather than context, text)
+Line = Tuple[int, bool, str]
+# (path, lines, number of matching lines)
+FileResult = Tuple[str, List[Line], int]
+
+_MAX_LINE = 200
+
+
+def compile_pattern(pattern: str, literal: bool = False, ignore_case: bool = False) -> "re.Pattern":
+    """Raises re.error for an invalid regex. `^` and `$` match at line boundaries."""
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(re.escape(pattern) if literal else pattern, flags)
+
+
+def _whole_text(regex: "re.Pattern") -> Optional["re.Pattern"]:
+    """`regex` for a search over a whole file that matches wherever a line-by-line search would, or None."""
+    if "\\A" in regex.pattern or "\\Z" in regex.pattern:
+        return None  # anchored to every line when searching lines, but only to the file's ends here
+    return regex if regex.flags & re.MULTILINE else re.compile(regex.pattern, regex.flags | re.MULTILINE)
+
+
+def search_file(path: Path, regex: "re.Pattern", context_lines: int = 2, max_file_bytes: int = 1024 * 1024) -> Tuple[List[Line], int]:
+    """Matching lines of one file with `context_lines` of context around each; overlapping windows are merged."""
+    try:
+        if path.stat().st_size > max_file_bytes:
+            return [], 0
+        data = path.read_bytes()
+    except OSError:
+        return [], 0
+    if b"\0" in data[:1024]:
+        return [], 0
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    # Most files don't match at all; one pass over the whole text rules them out without splitting lines.
+    whole = _whole_text(regex)
+    if whole is not None and not whole.search(text):
+        return [], 0
+    # Split on "\n" only, so lines are exactly what `^` and `$` see in the whole-text search.
+    lines = text.split("\n")
+    if text.endswith("\n"):
+        lines.pop()
+    matches = [i for i, line in enumerate(lines) if regex.search(line)]
+    if not matches:
+        return [], 0  # the pattern only matches across lines
+    shown = {}
+    for i in matches:
+        for j in range(max(0, i - context_lines), min(len(lines), i + context_lines + 1)):
+            shown.setdefault(j, False)
+        shown[i] = True
+    return [(j + 1, shown[j], lines[j]) for j in sorted(shown)], len(matches)
+
+
+def _search_chunk(root_dir: str, paths: Sequence[str], pattern: str, flags: int, context_lines: int, max_matches: int) -> List[FileResult]:
+    """Worker: searches `paths` in order, stopping once `max_matches` lines have matched."""
+    regex = re.compile(pattern, flags)
+    root = Path(root_dir)
+    results: List[FileResult] = []
+    found = 0
+    for rel_path in paths:
+        lines, count = search_file(root / rel_path, regex, context_lines)
+        if count:
+            results.append((rel_path, lines, count))
+            found += count
+            if found >= max_matches:
+                break
+    return results
+
+
+def format_results(results: List[FileResult], max_results: int) -> str:
+    """grep-style output: `path:line: text` for matches, `path-line- text` for context, `--` between groups."""
+    out: List[str] = []
+    shown = total = 0
+    for rel_path, lines, count in results:
+        total += count
+        if shown >= max_results:
+            continue
+        previous = None
+        for number, is_match, text in lines:
+            if is_match:
+                if shown >= max_results:
+                    break
+                shown += 1
+            if out and (previous is None or number != previous + 1):
+                out.append("--")
+            if len(text) > _MAX_LINE:
+                text = text[:_MAX_LINE - 3] + "..."
+            out.append(f"{rel_path}{':' if is_match else '-'}{number}{':' if is_match else '-'} {text}")
+            previous = number
+    if total > shown:
+        out.append(f"[Showing {shown} of {total}+ matches. Narrow the pattern or the path to see the rest.]")
+    return "\n".join(out)
+
+
+class CodeSearcher:
+    """
+    Regex or literal search over a list of project files.
+
+    Small searches run in-process. Larger ones split the files into chunks of
+    roughly `chunk_bytes` and search them on a process pool, so the regex work
+    isn't serialized by the GIL. The pool is started on first use and kept for
+    the session. Chunks are consumed in file order and no more are started
+    once `max_results` matches have been found, so a common pattern returns
+    early and results come out in the same order every time.
+    """
+
+    def __init__(self, root_dir: Path, workers: Optional[int] = None, chunk_bytes: int = 1024 * 1024, parallel_min_bytes: int = 8 * 1024 * 1024):
+        self.root_dir = Path(root_dir)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.chunk_bytes = chunk_bytes
+        # Below this many bytes, starting the pool costs more than it saves.
+        self.parallel_min_bytes = parallel_min_bytes
+        self._pool: Optional["ProcessPoolExecutor"] = None
+        self._futures: Set["Future"] = set()
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                # shutdown(cancel_futures=True) needs Python 3.9.
+                for future in list(self._futures):
+                    future.cancel()
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _executor(self) -> "ProcessPoolExecutor":
+        with self._lock:
+            if self._pool is None:
+                # multiprocessing is only imported once a search is big enough to need it (~20 ms at startup).
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Forking a process that runs other threads (the UI, tool workers) can deadlock the child.
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+            return self._pool
+
+    def _chunks(self, paths: Sequence[str]) -> Tuple[List[List[str]], int]:
+        chunks: List[List[str]] = [[]]
+        size = total = 0
+        for rel_path in paths:
+            try:
+                file_size = os.stat(self.root_dir / rel_path).st_size
+            except OSError:
+                continue
+            if size >= self.chunk_bytes:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(rel_path)
+            size += file_size
+            total += file_size
+        return chunks, total
+
+    def search(self, paths: Sequence[str], regex: "re.Pattern", context_lines: int = 2, max_results: int = 50) -> List[FileResult]:
+        """Files with matches, in the order of `paths`. Stops early once `max_results` lines have matched."""
+        chunks, total = self._chunks(paths)
+        args = (str(self.root_dir), regex.pattern, regex.flags, context_lines, max_results + 1)
+        if self.workers <= 1 or len(chunks) < 2 or total < self.parallel_min_bytes:
+            return _search_chunk(args[0], [p for chunk in chunks for p in chunk], *args[1:])
+
+        # Only a few chunks are in flight at a time, so stopping early doesn't leave the workers busy.
+        pool = self._executor()
+        pending = iter(chunks)
+        window: Deque["Future"] = deque()
+
+        def submit(chunk: List[str]):
+            future = pool.submit(_search_chunk, args[0], chunk, *args[1:])
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+            window.append(future)
+
+        for chunk in islice(pending, 2 * self.workers):
+            submit(chunk)
+        results: List[FileResult] = []
+        found = 0
+        try:
+            while window and found <= max_results:
+                for result in window.popleft().result():
+                    results.append(result)
+                    found += result[2]
+                for chunk in islice(pending, 1):
+                    submit(chunk)
+        finally:
+            for future in window:
+                future.cancel()
+        return results
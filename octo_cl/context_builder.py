@@ -1,14 +1,48 @@
 # octo_cl/context_builder.py
 
-import os
+import threading
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional
 import pathspec
+from octo_cl.code_search import CodeSearcher, compile_pattern, format_results
+from octo_cl.context_packer import TreePacker
+from octo_cl.file_cache import BinaryFileError, FileCache, shared_cache
+from octo_cl.repo_map import RepoMap
+from octo_cl.retrieval import RetrievalIndex
+from octo_cl.tree_cache import TreeSnapshot
+
+# Per-project state (caches, indexes) lives here, relative to the project root.
+OCTO_DIR = ".octo"
 
 class ContextBuilder:
-    def __init__(self, root_dir: str = "."):
+    def __init__(
+        self,
+        root_dir: str = ".",
+        cache_dir: Optional[str] = None,
+        use_cache: bool = True,
+        tree_token_budget: int = 2000,
+        file_cache: Optional[FileCache] = None,
+        map_token_budget: int = 1000,
+    ):
         self.root_dir = Path(root_dir).resolve()
+        self.file_cache = file_cache or shared_cache
+        self.cache_dir = Path(cache_dir).resolve() if cache_dir else self.root_dir / OCTO_DIR
         self.gitignore_spec = self._load_gitignore()
+        self.snapshot = TreeSnapshot(
+            self.root_dir,
+            self.gitignore_spec,
+            cache_path=self.cache_dir / "tree_cache.json" if use_cache else None,
+        )
+        self.packer = TreePacker(token_budget=tree_token_budget)
+        self.index = RetrievalIndex(self.root_dir, index_path=self.cache_dir / "index.json" if use_cache else None)
+        self.map_token_budget = map_token_budget
+        self.repo_map = RepoMap(self.root_dir, cache_path=self.cache_dir / "repo_map.json" if use_cache else None)
+        self._index_thread: Optional[threading.Thread] = None
+        self._map_thread: Optional[threading.Thread] = None
+        self._map_ready = threading.Event()
+        self.searcher = CodeSearcher(self.root_dir)
+        # The snapshot and indexes are shared by tools running on worker threads.
+        self._lock = threading.RLock()
 
     def _load_gitignore(self):
         """Loads .gitignore patterns and returns a PathSpec object."""
@@ -19,28 +53,26 @@ class ContextBuilder:
                 patterns = f.read().splitlines()
         
         # Add common ignore patterns even if .gitignore is missing
-        patterns.extend([".git/", "__pycache__/", "venv/", ".env"])
+        patterns.extend([".git/", "__pycache__/", "venv/", ".env", f"{OCTO_DIR}/"])
         return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
 
     def get_directory_tree(self) -> str:
-        """Returns a string representation of the directory tree, respecting .gitignore."""
-        tree = []
-        for root, dirs, files in os.walk(self.root_dir):
-            level = Path(root).relative_to(self.root_dir).parts
-            indent = "  " * len(level)
-            
-            # Filter directories
-            dirs[:] = [d for d in dirs if not self.gitignore_spec.match_file(str(Path(root) / d / ""))]
-            
-            if root != str(self.root_dir):
-                tree.append(f"{indent}{os.path.basename(root)}/")
-            
-            sub_indent = "  " * (len(level) + 1)
-            for f in files:
-                if not self.gitignore_spec.match_file(str(Path(root) / f)):
-                    tree.append(f"{sub_indent}{f}")
-                    
-        return "\n".join(tree)
+        """Returns a string representation of the directory tree, respecting nested .gitignore files."""
+        with self._lock:
+            self.snapshot.refresh()
+            return "\n".join(self.snapshot.render())
+
+    def get_packed_tree(self, query: str = "") -> str:
+        """Returns the directory tree collapsed to fit the tree token budget, favouring paths relevant to `query`."""
+        with self._lock:
+            self.snapshot.refresh()
+            lines = self.packer.pack(self.root_dir, self.snapshot.entries, self.snapshot.render(), query=query)
+        return "\n".join(lines)
+
+    def list_files(self) -> List[str]:
+        """Returns all non-ignored files as root-relative POSIX paths."""
+        with self._lock:
+            return list(self.snapshot.iter_files())
 
     def get_file_content(self, file_path: str) -> str:
         """Reads the content of a file if it's not ignored."""
@@ -54,32 +86,153 @@ class ContextBuilder:
             return f"Error: File {file_path} not found."
 
         try:
-            with open(full_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                return f"--- FILE: {file_path} ---\n{content}\n--- END FILE ---"
+            content = self.file_cache.read_text(full_path)
+            return f"--- FILE: {file_path} ---\n{content}\n--- END FILE ---"
+        except BinaryFileError:
+            return f"Error: {file_path} is a binary file."
         except Exception as e:
             return f"Error reading {file_path}: {str(e)}"
 
-    def build_system_prompt(self) -> str:
-        """Constructs the initial system prompt with project context and tool usage instructions."""
-        tree = self.get_directory_tree()
+    def refresh_index(self, wait: bool = False):
+        """Brings the retrieval index up to date on a background thread, or on this one if `wait` is set."""
+        with self._lock:
+            running = self._index_thread is not None and self._index_thread.is_alive()
+            if not running and not wait:
+                self._index_thread = threading.Thread(target=self._update_index, daemon=True)
+                self._index_thread.start()
+        if wait:
+            if running:
+                self._index_thread.join()
+            self._update_index()
+
+    def _update_index(self):
+        with self._lock:
+            self.snapshot.refresh()
+            paths = list(self.snapshot.iter_files())
+        self.index.update(paths)
+
+    def get_relevant_snippets(self, query: str, top_k: int = 3, min_score: float = 0.0, wait: bool = False) -> str:
+        """
+        Returns the top-k code chunks for a query scoring at least `min_score`, or an empty string.
+
+        The search uses the index as it stands and then refreshes it in the
+        background for the next query, so no query waits on indexing. Until
+        the first build has finished nothing is returned; with `wait`, the
+        index is built on this thread if needed and not refreshed afterwards.
+        """
+        if top_k <= 0:
+            return ""
+        if not self.index.ready:
+            if not wait:
+                self.refresh_index()
+                return ""
+            self.refresh_index(wait=True)
+        results = self.index.search(query, top_k=top_k, min_score=min_score)
+        if not wait:
+            self.refresh_index()
+        blocks = []
+        for _, rel_path, start, end in results:
+            snippet = self.index.snippet(rel_path, start, end)
+            if snippet:
+                blocks.append(f"--- SNIPPET: {rel_path}:{start}-{end} ---\n{snippet}\n--- END SNIPPET ---")
+        return "\n".join(blocks)
+
+    def get_repo_map(self, query: str = "", path: str = "", token_budget: Optional[int] = None) -> str:
+        """Returns the project's most referenced classes, functions and signatures, grouped by file."""
+        with self._lock:
+            self.snapshot.refresh()
+            paths = list(self.snapshot.iter_files())
+        # Parsing can take seconds on a large project; it doesn't need to block the tree or the index.
+        self.repo_map.update(paths)
+        self._map_ready.set()
+        prefix = path.strip("/") if path not in ("", ".") else ""
+        return self.repo_map.render(
+            token_budget=self.map_token_budget if token_budget is None else token_budget,
+            query=query,
+            path_prefix=prefix,
+        )
+
+    def start_repo_map(self):
+        """Builds or updates the repository map on a background thread, once."""
+        if self._map_thread is None and self.map_token_budget > 0:
+            with self._lock:
+                paths = self.list_files()
+            self._map_thread = threading.Thread(target=self._build_map, args=(paths,), daemon=True)
+            self._map_thread.start()
+
+    def _build_map(self, paths: List[str]):
+        self.repo_map.update(paths)
+        self._map_ready.set()
+
+    @property
+    def repo_map_ready(self) -> bool:
+        return self._map_ready.is_set()
+
+    def search_code(
+        self,
+        pattern: str,
+        path: str = "",
+        literal: bool = False,
+        ignore_case: bool = False,
+        context_lines: int = 2,
+        max_results: int = 50,
+    ) -> str:
+        """Searches non-ignored files under `path` and returns grep-style matches. Raises re.error for a bad regex."""
+        regex = compile_pattern(pattern, literal=literal, ignore_case=ignore_case)
+        prefix = path.strip("/") if path not in ("", ".") else ""
+        with self._lock:
+            self.snapshot.refresh()
+            paths = [p for p in self.snapshot.iter_files() if not prefix or p == prefix or p.startswith(prefix + "/")]
+        results = self.searcher.search(sorted(paths), regex, context_lines=context_lines, max_results=max_results)
+        return format_results(results, max_results)
+
+    def build_system_prompt(self, query: str = "", wait_for_map: bool = False) -> str:
+        """
+        Constructs the initial system prompt with project context and tool usage instructions.
+
+        The repository map is included once it has been built; otherwise its
+        build is started in the background (see `repo_map_ready`), unless
+        `wait_for_map` is set.
+        """
+        tree = self.get_packed_tree(query)
+        repo_map = ""
+        if self.map_token_budget > 0:
+            if wait_for_map or self.repo_map_ready:
+                repo_map = self.get_repo_map(query)
+            else:
+                self.start_repo_map()
+        map_section = (
+            "Repository Map (most referenced definitions; use repo_map for more):\n"
+            f"```\n{repo_map}\n```\n\n"
+        ) if repo_map else ""
         prompt = (
             "You are octo-cl, an advanced AI coding assistant powered by local LLMs via Ollama.\n"
             "You have access to the user's project files and can help with coding tasks, "
             "refactoring, debugging, and explaining code.\n\n"
             "Current Directory Structure:\n"
             f"```\n{tree}\n```\n\n"
+            f"{map_section}"
             "--- TOOL USAGE ---\n"
             "You can execute tools by outputting specific XML-like tags. "
             "The tool will execute, and the result will be provided to you in the next message.\n\n"
             "Available Tools:\n"
-            "1. <tool_call:read_file path=\"relative/path/to/file\" /> - Read file content.\n"
-            "2. <tool_call:write_file path=\"relative/path/to/file\">FILE_CONTENT</tool_call:write_file> - Write file content.\n"
-            "3. <tool_call:run_shell command=\"shell command\" /> - Run a shell command in the project root.\n"
-            "4. <tool_call:list_files path=\"relative/path/to/dir\" /> - List files in a directory.\n\n"
+            "1. <tool_call:read_file path=\"relative/path/to/file\" /> - Read file content. "
+            "Add start_line=\"N\" end_line=\"M\" to read only those lines (1-based, inclusive).\n"
+            "2. <tool_call:write_file path=\"relative/path/to/file\">FILE_CONTENT</tool_call:write_file> - Write a whole file (new files only).\n"
+            "3. <tool_call:edit_file path=\"relative/path/to/file\">EDITS</tool_call:edit_file> - Change an existing file. "
+            "EDITS are one or more blocks of the form\n"
+            "<<<<<<< SEARCH\nexact existing lines\n=======\nreplacement lines\n>>>>>>> REPLACE\n"
+            "(a unified diff is also accepted). Keep SEARCH short but unique.\n"
+            "4. <tool_call:run_shell command=\"shell command\" /> - Run a shell command in the project root.\n"
+            "5. <tool_call:list_files path=\"relative/path/to/dir\" /> - List files in a directory.\n"
+            "6. <tool_call:repo_map path=\"relative/path\" query=\"words\" /> - List classes, functions and signatures "
+            "under a path (both attributes optional), to find where something is defined without reading whole files.\n"
+            "7. <tool_call:search_code pattern=\"regex\" path=\"relative/path\" /> - Search file contents and get matching lines "
+            "with context. Add literal=\"true\" to match the text exactly, ignore_case=\"true\" for case-insensitive matching.\n\n"
             "Guidelines:\n"
             "1. Be concise and professional.\n"
-            "2. When suggesting code changes, use the `write_file` tool directly instead of just printing it.\n"
+            "2. When suggesting code changes, use the `edit_file` tool directly instead of just printing it; "
+            "only send the lines that change, never the whole file.\n"
             "3. Always explain your thought process before calling a tool.\n"
             "4. Wait for the tool result before proceeding with your next step."
         )
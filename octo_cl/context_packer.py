@@ -0,0 +1,183 @@
+# octo_cl/context_packer.py
+
+import heapq
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+# Code and paths tokenize denser than prose; erring high keeps us under num_ctx.
+CHARS_PER_TOKEN = 3
+_WHITESPACE_RUN = re.compile(r"\s{2,}")
+_QUERY_TERM = re.compile(r"[a-z0-9_]{2,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate: ~3 characters per token, whitespace runs counted once."""
+    if not text:
+        return 0
+    return len(_WHITESPACE_RUN.sub(" ", text)) // CHARS_PER_TOKEN + 1
+
+
+def query_terms(query: str) -> Set[str]:
+    """Lower-cased identifier-ish words from a query, used for path relevance."""
+    return set(_QUERY_TERM.findall(query.lower()))
+
+
+class TreePacker:
+    """
+    Renders a TreeSnapshot within a token budget.
+
+    Directories are expanded greedily from the root in order of relevance and
+    recency; whatever does not fit is collapsed to a one-line summary such as
+    `gen/ (1,204 files)`, and very wide directories only list their best files.
+    If even the top-level summaries don't fit, the least relevant top-level
+    directories are folded into a single `... (N more dirs)` line.
+    """
+
+    def __init__(self, token_budget: int = 2000, max_files_per_dir: int = 40, max_depth: int = 8):
+        self.token_budget = token_budget
+        self.max_files_per_dir = max_files_per_dir
+        self.max_depth = max_depth
+
+    def pack(self, root_dir: Path, entries: Dict[str, dict], full_lines: List[str], query: str = "") -> List[str]:
+        """Returns the tree lines, collapsed as needed to stay within the budget."""
+        if estimate_tokens("\n".join(full_lines)) <= self.token_budget:
+            return full_lines
+
+        self.root_dir = root_dir
+        self.entries = entries
+        self.terms = query_terms(query)
+        self.now = time.time()
+        self._summarize()
+        self.kept_files: Dict[str, Tuple[List[str], int]] = {}
+
+        expanded = {""}
+        used = self._expanded_cost("")
+        self.hidden: Set[str] = set()
+        if used > self.token_budget:
+            used = self._hide_root_dirs(used)
+        candidates: List[Tuple[float, str]] = []
+        self._push_children("", candidates)
+        while candidates:
+            _, rel_dir = heapq.heappop(candidates)
+            delta = self._expanded_cost(rel_dir) - self._summary_cost(rel_dir)
+            if used + delta > self.token_budget:
+                continue
+            expanded.add(rel_dir)
+            used += delta
+            self._push_children(rel_dir, candidates)
+
+        lines: List[str] = []
+        self._render("", 0, expanded, lines)
+        return lines
+
+    def _hide_root_dirs(self, used: int) -> int:
+        """Drops the least relevant top-level directories into one `... (N more dirs)` line until the root fits."""
+        children = [self._join("", name) for name in self.entries[""]["dirs"] if name in self.entries]
+        children.sort(key=lambda child: self._score(child, self.newest[child]))
+        for child in children:
+            if used <= self.token_budget:
+                break
+            self.hidden.add(child)
+            used -= self._summary_cost(child)
+        if self.hidden:
+            used += estimate_tokens(self._hidden_line(0))
+        return used
+
+    def _hidden_line(self, depth: int) -> str:
+        return f"{'  ' * (depth + 1)}... ({len(self.hidden):,} more dirs)"
+
+    def _summarize(self):
+        """Computes recursive file counts and newest mtimes per directory."""
+        self.file_counts: Dict[str, int] = {}
+        self.newest: Dict[str, int] = {}
+        # Snapshot entries are stored in pre-order, so reversing visits children first.
+        for rel_dir in reversed(list(self.entries)):
+            entry = self.entries[rel_dir]
+            count, newest = len(entry["files"]), entry["mtime"]
+            for name in entry["dirs"]:
+                child = self._join(rel_dir, name)
+                count += self.file_counts.get(child, 0)
+                newest = max(newest, self.newest.get(child, 0))
+            self.file_counts[rel_dir] = count
+            self.newest[rel_dir] = newest
+
+    def _score(self, rel_path: str, mtime_ns: int) -> float:
+        lowered = rel_path.lower()
+        relevance = sum(1 for term in self.terms if term in lowered)
+        age_days = max(0.0, self.now - mtime_ns / 1e9) / 86400
+        return relevance * 2 + 1 / (1 + age_days)
+
+    def _push_children(self, rel_dir: str, candidates: List[Tuple[float, str]]):
+        depth = rel_dir.count("/") + 1 if rel_dir else 0
+        if depth >= self.max_depth:
+            return
+        for name in self.entries[rel_dir]["dirs"]:
+            child = self._join(rel_dir, name)
+            if child in self.entries and child not in self.hidden:
+                heapq.heappush(candidates, (-self._score(child, self.newest[child]), child))
+
+    def _files(self, rel_dir: str) -> Tuple[List[str], int]:
+        """Returns (files to list, number of files elided) for an expanded directory."""
+        if rel_dir not in self.kept_files:
+            files = self.entries[rel_dir]["files"]
+            if len(files) <= self.max_files_per_dir:
+                self.kept_files[rel_dir] = (files, 0)
+            else:
+                ranked = sorted(files, key=lambda f: -self._score(self._join(rel_dir, f), self._mtime(rel_dir, f)))
+                kept = sorted(ranked[:self.max_files_per_dir])
+                self.kept_files[rel_dir] = (kept, len(files) - len(kept))
+        return self.kept_files[rel_dir]
+
+    def _mtime(self, rel_dir: str, name: str) -> int:
+        try:
+            return os.stat(self.root_dir / rel_dir / name).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _summary_line(self, rel_dir: str, depth: int) -> str:
+        name = rel_dir.rsplit("/", 1)[-1]
+        return f"{'  ' * depth}{name}/ ({self.file_counts[rel_dir]:,} files)"
+
+    def _summary_cost(self, rel_dir: str) -> int:
+        return estimate_tokens(self._summary_line(rel_dir, rel_dir.count("/") + 1))
+
+    def _expanded_cost(self, rel_dir: str) -> int:
+        """Tokens for a directory's own line, its files and summary lines for its subdirectories."""
+        depth = rel_dir.count("/") + 1 if rel_dir else 0
+        indent = "  " * (depth + 1)
+        files, elided = self._files(rel_dir)
+        cost = estimate_tokens(f"{'  ' * depth}{rel_dir.rsplit('/', 1)[-1]}/") if rel_dir else 0
+        cost += sum(estimate_tokens(f"{indent}{name}") for name in files)
+        if elided:
+            cost += estimate_tokens(f"{indent}... ({elided:,} more files)")
+        for name in self.entries[rel_dir]["dirs"]:
+            child = self._join(rel_dir, name)
+            if child in self.entries:
+                cost += self._summary_cost(child)
+        return cost
+
+    def _render(self, rel_dir: str, depth: int, expanded: Set[str], lines: List[str]):
+        if rel_dir:
+            lines.append(f"{'  ' * depth}{rel_dir.rsplit('/', 1)[-1]}/")
+        indent = "  " * (depth + 1)
+        files, elided = self._files(rel_dir)
+        lines.extend(f"{indent}{name}" for name in files)
+        if elided:
+            lines.append(f"{indent}... ({elided:,} more files)")
+        for name in self.entries[rel_dir]["dirs"]:
+            child = self._join(rel_dir, name)
+            if child not in self.entries or child in self.hidden:
+                continue
+            if child in expanded:
+                self._render(child, depth + 1, expanded, lines)
+            else:
+                lines.append(self._summary_line(child, depth + 1))
+        if not rel_dir and self.hidden:
+            lines.append(self._hidden_line(depth))
+
+    @staticmethod
+    def _join(rel_dir: str, name: str) -> str:
+        return f"{rel_dir}/{name}" if rel_dir else name
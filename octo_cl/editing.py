@@ -0,0 +1,243 @@
+# octo_cl/editing.py
+
+import difflib
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+SEARCH_MARKER = "<<<<<<< SEARCH"
+DIVIDER = "======="
+REPLACE_MARKER = ">>>>>>> REPLACE"
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+# (search text, replacement text, 1-based line hint or None)
+# An empty search text with a hint inserts the replacement before that line.
+Edit = Tuple[str, str, Optional[int]]
+
+
+class EditError(ValueError):
+    """Raised when an edit cannot be applied; the message is meant for the model."""
+
+
+def parse_edits(content: str) -> List[Edit]:
+    """Parses SEARCH/REPLACE blocks or a unified diff into a list of edits."""
+    if SEARCH_MARKER in content:
+        return _parse_search_replace(content)
+    if re.search(r"^@@ ", content, re.MULTILINE):
+        return _parse_unified_diff(content)
+    raise EditError(
+        f"No edits found. Use one or more '{SEARCH_MARKER}' / '{DIVIDER}' / '{REPLACE_MARKER}' "
+        "blocks, or a unified diff with '@@ -start,count +start,count @@' hunks."
+    )
+
+
+def _parse_search_replace(content: str) -> List[Edit]:
+    edits = []
+    lines = content.split("\n")
+    i = 0
+    while i < len(lines):
+        if lines[i].strip() != SEARCH_MARKER:
+            i += 1
+            continue
+        search, replace = [], []
+        i += 1
+        while i < len(lines) and lines[i].strip() != DIVIDER:
+            search.append(lines[i])
+            i += 1
+        i += 1
+        while i < len(lines) and lines[i].strip() != REPLACE_MARKER:
+            replace.append(lines[i])
+            i += 1
+        if i >= len(lines):
+            raise EditError(f"Edit block {len(edits) + 1} is missing its '{DIVIDER}' or '{REPLACE_MARKER}' line.")
+        edits.append(("\n".join(search), "\n".join(replace), None))
+        i += 1
+    return edits
+
+
+def _parse_unified_diff(content: str) -> List[Edit]:
+    edits = []
+    hunk = None
+    lines = content.split("\n")
+    for i, line in enumerate(lines):
+        header = _HUNK_HEADER.match(line)
+        if header:
+            if hunk:
+                edits.append(_hunk_to_edit(*hunk))
+            hunk = (int(header.group(1)), header.group(2) == "0", [], [])
+            continue
+        if hunk is None or line.startswith("\\"):
+            continue  # file headers before the first hunk, "\ No newline at end of file"
+        if line.startswith("---") and i + 1 < len(lines) and lines[i + 1].startswith("+++"):
+            # The next file's headers; a removed "-- comment" line also starts with "---".
+            edits.append(_hunk_to_edit(*hunk))
+            hunk = None
+            continue
+        _, _, old, new = hunk
+        if line.startswith("-"):
+            old.append(line[1:])
+        elif line.startswith("+"):
+            new.append(line[1:])
+        else:
+            # Context line; models often drop the leading space on blank lines.
+            old.append(line[1:] if line.startswith(" ") else line)
+            new.append(line[1:] if line.startswith(" ") else line)
+    if hunk:
+        edits.append(_hunk_to_edit(*hunk))
+    return edits
+
+
+def _hunk_to_edit(start: int, pure_insert: bool, old: List[str], new: List[str]) -> Edit:
+    # Trailing blank context is usually just the end of the diff text.
+    while old and new and old[-1] == "" and new[-1] == "":
+        old.pop()
+        new.pop()
+    if not old and pure_insert:
+        # "-N,0" means the new lines go after line N.
+        return "", "\n".join(new), start + 1
+    return "\n".join(old), "\n".join(new), start
+
+
+def apply_edits(text: str, edits: List[Edit], fuzzy_threshold: float = 0.85) -> str:
+    """Applies edits in order, raising EditError with a diagnostic on the first one that doesn't match."""
+    shift = 0  # diff line numbers refer to the original text; earlier edits move what follows
+    for number, (search, replace, hint) in enumerate(edits, 1):
+        lines_before = text.count("\n")
+        try:
+            text = apply_edit(text, search, replace, None if hint is None else hint + shift, fuzzy_threshold)
+        except EditError as e:
+            raise EditError(f"Edit {number} of {len(edits)}: {e}") from None
+        shift += text.count("\n") - lines_before
+    return text
+
+
+def apply_edit(text: str, search: str, replace: str, hint: Optional[int] = None, fuzzy_threshold: float = 0.85) -> str:
+    if search == "" and hint is not None:
+        return _insert_lines(text, replace, hint)
+    if not search.strip():
+        if not text.strip():
+            return replace + ("\n" if replace and not replace.endswith("\n") else "")
+        raise EditError("The SEARCH section is empty; include the lines to replace.")
+
+    # 1. Exact match on whole lines.
+    starts = [m.start() for m in re.finditer(re.escape(search), text)]
+    aligned = [pos for pos in starts if _on_line_boundaries(text, pos, pos + len(search))]
+    if aligned:
+        if len(aligned) > 1 and hint is None:
+            raise EditError(f"The SEARCH text matches {len(aligned)} places; include more surrounding lines to make it unique.")
+        best = min(aligned, key=lambda pos: abs(text.count("\n", 0, pos) + 1 - (hint or 0)))
+        end = best + len(search)
+        if not replace and not search.endswith("\n"):
+            # Deleting whole lines: take their line break too, as a diff would.
+            if end < len(text):
+                end += 1
+            elif best > 0:
+                best -= 1
+        return text[:best] + replace + text[end:]
+
+    # 2. Line match ignoring indentation and trailing whitespace.
+    lines = text.split("\n")
+    search_lines = search.strip("\n").split("\n")
+    replace_lines = replace.strip("\n").split("\n") if replace.strip("\n") else []
+    size = len(search_lines)
+    wanted = [line.strip() for line in search_lines]
+    windows = range(len(lines) - size + 1)
+    matches = [i for i in windows if [line.strip() for line in lines[i:i + size]] == wanted]
+
+    # 3. An exact match inside a line (e.g. a single expression), if it is unique.
+    if not matches and starts:
+        if len(starts) > 1:
+            raise EditError(f"The SEARCH text matches {len(starts)} places; include more surrounding lines to make it unique.")
+        return text[:starts[0]] + replace + text[starts[0] + len(search):]
+
+    # 4. Fuzzy line match.
+    if not matches:
+        scored = []
+        target = "\n".join(wanted)
+        for i in windows:
+            matcher = difflib.SequenceMatcher(None, "\n".join(line.strip() for line in lines[i:i + size]), target)
+            if matcher.real_quick_ratio() >= fuzzy_threshold and matcher.quick_ratio() >= fuzzy_threshold:
+                scored.append((matcher.ratio(), i))
+        best_score = max((score for score, _ in scored), default=0.0)
+        if best_score < fuzzy_threshold:
+            raise EditError(_not_found_message(lines, search_lines))
+        matches = [i for score, i in scored if score == best_score]
+
+    if len(matches) > 1:
+        if hint is None:
+            raise EditError(f"The SEARCH text matches {len(matches)} places; include more surrounding lines to make it unique.")
+        matches = [min(matches, key=lambda i: abs(i + 1 - hint))]
+
+    start = matches[0]
+    reindented = _reindent(replace_lines, search_lines, lines[start:start + size])
+    return "\n".join(lines[:start] + reindented + lines[start + size:])
+
+
+def _insert_lines(text: str, new: str, line: int) -> str:
+    """Inserts `new` as whole lines before 1-based `line` (one past the last line appends)."""
+    lines = text.split("\n")
+    count = len(lines) - 1 if text.endswith("\n") or not text else len(lines)
+    if not 1 <= line <= count + 1:
+        raise EditError(f"The hunk inserts at line {line}, but the file has {count} lines.")
+    return "\n".join(lines[:line - 1] + new.split("\n") + lines[line - 1:])
+
+
+def _on_line_boundaries(text: str, start: int, end: int) -> bool:
+    starts_line = start == 0 or text[start - 1] == "\n"
+    ends_line = end == len(text) or text[end - 1] == "\n" or text[end] == "\n"
+    return starts_line and ends_line
+
+
+def _indent(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _reindent(replace_lines: List[str], search_lines: List[str], matched_lines: List[str]) -> List[str]:
+    """Shifts the replacement by the indentation difference between the SEARCH text and the file."""
+    for searched, matched in zip(search_lines, matched_lines):
+        if searched.strip():
+            search_indent, file_indent = _indent(searched), _indent(matched)
+            break
+    else:
+        return replace_lines
+    if search_indent == file_indent:
+        return replace_lines
+    return [
+        file_indent + line[len(search_indent):] if line.startswith(search_indent) and line.strip() else line
+        for line in replace_lines
+    ]
+
+
+def _not_found_message(lines: List[str], search_lines: List[str]) -> str:
+    size = len(search_lines)
+    target = "\n".join(line.strip() for line in search_lines)
+    best_score, best_start = 0.0, 0
+    for i in range(max(1, len(lines) - size + 1)):
+        score = difflib.SequenceMatcher(None, "\n".join(line.strip() for line in lines[i:i + size]), target).quick_ratio()
+        if score > best_score:
+            best_score, best_start = score, i
+    closest = "\n".join(lines[best_start:best_start + size])
+    return (
+        "The SEARCH text was not found in the file. "
+        f"Closest match ({best_score:.0%} similar) at lines {best_start + 1}-{best_start + size}:\n{closest}\n"
+        "Re-read the file and copy the SEARCH lines exactly."
+    )
+
+
+def atomic_write(path: Path, content: str):
+    """Writes to a temporary file next to `path` and renames it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
@@ -0,0 +1,251 @@
+# octo_cl/endpoint_pool.py
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Generator, List, Optional, Sequence, Set, Tuple
+
+import httpx
+
+from octo_cl.llm_interface import ERROR_PREFIX, RETRY_STATUS_CODES, OllamaClient
+
+# Failures that mean the endpoint itself is unusable (or overloaded), as opposed to a bad request.
+FAILOVER_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+
+
+def _should_fail_over(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRY_STATUS_CODES
+    return isinstance(error, FAILOVER_EXCEPTIONS)
+
+
+def parse_endpoints(value: str) -> List[str]:
+    """Splits an OLLAMA_URL value holding one or more comma- or space-separated URLs."""
+    return [url.rstrip("/") for url in re.split(r"[\s,]+", value) if url]
+
+
+class Endpoint:
+    def __init__(self, url: str, client: OllamaClient):
+        self.url = url
+        self.client = client  # used for health checks only
+        self.healthy = False
+        self.has_model = False
+        self.checked_at = 0.0
+        self.outstanding = 0  # requests in flight
+        self.sessions = 0  # sessions pinned to this endpoint
+
+    @property
+    def usable(self) -> bool:
+        return self.healthy and self.has_model
+
+
+class EndpointPool:
+    """
+    A set of Ollama servers serving the same model.
+
+    `/api/tags` on every endpoint is polled every `check_interval` seconds
+    (once `start()` has been called), which tracks both reachability and
+    whether the model is pulled there. New sessions go to the usable endpoint
+    with the fewest requests in flight, then the fewest pinned sessions.
+    """
+
+    def __init__(self, urls: Sequence[str], model: str = "qwen2.5-coder:7b", check_interval: float = 30.0, **client_kwargs):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one URL")
+        self.model = model
+        self.check_interval = check_interval
+        self.client_kwargs = client_kwargs
+        # Health checks must be quick and must not retry: a dead host should be skipped, not waited for.
+        check_kwargs = {k: v for k, v in client_kwargs.items() if k in ("connect_timeout", "read_timeout", "transport")}
+        self.endpoints = [Endpoint(url, OllamaClient(url, model, max_retries=0, **check_kwargs)) for url in urls]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._checked = False
+
+    def start(self) -> "EndpointPool":
+        """Starts the periodic background health checks (the first check happens on first use)."""
+        if self._thread is None and self.check_interval > 0:
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _poll(self):
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    def check(self):
+        """Checks every endpoint concurrently via /api/tags."""
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as pool:
+            results = list(pool.map(lambda e: e.client.preflight(), self.endpoints))
+        now = time.monotonic()
+        with self._lock:
+            for endpoint, (reachable, has_model) in zip(self.endpoints, results):
+                endpoint.healthy, endpoint.has_model, endpoint.checked_at = reachable, has_model, now
+            self._checked = True
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"url": e.url, "healthy": e.healthy, "has_model": e.has_model, "outstanding": e.outstanding, "sessions": e.sessions}
+                for e in self.endpoints
+            ]
+
+    def mark_failed(self, endpoint: Endpoint):
+        """Takes an endpoint out of rotation until the next health check sees it up again."""
+        with self._lock:
+            endpoint.healthy = False
+
+    def acquire(self, exclude: Set[str] = frozenset()) -> Optional[Endpoint]:
+        """Picks the endpoint for a new session, or None if no usable endpoint remains."""
+        if not self._checked:
+            self.check()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.usable and e.url not in exclude]
+            if not candidates:
+                return None
+            best = min(candidates, key=lambda e: (e.outstanding, e.sessions))
+            best.sessions += 1
+            return best
+
+    def release(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.sessions -= 1
+
+    def begin_request(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.outstanding += 1
+
+    def end_request(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def session(self, **overrides) -> "PooledClient":
+        return PooledClient(self, **overrides)
+
+
+class PooledClient:
+    """
+    A chat session on an `EndpointPool`, usable wherever an `OllamaClient` is.
+
+    The session is pinned to one endpoint, chosen when it first needs one, so
+    consecutive requests reuse that server's loaded model and prompt cache. If
+    the endpoint fails (connection error, 502/503/504) before any output has
+    been produced, it is marked down and the request moves to the next best
+    endpoint, which the session then sticks to. Failing over replaces the
+    per-request retries a single `OllamaClient` would do.
+    """
+
+    def __init__(self, pool: EndpointPool, **overrides):
+        self.pool = pool
+        self.model = pool.model
+        self.client_kwargs = {**pool.client_kwargs, **overrides}
+        self.endpoint: Optional[Endpoint] = None
+        self.last_stats: Dict[str, Any] = {}
+        self.warmup_stats: Dict[str, Any] = {}
+        self._clients: Dict[str, OllamaClient] = {}
+
+    @property
+    def base_url(self) -> str:
+        return self.endpoint.url if self.endpoint else ", ".join(e.url for e in self.pool.endpoints)
+
+    @property
+    def response_cache(self):
+        return self.client_kwargs.get("response_cache")
+
+    def close(self):
+        self._unpin()
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _client_for(self, endpoint: Endpoint) -> OllamaClient:
+        if endpoint.url not in self._clients:
+            kwargs = {**self.client_kwargs, "max_retries": 0}
+            self._clients[endpoint.url] = OllamaClient(endpoint.url, self.model, **kwargs)
+        return self._clients[endpoint.url]
+
+    def _pin(self, exclude: Set[str] = frozenset()) -> Optional[Endpoint]:
+        # Move on if the pinned endpoint failed or a health check has since taken it out of rotation.
+        if self.endpoint is None or self.endpoint.url in exclude or not self.endpoint.usable:
+            self._unpin()
+            self.endpoint = self.pool.acquire(exclude)
+        return self.endpoint
+
+    def _unpin(self):
+        if self.endpoint is not None:
+            self.pool.release(self.endpoint)
+            self.endpoint = None
+
+    def preflight(self) -> Tuple[bool, bool]:
+        """Checks all endpoints; reachable if any is, model available if any usable endpoint has it."""
+        self.pool.check()
+        status = self.pool.status()
+        return any(e["healthy"] for e in status), any(e["healthy"] and e["has_model"] for e in status)
+
+    def check_connection(self) -> bool:
+        return self.preflight()[0]
+
+    def is_model_available(self) -> bool:
+        return self.preflight()[1]
+
+    def warm_up(self) -> Optional[Dict[str, Any]]:
+        """Loads the model on the endpoint this session is pinned to."""
+        endpoint = self._pin()
+        if endpoint is None:
+            return None
+        stats = self._client_for(endpoint).warm_up()
+        self.warmup_stats = stats or {}
+        return stats
+
+    def chat(self, messages: List[Dict[str, str]]) -> Generator[str, None, None]:
+        """Same contract as `OllamaClient.chat`, failing over between endpoints before the first chunk."""
+        tried: Set[str] = set()
+        while True:
+            endpoint = self._pin(tried)
+            if endpoint is None:
+                urls = ", ".join(e.url for e in self.pool.endpoints)
+                yield f"{ERROR_PREFIX}No reachable Ollama endpoint has model {self.model} ({urls})."
+                return
+            client = self._client_for(endpoint)
+            started = False
+            self.pool.begin_request(endpoint)
+            try:
+                for text in client.stream_chat(messages):
+                    started = True
+                    yield text
+                return
+            except Exception as e:
+                if not _should_fail_over(e):
+                    yield f"{ERROR_PREFIX}{str(e)}"
+                    return
+                self.pool.mark_failed(endpoint)
+                if started:
+                    # Part of the answer is already out; replaying elsewhere would duplicate it.
+                    yield f"{ERROR_PREFIX}Lost connection to Ollama at {endpoint.url}: {e}"
+                    return
+                tried.add(endpoint.url)
+            finally:
+                self.pool.end_request(endpoint)
+                self.last_stats = {**client.last_stats, "endpoint": endpoint.url}
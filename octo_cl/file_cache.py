@@ -0,0 +1,189 @@
+# octo_cl/file_cache.py
+
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+_SNIFF_BYTES = 8192
+_COUNT_CHUNK = 1024 * 1024
+
+
+class BinaryFileError(ValueError):
+    """Raised when a text read is attempted on a binary file."""
+
+
+class FileCache:
+    """
+    Process-wide LRU cache of decoded file contents.
+
+    Entries are keyed by (path, mtime, size), so an edited file is simply a
+    cache miss, and the cache is bounded by the total size of the text it
+    holds. Files above `mmap_threshold` are read through mmap; files too big to
+    cache are served line ranges straight from the mapping without decoding
+    the whole file.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, mmap_threshold: int = 1024 * 1024, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 4
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries: "OrderedDict[Tuple[str, int, int], Tuple[str, Optional[List[int]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_text(self, path: Union[str, Path]) -> str:
+        """Returns the whole file decoded as UTF-8. Raises BinaryFileError or OSError."""
+        key = self._key(path)
+        entry = self._get(key)
+        if entry is not None:
+            return entry[0]
+        text = self._load(Path(path), key[2])
+        self._put(key, text)
+        return text
+
+    def read_lines(self, path: Union[str, Path], start: int, end: Optional[int] = None) -> Tuple[str, int]:
+        """Returns (lines start..end, 1-based and inclusive, total line count)."""
+        key = self._key(path)
+        if key[2] > self.max_entry_bytes:
+            return self._read_lines_mapped(Path(path), start, end)
+
+        text = self.read_text(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            offsets = entry[1] if entry else None
+        if offsets is None:
+            offsets = self._line_offsets(text)
+            with self._lock:
+                if key in self._entries and self._entries[key][1] is None:
+                    self._entries[key] = (text, offsets)
+                    self._size += len(offsets) * 8
+        total = len(offsets) if text else 0
+        first = max(start, 1) - 1
+        last = total if end is None else min(end, total)
+        if first >= last:
+            return "", total
+        stop = offsets[last] if last < len(offsets) else len(text)
+        return text[offsets[first]:stop], total
+
+    def read_head(self, path: Union[str, Path], max_bytes: int) -> Tuple[str, int]:
+        """
+        Returns (the whole lines within the first `max_bytes` of the file, total
+        line count). Only that head is decoded, so this is cheap even for huge
+        files; a single line longer than `max_bytes` is cut at `max_bytes`.
+        """
+        path = Path(path)
+        if os.stat(path).st_size == 0:
+            return "", 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\0", 0, _SNIFF_BYTES) != -1:
+                raise BinaryFileError(f"{path.name} is a binary file")
+            size = len(mm)
+            total = self._count_lines(mm)
+            if size <= max_bytes:
+                return mm[:].decode("utf-8", errors="replace"), total
+            cut = mm.rfind(b"\n", 0, max_bytes) + 1 or max_bytes
+            return mm[:cut].decode("utf-8", errors="replace"), total
+
+    @staticmethod
+    def _count_lines(mm: mmap.mmap) -> int:
+        size = len(mm)
+        total = sum(mm[i:i + _COUNT_CHUNK].count(b"\n") for i in range(0, size, _COUNT_CHUNK))
+        if size and mm[size - 1:size] != b"\n":
+            total += 1
+        return total
+
+    @staticmethod
+    def _line_offsets(text: str) -> List[int]:
+        offsets = [0]
+        pos = text.find("\n")
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = text.find("\n", pos + 1)
+        if len(offsets) > 1 and offsets[-1] == len(text):
+            offsets.pop()
+        return offsets
+
+    def invalidate(self, path: Union[str, Path]):
+        """Drops every cached version of a file (e.g. after the agent writes it)."""
+        name = str(Path(path).resolve())
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == name]:
+                self._evict(key)
+
+    def _key(self, path: Union[str, Path]) -> Tuple[str, int, int]:
+        resolved = Path(path).resolve()
+        st = os.stat(resolved)
+        return str(resolved), st.st_mtime_ns, st.st_size
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _put(self, key, text: str):
+        if len(text) > self.max_entry_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (text, None)
+            self._size += len(text)
+            while self._size > self.max_bytes and self._entries:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        text, offsets = self._entries.pop(key)
+        self._size -= len(text) + (len(offsets) * 8 if offsets else 0)
+
+    def _load(self, path: Path, size: int) -> str:
+        if size == 0:
+            return ""
+        if size < self.mmap_threshold:
+            with open(path, "rb") as f:
+                data = f.read()
+            if b"\0" in data[:_SNIFF_BYTES]:
+                raise BinaryFileError(f"{path.name} is a binary file")
+            return data.decode("utf-8", errors="replace")
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\0", 0, _SNIFF_BYTES) != -1:
+                raise BinaryFileError(f"{path.name} is a binary file")
+            return mm[:].decode("utf-8", errors="replace")
+
+    def _read_lines_mapped(self, path: Path, start: int, end: Optional[int]) -> Tuple[str, int]:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\0", 0, _SNIFF_BYTES) != -1:
+                raise BinaryFileError(f"{path.name} is a binary file")
+            size = len(mm)
+            total = self._count_lines(mm)
+
+            line, begin = 1, 0
+            first = max(start, 1)
+            while line < first and begin != -1:
+                begin = mm.find(b"\n", begin) + 1 or -1
+                line += 1
+            if begin == -1 or begin >= size:
+                return "", total
+            stop = begin
+            last = total if end is None else min(end, total)
+            while line <= last:
+                stop = mm.find(b"\n", stop)
+                if stop == -1:
+                    stop = size
+                    break
+                stop += 1
+                line += 1
+            return mm[begin:stop].decode("utf-8", errors="replace"), total
+
+
+# Shared by ToolRegistry and ContextBuilder so a file read through either is cached once.
+shared_cache = FileCache()
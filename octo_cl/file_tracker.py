@@ -0,0 +1,100 @@
+# octo_cl/file_tracker.py
+
+import difflib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from octo_cl.file_cache import FileCache, shared_cache
+
+
+class FileTracker:
+    """
+    The version of each file the model has seen in this session.
+
+    Files are recorded when they are added to the conversation (/add,
+    read_file) or written by the model itself. `poll()` stats every tracked
+    file, reads only those whose mtime or size changed, and describes real
+    content changes (made by a shell command, a formatter or the user's
+    editor) as unified diffs, so the model's copy stays correct without
+    re-sending whole files. A change whose diff is larger than `max_diff_lines`
+    is reported as such and the file is dropped until it is read again.
+    """
+
+    def __init__(self, root_dir: Path, file_cache: Optional[FileCache] = None, max_diff_lines: int = 120, context_lines: int = 2):
+        self.root_dir = Path(root_dir).resolve()
+        self.file_cache = file_cache or shared_cache
+        self.max_diff_lines = max_diff_lines
+        self.context_lines = context_lines
+        # rel_path -> (mtime_ns, size, text)
+        self.files: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _rel_path(self, path: str) -> Optional[str]:
+        try:
+            return (self.root_dir / path).resolve().relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return None
+
+    def record(self, path: str, text: Optional[str] = None):
+        """Marks `path` as seen by the model, with `text` as its content (read from disk if omitted)."""
+        rel_path = self._rel_path(path)
+        if rel_path is None:
+            return
+        full_path = self.root_dir / rel_path
+        try:
+            st = os.stat(full_path)
+            if text is None:
+                text = self.file_cache.read_text(full_path)
+        except (OSError, ValueError):
+            self.forget(rel_path)
+            return
+        with self._lock:
+            self.files[rel_path] = (st.st_mtime_ns, st.st_size, text)
+
+    def forget(self, path: str):
+        rel_path = self._rel_path(path)
+        with self._lock:
+            self.files.pop(rel_path, None)
+
+    def poll(self) -> str:
+        """Describes what changed in tracked files since the model last saw them, or returns "" if nothing did."""
+        with self._lock:
+            tracked = list(self.files.items())
+        notes: List[str] = []
+        for rel_path, (mtime, size, old) in tracked:
+            full_path = self.root_dir / rel_path
+            try:
+                st = os.stat(full_path)
+            except FileNotFoundError:
+                notes.append(f"{rel_path} was deleted.")
+                self.forget(rel_path)
+                continue
+            except OSError:
+                continue
+            if st.st_mtime_ns == mtime and st.st_size == size:
+                continue
+            try:
+                new = self.file_cache.read_text(full_path)
+            except (OSError, ValueError):
+                notes.append(f"{rel_path} changed and can no longer be read as text.")
+                self.forget(rel_path)
+                continue
+            if new == old:
+                with self._lock:
+                    self.files[rel_path] = (st.st_mtime_ns, st.st_size, new)  # touched, not changed
+                continue
+            diff = list(difflib.unified_diff(
+                old.splitlines(), new.splitlines(), f"a/{rel_path}", f"b/{rel_path}", n=self.context_lines, lineterm="",
+            ))
+            if len(diff) > self.max_diff_lines:
+                notes.append(f"{rel_path} changed substantially ({len(diff)} diff lines); read it again before relying on it.")
+                self.forget(rel_path)
+                continue
+            notes.append("```diff\n" + "\n".join(diff) + "\n```")
+            with self._lock:
+                self.files[rel_path] = (st.st_mtime_ns, st.st_size, new)
+        if not notes:
+            return ""
+        return "Files you have seen changed on disk since you last read them:\n" + "\n".join(notes)
@@ -0,0 +1,108 @@
+# octo_cl/history.py
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from octo_cl.context_packer import CHARS_PER_TOKEN, estimate_tokens
+
+SUMMARY_PREFIX = "Summary of earlier conversation (older turns were compacted):"
+_ELIDED = "characters elided from history"
+_TOOL_CALL = re.compile(r'<tool_call:(\w+)\s+([^>]*?)\s*/?>')
+
+
+class HistoryManager:
+    """
+    Keeps the chat `messages` list within a token budget.
+
+    Compaction only runs once the budget is crossed and then shrinks the history
+    well below it, so the prompt prefix stays unchanged for many turns and
+    Ollama's prompt cache keeps hitting. The system message is never modified.
+
+    1. Old oversized messages (tool results, /add'ed files, retrieved snippets)
+       are cut down to their head and tail.
+    2. If that is not enough, older turns are folded into one extractive
+       summary message placed right after the system prompt.
+    3. If a recent message is still too large on its own (a long tool
+       result), the largest recent messages are cut down until the history fits.
+    """
+
+    def __init__(self, token_budget: int = 12000, keep_recent: int = 6, target_ratio: float = 0.6, max_message_chars: int = 1500):
+        self.token_budget = token_budget
+        self.keep_recent = max(1, keep_recent)
+        self.target_ratio = target_ratio
+        self.max_message_chars = max_message_chars
+        self._token_cache: Dict[str, int] = {}
+
+    def count(self, message: Dict[str, str]) -> int:
+        """Estimated tokens for one message, including a small per-message overhead."""
+        content = message.get("content", "")
+        if content not in self._token_cache:
+            self._token_cache[content] = estimate_tokens(content) + 4
+        return self._token_cache[content]
+
+    def total(self, messages: List[Dict[str, str]]) -> int:
+        return sum(self.count(m) for m in messages)
+
+    def compact(self, messages: List[Dict[str, str]]) -> Optional[Tuple[int, int]]:
+        """Compacts `messages` in place if over budget. Returns (tokens before, tokens after) or None."""
+        before = self.total(messages)
+        if before <= self.token_budget:
+            return None
+        target = self.token_budget * self.target_ratio
+        head = 1 if messages and messages[0].get("role") == "system" else 0
+        cut = max(head, len(messages) - self.keep_recent)
+
+        for i in range(head, cut):
+            content = messages[i].get("content", "")
+            if len(content) > self.max_message_chars and not self._compacted(content):
+                messages[i] = {**messages[i], "content": self._elide(content, self.max_message_chars)}
+
+        # Only re-summarize when a message has left the recent window since the last summary.
+        if self.total(messages) > target and any(not messages[i].get("content", "").startswith(SUMMARY_PREFIX) for i in range(head, cut)):
+            messages[head:cut] = [{"role": "user", "content": self._summarize(messages[head:cut])}]
+            cut = head + 1
+
+        # A recent message can be too large on its own (a long tool result); cut the largest down to fit.
+        recent = sorted(range(cut, len(messages)), key=lambda i: -self.count(messages[i]))
+        for i in recent:
+            excess = self.total(messages) - target
+            if excess <= 0:
+                break
+            content = messages[i].get("content", "")
+            # Leave room for the elision marker line.
+            keep_chars = max(self.max_message_chars, int(self.count(messages[i]) - excess) * CHARS_PER_TOKEN - 100)
+            if len(content) > keep_chars:
+                messages[i] = {**messages[i], "content": self._elide(content, keep_chars)}
+
+        self._token_cache = {m.get("content", ""): self.count(m) for m in messages}
+        return before, self.total(messages)
+
+    @staticmethod
+    def _compacted(content: str) -> bool:
+        return content.startswith(SUMMARY_PREFIX) or _ELIDED in content
+
+    def _elide(self, content: str, max_chars: int) -> str:
+        keep = max_chars // 2
+        omitted = len(content) - 2 * keep
+        return f"{content[:keep]}\n[... {omitted:,} {_ELIDED} ...]\n{content[-keep:]}"
+
+    def _summarize(self, older: List[Dict[str, str]]) -> str:
+        lines: List[str] = []
+        for message in older:
+            content = message.get("content", "")
+            if content.startswith(SUMMARY_PREFIX):
+                lines.extend(content.splitlines()[1:])
+                continue
+            first_line = content.strip().split("\n", 1)[0][:160]
+            if message.get("role") == "assistant":
+                calls = [f"{name}({params.strip()[:80]})" for name, params in _TOOL_CALL.findall(content)]
+                lines.append(f"- Assistant: {first_line}" + (f" [called: {', '.join(calls)}]" if calls else ""))
+            elif first_line.startswith("Tool Result ("):
+                lines.append(f"- {first_line}")
+            else:
+                lines.append(f"- User: {first_line}")
+        # Keep the summary itself bounded across repeated compactions.
+        budget = self.max_message_chars * 2
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > budget:
+            lines.pop(0)
+        return "\n".join([SUMMARY_PREFIX] + lines)
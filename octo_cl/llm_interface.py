@@ -1,57 +1,336 @@
 # octo_cl/llm_interface.py
 
+import asyncio
 import json
+import time
 import httpx
-from typing import Generator, List, Dict, Optional
+from typing import Any, AsyncGenerator, Generator, List, Dict, Optional, Tuple, Union
+from octo_cl.response_cache import ResponseCache, cache_key, is_deterministic
+from octo_cl.telemetry import OLLAMA_STAT_KEYS
 
-class OllamaClient:
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "qwen2.5-coder:7b"):
-        self.base_url = base_url
+# Transient failures worth retrying: the server is restarting, busy or briefly unreachable.
+RETRY_STATUS_CODES = {502, 503, 504}
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+# chat() reports failures in-band, as a final chunk starting with this markup.
+ERROR_PREFIX = "\n[bold red]Error:[/bold red] "
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, response: httpx.Response):
+        self.response = response
+
+
+class _OllamaBase:
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "qwen2.5-coder:7b",
+        connect_timeout: float = 2.0,
+        read_timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        max_connections: int = 4,
+        keepalive_expiry: float = 60.0,
+        keep_alive: Optional[Union[str, int]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
         self.model = model
+        # How long Ollama keeps the model loaded after a request (e.g. "30m", 3600, -1 for forever),
+        # and model options such as num_ctx. Both go out with every request: a request with different
+        # options (notably num_ctx) makes Ollama reload the model.
+        self.keep_alive = keep_alive
+        self.options = dict(options or {})
+        # Replays earlier responses to identical requests; only consulted when sampling is deterministic.
+        self.response_cache = response_cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        # Generation can stall for minutes while a model loads, so streams never time out on reads.
+        self.stream_timeout = httpx.Timeout(None, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=keepalive_expiry)
+        # Timing and token counters of the most recent chat() call.
+        self.last_stats: Dict[str, Any] = {}
+        # Wall time and Ollama's load_duration of the last warm_up() call.
+        self.warmup_stats: Dict[str, Any] = {}
 
-    def check_connection(self) -> bool:
-        """Checks if the Ollama server is reachable."""
+    def _start_stats(self) -> float:
+        self.last_stats = {}
+        return time.perf_counter()
+
+    def _record_chunk(self, chunk: dict, started: float):
+        """Notes time to first token and keeps the counters from the final `done` chunk."""
+        if "ttft_s" not in self.last_stats and chunk.get("message", {}).get("content"):
+            self.last_stats["ttft_s"] = time.perf_counter() - started
+        if chunk.get("done"):
+            self.last_stats.update({k: chunk[k] for k in OLLAMA_STAT_KEYS if k in chunk})
+
+    def _finish_stats(self, started: float):
+        self.last_stats["wall_s"] = time.perf_counter() - started
+
+    def _model_in(self, available_names: List[str]) -> bool:
+        # Check for exact match or name-only match (without tag)
+        return self.model in available_names or any(m.startswith(f"{self.model}:") for m in available_names)
+
+    def _model_payload(self) -> dict:
+        payload: Dict[str, Any] = {"model": self.model}
+        if self.options:
+            payload["options"] = self.options
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _chat_payload(self, messages: List[Dict[str, str]]) -> dict:
+        return {
+            **self._model_payload(),
+            "messages": messages,
+            "stream": True
+        }
+
+    def _cache_key(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        if self.response_cache is None or not is_deterministic(self.options):
+            return None
+        return cache_key(self.model, self.options, messages)
+
+    def _record_replay(self, started: float):
+        # A replayed response did no decoding, so there are no Ollama counters to report.
+        self.last_stats["cache_hit"] = True
+        self.last_stats["ttft_s"] = time.perf_counter() - started
+
+    def _warmup_payload(self) -> dict:
+        # A chat request without messages just loads the model.
+        return {**self._model_payload(), "messages": [], "stream": False}
+
+    def _record_warmup(self, body: dict, started: float) -> Dict[str, Any]:
+        self.warmup_stats = {"wall_s": time.perf_counter() - started, "load_duration": body.get("load_duration", 0)}
+        return self.warmup_stats
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt)
+
+
+class OllamaClient(_OllamaBase):
+    """
+    Synchronous Ollama client backed by one long-lived, pooled `httpx.Client`.
+
+    Connections are kept alive between requests, and connection failures or
+    502/503/504 responses are retried with exponential backoff.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "qwen2.5-coder:7b", transport: Optional[httpx.BaseTransport] = None, **kwargs):
+        super().__init__(base_url, model, **kwargs)
+        self._client = httpx.Client(base_url=self.base_url, timeout=self.timeout, limits=self.limits, transport=transport)
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get(self, path: str) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._client.get(path)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+            except RETRY_EXCEPTIONS:
+                if attempt == self.max_retries:
+                    raise
+            time.sleep(self._delay(attempt))
+
+    def list_models(self) -> Optional[List[str]]:
+        """Returns the names of locally available models, or None if the server is unreachable."""
         try:
-            response = httpx.get(f"{self.base_url}/api/tags", timeout=2.0)
-            return response.status_code == 200
+            response = self._get("/api/tags")
+            if response.status_code != 200:
+                return None
+            return [m["name"] for m in response.json().get("models", [])]
         except Exception:
-            return False
+            return None
+
+    def preflight(self) -> Tuple[bool, bool]:
+        """Checks reachability and model availability with a single /api/tags request."""
+        names = self.list_models()
+        if names is None:
+            return False, False
+        return True, self._model_in(names)
+
+    def check_connection(self) -> bool:
+        """Checks if the Ollama server is reachable."""
+        return self.preflight()[0]
 
     def is_model_available(self) -> bool:
         """Checks if the specified model is pulled and available."""
+        return self.preflight()[1]
+
+    def warm_up(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads the model into memory so the first real request doesn't wait for it.
+
+        Best effort: returns `warmup_stats`, or None if the request failed.
+        """
+        started = time.perf_counter()
         try:
-            response = httpx.get(f"{self.base_url}/api/tags", timeout=2.0)
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                # Check for exact match or name-only match (without tag)
-                available_names = [m["name"] for m in models]
-                return self.model in available_names or any(m.startswith(f"{self.model}:") for m in available_names)
-            return False
+            response = self._client.post("/api/chat", json=self._warmup_payload(), timeout=self.stream_timeout)
+            response.raise_for_status()
+            return self._record_warmup(response.json(), started)
         except Exception:
-            return False
+            return None
 
     def chat(self, messages: List[Dict[str, str]]) -> Generator[str, None, None]:
         """
         Sends a chat request to Ollama and yields the response chunks.
+
+        Failures are reported in-band, as a final chunk starting with ERROR_PREFIX.
         """
-        url = f"{self.base_url}/api/chat"
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "stream": True
-        }
+        try:
+            yield from self.stream_chat(messages)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            yield f"{ERROR_PREFIX}Could not connect to Ollama at {self.base_url}. Is it running?"
+        except Exception as e:
+            yield f"{ERROR_PREFIX}{str(e)}"
+
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Generator[str, None, None]:
+        """Like chat(), but raises (httpx errors, bad status codes) instead of yielding an error message."""
+        payload = self._chat_payload(messages)
+        started = self._start_stats()
+        key = self._cache_key(messages)
+        cached = self.response_cache.get(key) if key else None
+        if cached is not None:
+            self._record_replay(started)
+            try:
+                yield from cached
+            finally:
+                self._finish_stats(started)
+            return
+        chunks: List[str] = []
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with self._client.stream("POST", "/api/chat", json=payload, timeout=self.stream_timeout) as response:
+                        if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            raise _RetryableStatus(response)
+                        response.raise_for_status()
+                        for line in response.iter_lines():
+                            if line:
+                                chunk = json.loads(line)
+                                self._record_chunk(chunk, started)
+                                if "message" in chunk and "content" in chunk["message"]:
+                                    chunks.append(chunk["message"]["content"])
+                                    yield chunk["message"]["content"]
+                                if chunk.get("done"):
+                                    # Only complete responses are cached, never ones the caller cut short.
+                                    if key:
+                                        self.response_cache.put(key, chunks, self.model)
+                                    break
+                    return
+                except (_RetryableStatus, httpx.ConnectError, httpx.ConnectTimeout):
+                    # Nothing has been yielded yet, so the request can safely be replayed.
+                    if attempt == self.max_retries:
+                        raise
+                    time.sleep(self._delay(attempt))
+        finally:
+            self._finish_stats(started)
+
+
+class AsyncOllamaClient(_OllamaBase):
+    """`OllamaClient` counterpart for asyncio callers, backed by a pooled `httpx.AsyncClient`."""
+
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "qwen2.5-coder:7b", transport: Optional[httpx.AsyncBaseTransport] = None, **kwargs):
+        super().__init__(base_url, model, **kwargs)
+        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits, transport=transport)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def list_models(self) -> Optional[List[str]]:
+        """Returns the names of locally available models, or None if the server is unreachable."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.get("/api/tags")
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    await asyncio.sleep(self._delay(attempt))
+                    continue
+                if response.status_code != 200:
+                    return None
+                return [m["name"] for m in response.json().get("models", [])]
+            except RETRY_EXCEPTIONS:
+                if attempt == self.max_retries:
+                    return None
+                await asyncio.sleep(self._delay(attempt))
+            except Exception:
+                return None
+        return None
+
+    async def preflight(self) -> Tuple[bool, bool]:
+        """Checks reachability and model availability with a single /api/tags request."""
+        names = await self.list_models()
+        if names is None:
+            return False, False
+        return True, self._model_in(names)
+
+    async def warm_up(self) -> Optional[Dict[str, Any]]:
+        """Loads the model into memory; returns `warmup_stats`, or None if the request failed."""
+        started = time.perf_counter()
+        try:
+            response = await self._client.post("/api/chat", json=self._warmup_payload(), timeout=self.stream_timeout)
+            response.raise_for_status()
+            return self._record_warmup(response.json(), started)
+        except Exception:
+            return None
 
+    async def chat(self, messages: List[Dict[str, str]]) -> AsyncGenerator[str, None]:
+        """Sends a chat request to Ollama and yields the response chunks."""
+        payload = self._chat_payload(messages)
+        started = self._start_stats()
+        key = self._cache_key(messages)
+        cached = self.response_cache.get(key) if key else None
+        if cached is not None:
+            self._record_replay(started)
+            try:
+                for text in cached:
+                    yield text
+            finally:
+                self._finish_stats(started)
+            return
+        chunks: List[str] = []
         try:
-            with httpx.stream("POST", url, json=payload, timeout=None) as response:
-                response.raise_for_status()
-                for line in response.iter_lines():
-                    if line:
-                        chunk = json.loads(line)
-                        if "message" in chunk and "content" in chunk["message"]:
-                            yield chunk["message"]["content"]
-                        if chunk.get("done"):
-                            break
-        except httpx.ConnectError:
-            yield f"\n[bold red]Error:[/bold red] Could not connect to Ollama at {self.base_url}. Is it running?"
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with self._client.stream("POST", "/api/chat", json=payload, timeout=self.stream_timeout) as response:
+                        if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            raise _RetryableStatus(response)
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if line:
+                                chunk = json.loads(line)
+                                self._record_chunk(chunk, started)
+                                if "message" in chunk and "content" in chunk["message"]:
+                                    chunks.append(chunk["message"]["content"])
+                                    yield chunk["message"]["content"]
+                                if chunk.get("done"):
+                                    if key:
+                                        self.response_cache.put(key, chunks, self.model)
+                                    break
+                    return
+                except (_RetryableStatus, httpx.ConnectError, httpx.ConnectTimeout):
+                    if attempt == self.max_retries:
+                        raise
+                    await asyncio.sleep(self._delay(attempt))
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            yield f"{ERROR_PREFIX}Could not connect to Ollama at {self.base_url}. Is it running?"
         except Exception as e:
-            yield f"\n[bold red]Error:[/bold red] {str(e)}"
+            yield f"{ERROR_PREFIX}{str(e)}"
+        finally:
+            self._finish_stats(started)
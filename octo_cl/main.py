@@ -2,64 +2,104 @@
 
 import typer
 from rich.console import Console
-from rich.live import Live
-from rich.markdown import Markdown
-from rich.panel import Panel
-from octo_cl.llm_interface import OllamaClient
-from octo_cl.context_builder import ContextBuilder
+from rich.markup import escape
+from octo_cl.context_builder import OCTO_DIR, ContextBuilder
 from octo_cl.tools import ToolRegistry
+from octo_cl.scheduler import ToolScheduler
+from octo_cl.tool_parser import StreamingToolParser
+from octo_cl.history import HistoryManager
+from octo_cl.renderer import StreamRenderer
+from octo_cl.telemetry import SessionTelemetry
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import json
 import os
-import re
 import sys
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 import subprocess
 import time
 import shutil
-from dotenv import load_dotenv
 
-load_dotenv()
+if TYPE_CHECKING:
+    from octo_cl.llm_interface import OllamaClient
+
+# httpx (via llm_interface), rich.panel/table/markdown/live and python-dotenv are
+# imported where they are first needed, so they stay off the path to the prompt.
+
+def _load_env():
+    """Loads the .env file `load_dotenv()` would find, importing python-dotenv only if there is one."""
+    main_module = sys.modules.get("__main__")
+    if not hasattr(main_module, "__file__") or getattr(sys, "frozen", False):
+        start = Path.cwd()
+    else:
+        start = Path(__file__).resolve().parent
+    for directory in (start, *start.parents):
+        env_file = directory / ".env"
+        if env_file.is_file():
+            from dotenv import load_dotenv
+            load_dotenv(env_file)
+            return
+
+_load_env()
 
 app = typer.Typer()
 console = Console()
 
 # Configuration
 DEFAULT_MODEL = os.getenv("OCTO_MODEL", "qwen2.5-coder:7b")
+# One URL, or several (comma- or space-separated) to spread sessions over multiple Ollama servers.
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+HEALTH_CHECK_INTERVAL = float(os.getenv("OLLAMA_HEALTH_CHECK_INTERVAL", "30"))
+TREE_TOKENS = int(os.getenv("OCTO_TREE_TOKENS", "2000"))
+MAP_TOKENS = int(os.getenv("OCTO_MAP_TOKENS", "1000"))
+RETRIEVAL_TOP_K = int(os.getenv("OCTO_RETRIEVAL_TOP_K", "3"))
+RETRIEVAL_MIN_SCORE = float(os.getenv("OCTO_RETRIEVAL_MIN_SCORE", "0.8"))
+HISTORY_TOKENS = int(os.getenv("OCTO_HISTORY_TOKENS", "12000"))
+CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "2.0"))
+READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "10.0"))
+MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "2"))
+STOP_ON_TOOL_CALL = os.getenv("OCTO_STOP_ON_TOOL_CALL", "0").lower() in ("1", "true", "yes")
+PLAIN_OUTPUT = os.getenv("OCTO_PLAIN_OUTPUT", "0").lower() in ("1", "true", "yes")
+SHELL_TIMEOUT = float(os.getenv("OCTO_SHELL_TIMEOUT", "120"))
+SHELL_MAX_BYTES = int(os.getenv("OCTO_SHELL_MAX_BYTES", "32768"))
+SHELL_MAX_LINES = int(os.getenv("OCTO_SHELL_MAX_LINES", "400"))
+TRACE_FILE = os.getenv("OCTO_TRACE_FILE") or None
+KEEP_ALIVE = os.getenv("OCTO_KEEP_ALIVE") or None
+NUM_CTX = int(os.getenv("OCTO_NUM_CTX", "0"))
+MODEL_OPTIONS = os.getenv("OCTO_MODEL_OPTIONS", "")
+WARMUP = os.getenv("OCTO_WARMUP", "1").lower() in ("1", "true", "yes")
+BATCH_CONCURRENCY = int(os.getenv("OCTO_BATCH_CONCURRENCY", "2"))
+RESPONSE_CACHE = os.getenv("OCTO_RESPONSE_CACHE", "0").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MB = int(os.getenv("OCTO_RESPONSE_CACHE_MB", "256"))
+
+def _parse_value(value: str):
+    """Reads '8192' as a number, 'true' as a bool and anything that isn't JSON (e.g. '30m') as a string."""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+def model_options(num_ctx: int = 0, pairs: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Merges OCTO_MODEL_OPTIONS (a JSON object), --num-ctx and --option key=value pairs; later ones win."""
+    options = json.loads(MODEL_OPTIONS) if MODEL_OPTIONS.strip() else {}
+    if num_ctx:
+        options["num_ctx"] = num_ctx
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep or not key.strip():
+            raise typer.BadParameter(f"expected key=value, got {pair!r}", param_hint="--option")
+        options[key.strip()] = _parse_value(value.strip())
+    return options
 
 def parse_tool_calls(text: str):
-    """Parses tool calls from LLM response."""
-    # Pattern for <tool_call:name param="val" />
-    single_pattern = r'<tool_call:(\w+)\s+([^>]*)\s*/>'
-    # Pattern for <tool_call:name param="val">content</tool_call:name>
-    content_pattern = r'<tool_call:(\w+)\s+([^>]*)>(.*?)</tool_call:\1>'
-    
-    calls = []
-    
-    # Find calls with content (like write_file)
-    for match in re.finditer(content_pattern, text, re.DOTALL):
-        name = match.group(1)
-        params_str = match.group(2)
-        content = match.group(3)
-        
-        params = {}
-        for p_match in re.finditer(r'(\w+)="([^"]*)"', params_str):
-            params[p_match.group(1)] = p_match.group(2)
-        params['content'] = content
-        calls.append({"name": name, "params": params, "full_match": match.group(0)})
-        
-    # Find single-line calls
-    for match in re.finditer(single_pattern, text):
-        name = match.group(1)
-        params_str = match.group(2)
-        
-        params = {}
-        for p_match in re.finditer(r'(\w+)="([^"]*)"', params_str):
-            params[p_match.group(1)] = p_match.group(2)
-        calls.append({"name": name, "params": params, "full_match": match.group(0)})
-        
-    return calls
+    """Parses tool calls from LLM response, in the order they appear."""
+    parser = StreamingToolParser()
+    return parser.feed(text)
 
-def try_start_ollama():
+def try_start_ollama(client: "OllamaClient"):
     """Attempts to start the Ollama server if it's installed."""
+    from rich.panel import Panel
     ollama_path = shutil.which("ollama")
     if not ollama_path:
         console.print(Panel(
@@ -81,7 +121,7 @@ def try_start_ollama():
         with console.status("[bold green]Waiting for Ollama to respond...[/bold green]"):
             for _ in range(10):
                 time.sleep(1)
-                if OllamaClient(base_url=OLLAMA_URL).check_connection():
+                if client.check_connection():
                     console.print("[bold green]Ollama is now running![/bold green]")
                     return True
         
@@ -91,18 +131,47 @@ def try_start_ollama():
 @app.command()
 def chat(
     model: str = typer.Option(DEFAULT_MODEL, "--model", "-m", help="The Ollama model to use."),
+    stop_on_tool_call: bool = typer.Option(
+        STOP_ON_TOOL_CALL, "--stop-on-tool-call/--no-stop-on-tool-call",
+        help="End generation as soon as the model emits a complete tool call.",
+    ),
+    plain: bool = typer.Option(PLAIN_OUTPUT, "--plain", help="Print responses as raw text instead of rendered Markdown."),
+    trace: Optional[str] = typer.Option(TRACE_FILE, "--trace", help="Append per-turn performance data to this JSONL file."),
+    keep_alive: Optional[str] = typer.Option(KEEP_ALIVE, "--keep-alive", help="How long Ollama keeps the model loaded, e.g. 30m or -1 (forever)."),
+    num_ctx: int = typer.Option(NUM_CTX, "--num-ctx", help="Context window size in tokens (0 = model default)."),
+    option: Optional[List[str]] = typer.Option(None, "--option", "-o", help="Extra model option as key=value, e.g. -o temperature=0.2. Repeatable."),
+    warmup: bool = typer.Option(WARMUP, "--warmup/--no-warmup", help="Load the model in the background while the session starts."),
+    cache: bool = typer.Option(RESPONSE_CACHE, "--cache/--no-cache", help="Replay cached responses to identical requests (needs temperature=0 or a fixed seed)."),
 ):
     """
     Start an interactive chat session with octo-cl.
     """
-    client = OllamaClient(base_url=OLLAMA_URL, model=model)
-    
+    from rich.panel import Panel
+
+    options = model_options(num_ctx, option)
+    telemetry = SessionTelemetry(model=model, trace_path=trace)
+    response_cache = _response_cache(cache, options)
+
     # --- Pre-flight Checks ---
-    if not client.check_connection():
-        if not try_start_ollama():
+    # The HTTP checks (and the httpx import) run while the project tree is walked,
+    # and the model starts loading as soon as it is known to exist.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(
+            _connect, model, _parse_value(keep_alive) if keep_alive else None, options,
+            response_cache=response_cache, warm_up_telemetry=telemetry if warmup else None,
+        )
+        cb = ContextBuilder(tree_token_budget=TREE_TOKENS, map_token_budget=MAP_TOKENS)
+        system_prompt = cb.build_system_prompt()
+        client, (reachable, model_available) = pending.result()
+
+    if not reachable:
+        if not try_start_ollama(client):
             sys.exit(1)
+        model_available = client.is_model_available()
+        if model_available and warmup:
+            _start_warm_up(client, telemetry)
 
-    if not client.is_model_available():
+    if not model_available:
         console.print(Panel(
             f"[bold red]Error:[/bold red] Model [bold cyan]{model}[/bold cyan] not found in Ollama.\n\n"
             f"Run [bold green]ollama pull {model}[/bold green] to download it first.",
@@ -111,13 +180,38 @@ def chat(
         sys.exit(1)
     # -------------------------
 
-    cb = ContextBuilder()
-    tools = ToolRegistry()
+    shell_status = console.status("")
+
+    def shell_progress(status_line):
+        if status_line is None:
+            shell_status.stop()
+        else:
+            shell_status.update(f"[bold green]Running:[/bold green] {escape(status_line)}")
+            shell_status.start()
+
+    tools = ToolRegistry(
+        shell_timeout=SHELL_TIMEOUT,
+        max_output_bytes=SHELL_MAX_BYTES,
+        max_output_lines=SHELL_MAX_LINES,
+        progress=shell_progress,
+        repo_map=cb.get_repo_map,
+        search_code=cb.search_code,
+    )
+    history = HistoryManager(token_budget=HISTORY_TOKENS)
     
-    system_prompt = cb.build_system_prompt()
     messages = [{"role": "system", "content": system_prompt}]
+    # The system prompt is rebuilt once for the first message: the tree is packed
+    # around what it asks about, and the repository map (built in the background)
+    # joins it if ready. After the first request the prompt is left as is.
+    system_prompt_final = False
     
     console.print(f"[bold blue]octo-cl[/bold blue] (model: {model}) is ready. Type 'exit' or '/help'.")
+    if not plain:
+        # Load the Markdown renderer while the user types the first message.
+        threading.Thread(target=StreamRenderer.preload, daemon=True).start()
+    if RETRIEVAL_TOP_K > 0:
+        # Build the retrieval index while the user types, too.
+        cb.refresh_index()
     
     while True:
         try:
@@ -128,57 +222,295 @@ def chat(
             if user_input.lower() in ["exit", "quit"]:
                 break
             if user_input == "/help":
-                console.print("[bold cyan]Commands:[/bold cyan]\n  /add <file> - Add file to context\n  exit, quit  - End session")
+                console.print(
+                    "[bold cyan]Commands:[/bold cyan]\n"
+                    "  /add <file> - Add file to context\n"
+                    "  /stats      - Show session performance statistics\n"
+                    "  exit, quit  - End session"
+                )
+                continue
+            if user_input == "/stats":
+                print_stats(telemetry, response_cache)
                 continue
             if user_input.startswith("/add "):
                 file_path = user_input.split(" ", 1)[1]
                 content = cb.get_file_content(file_path)
+                if not content.startswith("Error:"):
+                    tools.file_tracker.record(file_path)
                 messages.append({"role": "user", "content": f"Content of {file_path}:\n{content}"})
                 console.print(f"[bold yellow]Added {file_path} to context.[/bold yellow]")
                 continue
 
-            messages.append({"role": "user", "content": user_input})
+            inject_file_changes(messages, tools)
+            snippets = cb.get_relevant_snippets(user_input, top_k=RETRIEVAL_TOP_K, min_score=RETRIEVAL_MIN_SCORE)
+            if snippets:
+                console.print(f"[dim]Retrieved {snippets.count('--- SNIPPET:')} relevant snippet(s).[/dim]")
+                messages.append({"role": "user", "content": f"{user_input}\n\nPossibly relevant code from the project:\n{snippets}"})
+            else:
+                messages.append({"role": "user", "content": user_input})
             
-            process_ai_response(client, messages, tools)
+            if not system_prompt_final:
+                messages[0]["content"] = cb.build_system_prompt(query=user_input)
+            system_prompt_final = True
+            process_ai_response(
+                client, messages, tools, history,
+                stop_on_tool_call=stop_on_tool_call, plain=plain, telemetry=telemetry,
+            )
             
         except KeyboardInterrupt:
             console.print("\n[yellow]Session interrupted.[/yellow]")
             continue
 
-def process_ai_response(client, messages, tools):
+@app.command()
+def batch(
+    source: str = typer.Argument(..., help="A JSONL file of tasks ({\"prompt\": ..., \"id\": ..., \"files\": [...]}) or a file glob such as 'src/**/*.py'."),
+    prompt: Optional[str] = typer.Option(None, "--prompt", "-p", help="Prompt for each file matched by a glob; {path} is replaced by the file's path."),
+    output: str = typer.Option("octo-batch.jsonl", "--output", help="JSONL file results are appended to."),
+    concurrency: int = typer.Option(BATCH_CONCURRENCY, "--concurrency", "-j", help="Number of sessions running at once."),
+    max_turns: int = typer.Option(10, "--max-turns", help="Model responses allowed per task."),
+    allow: str = typer.Option("write_file,edit_file", "--allow", help="Comma-separated tools with side effects the agent may use (read-only tools are always allowed)."),
+    resume: bool = typer.Option(True, "--resume/--no-resume", help="Skip tasks that already finished ok in the output file; failed and incomplete tasks run again."),
+    model: str = typer.Option(DEFAULT_MODEL, "--model", "-m", help="The Ollama model to use."),
+    keep_alive: Optional[str] = typer.Option(KEEP_ALIVE, "--keep-alive", help="How long Ollama keeps the model loaded, e.g. 30m or -1 (forever)."),
+    num_ctx: int = typer.Option(NUM_CTX, "--num-ctx", help="Context window size in tokens (0 = model default)."),
+    option: Optional[List[str]] = typer.Option(None, "--option", "-o", help="Extra model option as key=value. Repeatable."),
+    cache: bool = typer.Option(RESPONSE_CACHE, "--cache/--no-cache", help="Replay cached responses to identical requests (needs temperature=0 or a fixed seed)."),
+):
+    """
+    Run octo-cl non-interactively over many tasks and write the results as JSONL.
+    """
+    from octo_cl.batch import BatchRunner, load_tasks
+
+    options = model_options(num_ctx, option)
+    keep_alive_value = _parse_value(keep_alive) if keep_alive else None
+    response_cache = _response_cache(cache, options)
+
+    def make_client():
+        return _make_client(model, keep_alive=keep_alive_value, options=options, response_cache=response_cache)
+
+    with make_client() as client:
+        reachable, model_available = client.preflight()
+    if not reachable:
+        console.print(f"[bold red]Error:[/bold red] Could not connect to Ollama at {OLLAMA_URL}.")
+        sys.exit(1)
+    if not model_available:
+        console.print(f"[bold red]Error:[/bold red] Model {model} not found. Run 'ollama pull {model}' first.")
+        sys.exit(1)
+
+    cb = ContextBuilder(tree_token_budget=TREE_TOKENS, map_token_budget=MAP_TOKENS)
+    try:
+        tasks = load_tasks(source, cb, prompt)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="SOURCE") from None
+    if not tasks:
+        console.print(f"[yellow]No tasks found in {source}.[/yellow]")
+        return
+
+    runner = BatchRunner(
+        make_client,
+        cb,
+        concurrency=concurrency,
+        max_turns=max_turns,
+        allowed_tools=[name.strip() for name in allow.split(",") if name.strip()],
+        retrieval_top_k=RETRIEVAL_TOP_K,
+        retrieval_min_score=RETRIEVAL_MIN_SCORE,
+        history_tokens=HISTORY_TOKENS,
+        tool_options={
+            "shell_timeout": SHELL_TIMEOUT,
+            "max_output_bytes": SHELL_MAX_BYTES,
+            "max_output_lines": SHELL_MAX_LINES,
+            "repo_map": cb.get_repo_map,
+            "search_code": cb.search_code,
+        },
+    )
+    finished = 0
+
+    def report(result):
+        nonlocal finished
+        finished += 1
+        detail = result.get("error") or f"{result.get('turns', 0)} turns, {result.get('wall_s', 0):.1f}s"
+        console.print(f"[{finished}/{len(tasks)}] {escape(str(result['id']))}: {result['status']} ({escape(detail)})", highlight=False)
+
+    summary = runner.run(tasks, output, resume=resume, on_result=report)
+    console.print(
+        f"Done: {summary['ok']} ok, {summary['incomplete']} incomplete, {summary['error']} failed, "
+        f"{summary['skipped']} skipped in {summary['elapsed_s']:.1f}s: "
+        f"{summary['tasks_per_min']:.1f} tasks/min, {summary['tokens_per_s']:.1f} tokens/s. Results in {output}.",
+        highlight=False,
+    )
+    if response_cache:
+        cache_stats = response_cache.stats()
+        console.print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.", highlight=False)
+    if summary["error"]:
+        sys.exit(1)
+
+def cli():
+    """Console entry point; `octo` without a command (or with only chat options) starts a chat session."""
+    commands = {command.name or command.callback.__name__ for command in app.registered_commands}
+    if len(sys.argv) < 2 or sys.argv[1] not in commands | {"--help", "--install-completion", "--show-completion"}:
+        sys.argv.insert(1, "chat")
+    app()
+
+_endpoint_pool = None
+_endpoint_pool_lock = threading.Lock()
+
+def _make_client(model: str, **kwargs):
+    """
+    Returns a client for OLLAMA_URL: an `OllamaClient` for a single server, or a
+    session on a shared `EndpointPool` when several servers are listed.
+    """
+    from octo_cl.endpoint_pool import EndpointPool, parse_endpoints
+    from octo_cl.llm_interface import OllamaClient
+
+    global _endpoint_pool
+    kwargs = {"connect_timeout": CONNECT_TIMEOUT, "read_timeout": READ_TIMEOUT, "max_retries": MAX_RETRIES, **kwargs}
+    urls = parse_endpoints(OLLAMA_URL)
+    if len(urls) == 1:
+        return OllamaClient(base_url=urls[0], model=model, **kwargs)
+    with _endpoint_pool_lock:
+        if _endpoint_pool is None:
+            _endpoint_pool = EndpointPool(urls, model, check_interval=HEALTH_CHECK_INTERVAL, **kwargs).start()
+    return _endpoint_pool.session()
+
+def _response_cache(enabled: bool, options: Dict[str, Any]):
+    """Returns the project's on-disk response cache if enabled and usable with these options, else None."""
+    if not enabled:
+        return None
+    from octo_cl.response_cache import ResponseCache, is_deterministic
+
+    if not is_deterministic(options):
+        console.print("[dim]Response cache disabled: set temperature=0 or a fixed seed to make responses reproducible.[/dim]")
+        return None
+    return ResponseCache(Path(OCTO_DIR) / "responses", max_bytes=RESPONSE_CACHE_MB * 1024 * 1024)
+
+def _connect(
+    model: str,
+    keep_alive=None,
+    options: Optional[Dict[str, Any]] = None,
+    response_cache=None,
+    warm_up_telemetry: Optional[SessionTelemetry] = None,
+):
+    """
+    Creates the Ollama client and runs the pre-flight checks; returns (client, (reachable, model_available)).
+
+    With `warm_up_telemetry`, an available model is loaded in the background and the load time recorded there.
+    """
+    client = _make_client(model, keep_alive=keep_alive, options=options, response_cache=response_cache)
+    checks = client.preflight()
+    if warm_up_telemetry is not None and checks[1]:
+        _start_warm_up(client, warm_up_telemetry)
+    return client, checks
+
+def _start_warm_up(client: "OllamaClient", telemetry: SessionTelemetry):
+    threading.Thread(target=lambda: telemetry.record_warmup(client.warm_up()), daemon=True).start()
+
+def print_stats(telemetry: SessionTelemetry, response_cache=None):
+    """Prints where the session's time went, from Ollama's counters and client-side timings."""
+    from rich.table import Table
+
+    stats = telemetry.summary()
+    if not stats["turns"] and stats["warmup_s"] is None:
+        console.print("[dim]No turns recorded yet.[/dim]")
+        return
+    table = Table(title=f"Session stats ({stats['turns']} turns)", show_header=False)
+    table.add_row("Prompt eval", f"{stats['prompt_tokens']:,} tokens in {stats['prompt_eval_s']:.2f}s ({stats['prompt_tokens_per_s']:.1f} tok/s)")
+    table.add_row("Generation", f"{stats['eval_tokens']:,} tokens in {stats['eval_s']:.2f}s ({stats['eval_tokens_per_s']:.1f} tok/s)")
+    if stats["warmup_s"] is not None:
+        table.add_row("Background warm-up", f"{stats['warmup_s']:.2f}s (model load {stats['warmup_load_s']:.2f}s)")
+    table.add_row("Model load", f"{stats['load_s']:.2f}s")
+    table.add_row("Avg time to first token", f"{stats['avg_ttft_s']:.2f}s")
+    table.add_row("Model wall time", f"{stats['wall_s']:.2f}s")
+    table.add_row("Rendering", f"{stats['render_s']:.3f}s")
+    table.add_row("Tool-call parsing", f"{stats['parse_s']:.3f}s")
+    if response_cache is not None:
+        cache_stats = response_cache.stats()
+        table.add_row("Response cache", f"{cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%})")
+    for name, seconds in sorted(stats["tool_s"].items()):
+        table.add_row(f"Tool: {name}", f"{seconds:.3f}s")
+    console.print(table)
+
+def process_ai_response(client, messages, tools, history=None, stop_on_tool_call=False, plain=False, telemetry=None):
+    with ToolScheduler(tools) as scheduler:
+        _process_ai_response(client, messages, scheduler, history, stop_on_tool_call, plain, telemetry)
+
+def inject_file_changes(messages, tools):
+    """Sends diffs of files that changed on disk since the model last saw them."""
+    changes = tools.file_tracker.poll()
+    if changes:
+        console.print("[dim]Sent changes to files in context to the model.[/dim]")
+        messages.append({"role": "user", "content": changes})
+
+def confirm_tool_call(call) -> bool:
+    """Asks the user before running tools with side effects."""
+    name = call['name']
+    if name not in ["write_file", "edit_file", "run_shell"]:
+        return True
+    from rich.panel import Panel
+    console.print(Panel(f"[bold red]Security Check:[/bold red] Agent wants to call [bold cyan]{name}[/bold cyan]\nArgs: {call['params']}", expand=False))
+    return typer.confirm("Allow this action?")
+
+def _process_ai_response(client, messages, scheduler, history, stop_on_tool_call, plain, telemetry):
     while True:
+        if history:
+            compacted = history.compact(messages)
+            if compacted:
+                console.print(f"[dim]Compacted conversation history: {compacted[0]:,} -> {compacted[1]:,} tokens.[/dim]")
+
         full_response = ""
+        parser = StreamingToolParser()
+        tool_calls = []
+        # Read-only tools start as soon as their tag closes, overlapping I/O with generation,
+        # unless a mutating call earlier in the response could change what they see.
+        early_results = {}
+        parse_s = 0.0
         console.print("[bold blue]octo-cl:[/bold blue] ", end="")
         
-        with Live("", console=console, refresh_per_second=10) as live:
-            for chunk in client.chat(messages):
+        stream = client.chat(messages)
+        with StreamRenderer(console, plain=plain) as renderer:
+            for chunk in stream:
+                shown = len(full_response)
                 full_response += chunk
-                live.update(Markdown(full_response))
+                parse_start = time.perf_counter()
+                completed = parser.feed(chunk)
+                parse_s += time.perf_counter() - parse_start
+                for call in completed:
+                    if all(scheduler.is_read_only(c['name']) for c in tool_calls + [call]):
+                        early_results[len(tool_calls)] = scheduler.submit(call)
+                    tool_calls.append(call)
+                if stop_on_tool_call and tool_calls:
+                    # Anything after the call would be the model guessing the tool's output.
+                    full_response = full_response[:tool_calls[0]['end']]
+                    tool_calls = tool_calls[:1]
+                    renderer.feed(full_response[shown:])
+                    break
+                renderer.feed(chunk)
+        # Closing the generator closes the HTTP response, which makes Ollama stop decoding.
+        if hasattr(stream, "close"):
+            stream.close()
         
         messages.append({"role": "assistant", "content": full_response})
         print()
         
-        tool_calls = parse_tool_calls(full_response)
-        if not tool_calls:
-            break
-            
-        for call in tool_calls:
+        for call, observation in scheduler.run(tool_calls, confirm=confirm_tool_call, started=early_results):
             name = call['name']
-            params = call['params']
-            
-            # Security Confirmation
-            if name in ["write_file", "run_shell"]:
-                console.print(Panel(f"[bold red]Security Check:[/bold red] Agent wants to call [bold cyan]{name}[/bold cyan]\nArgs: {params}", expand=False))
-                confirm = typer.confirm("Allow this action?")
-                if not confirm:
-                    messages.append({"role": "user", "content": f"Tool '{name}' execution was denied by the user."})
-                    continue
-
-            observation = tools.execute(name, **params)
+            if observation is None:
+                messages.append({"role": "user", "content": f"Tool '{name}' execution was denied by the user."})
+                continue
             console.print(f"[bold magenta]Tool Result ({name}):[/bold magenta] {observation[:100]}...")
             messages.append({"role": "user", "content": f"Tool Result ({name}):\n{observation}"})
-        
+
+        if telemetry:
+            telemetry.record_turn(
+                getattr(client, "last_stats", {}),
+                render_s=renderer.render_time,
+                parse_s=parse_s,
+                tools=scheduler.tools.drain_timings(),
+            )
+        if not tool_calls:
+            break
+        # Shell commands (formatters, code generators) may have changed files the model has read.
+        inject_file_changes(messages, scheduler.tools)
         console.print("[dim italic]Agent is thinking based on tool results...[/dim italic]")
 
 if __name__ == "__main__":
-    app()
+    cli()
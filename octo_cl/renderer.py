@@ -0,0 +1,114 @@
+# octo_cl/renderer.py
+
+import time
+from typing import TYPE_CHECKING, Optional
+
+from rich.console import Console
+
+if TYPE_CHECKING:
+    from rich.live import Live
+
+
+class StreamRenderer:
+    """
+    Renders a streamed response without re-parsing everything on every chunk.
+
+    Markdown mode splits the text at block boundaries (blank lines and closing
+    code fences, never inside a fence). Completed blocks are printed once and
+    frozen; only the trailing unfinished block is re-parsed, and at most once
+    per `min_interval` seconds unless `max_pending_chars` have piled up.
+    Plain mode writes chunks straight to the terminal with no parsing at all.
+    """
+
+    def __init__(self, console: Console, plain: bool = False, min_interval: float = 0.08, max_pending_chars: int = 400):
+        self.console = console
+        self.plain = plain
+        self.min_interval = min_interval
+        self.max_pending_chars = max_pending_chars
+        self.text = ""
+        self.render_time = 0.0  # seconds spent parsing/rendering, for profiling
+        self._live: Optional["Live"] = None
+        self._frozen_upto = 0  # text before this offset has been printed for good
+        self._scan_pos = 0  # start of the first line not yet scanned for boundaries
+        self._in_fence = False
+        self._last_update = 0.0
+        self._pending = 0
+
+    @staticmethod
+    def preload():
+        """Imports the Markdown renderer (markdown-it, pygments) ahead of the first response."""
+        import rich.live  # noqa: F401
+        import rich.markdown  # noqa: F401
+
+    def __enter__(self):
+        if not self.plain:
+            from rich.live import Live
+
+            self._live = Live("", console=self.console, refresh_per_second=10, transient=True)
+            self._live.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.finish()
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        self.text += chunk
+        start = time.perf_counter()
+        if self.plain:
+            self.console.file.write(chunk)
+            self.console.file.flush()
+        else:
+            self._pending += len(chunk)
+            if self._pending >= self.max_pending_chars or start - self._last_update >= self.min_interval:
+                self._flush()
+        self.render_time += time.perf_counter() - start
+
+    def finish(self):
+        """Renders whatever is left and tears down the live display."""
+        start = time.perf_counter()
+        if self.plain:
+            if self.text and not self.text.endswith("\n"):
+                self.console.file.write("\n")
+                self.console.file.flush()
+        elif self._live is not None:
+            from rich.markdown import Markdown
+
+            tail = self.text[self._frozen_upto:]
+            self._live.update("")
+            self._live.__exit__(None, None, None)
+            self._live = None
+            if tail.strip():
+                self.console.print(Markdown(tail))
+            self._frozen_upto = len(self.text)
+        self.render_time += time.perf_counter() - start
+
+    def _flush(self):
+        from rich.markdown import Markdown
+
+        boundary = self._advance_boundary()
+        if boundary > self._frozen_upto:
+            block = self.text[self._frozen_upto:boundary]
+            self._frozen_upto = boundary
+            if block.strip():
+                self.console.print(Markdown(block))
+        self._live.update(Markdown(self.text[self._frozen_upto:]))
+        self._last_update = time.perf_counter()
+        self._pending = 0
+
+    def _advance_boundary(self) -> int:
+        """Scans newly completed lines and returns the last offset where a block safely ends."""
+        boundary = self._frozen_upto
+        while True:
+            newline = self.text.find("\n", self._scan_pos)
+            if newline == -1:
+                return boundary
+            line = self.text[self._scan_pos:newline].strip()
+            self._scan_pos = newline + 1
+            if line.startswith("```") or line.startswith("~~~"):
+                self._in_fence = not self._in_fence
+                if not self._in_fence:
+                    boundary = self._scan_pos
+            elif not line and not self._in_fence:
+                boundary = self._scan_pos
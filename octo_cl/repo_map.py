@@ -0,0 +1,335 @@
+# octo_cl/repo_map.py
+
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from octo_cl.context_packer import estimate_tokens, query_terms
+from octo_cl.retrieval import tokenize
+
+MAP_VERSION = 2
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_MAX_SIGNATURE = 120
+_IMPLIED_ARG = re.compile(r"\((?:self|cls)\b(?:,\s*|(?=\)))")
+# Symbols `render()` passes over for not fitting before it stops looking for smaller ones.
+_MAX_SKIPS = 200
+
+# Definition patterns for languages without a parser here; each captures the symbol name.
+_REGEX_SYMBOLS: Dict[str, List[Tuple[str, re.Pattern]]] = {}
+_C_LIKE = [
+    ("class", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?(?:public\s+|private\s+|protected\s+)?(?:final\s+)?(?:class|interface|enum|struct|trait)\s+([A-Za-z_]\w*)")),
+    ("function", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)\s*\(")),
+    ("function", re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s+)?(?:\([^)]*\)|[A-Za-z_$][\w$]*)\s*=>")),
+    ("function", re.compile(r"^\s*func\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)\s*\(")),
+    ("function", re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?fn\s+([A-Za-z_]\w*)")),
+    ("class", re.compile(r"^\s*type\s+([A-Za-z_]\w*)\s+(?:struct|interface)\b")),
+]
+for _ext in (".js", ".jsx", ".ts", ".tsx", ".mjs", ".go", ".rs", ".java", ".kt", ".cs", ".swift", ".php", ".c", ".h", ".cpp", ".hpp", ".scala"):
+    _REGEX_SYMBOLS[_ext] = _C_LIKE
+_REGEX_SYMBOLS[".rb"] = [
+    ("class", re.compile(r"^\s*(?:class|module)\s+([A-Z]\w*)")),
+    ("function", re.compile(r"^\s*def\s+(?:self\.)?([A-Za-z_]\w*[?!]?)")),
+]
+
+# (kind, name, signature, line, depth)
+Symbol = Tuple[str, str, str, int, int]
+
+
+def _signature(node: ast.AST, lines: List[str]) -> str:
+    """`def name(args) -> ret` / `class Name(bases)`, without bodies or decorators."""
+    unparse = getattr(ast, "unparse", None)  # Python 3.9+
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(unparse(b) for b in node.bases) if unparse else ""
+        return f"class {node.name}({bases})" if bases else f"class {node.name}"
+    # Most headers fit on their own line and can be copied as written, which is much cheaper than unparsing.
+    header = lines[node.lineno - 1][node.col_offset:].rstrip()
+    if header.endswith(":") and header.count("(") == header.count(")") and node.body[0].lineno > node.lineno:
+        signature = header[:-1].rstrip()
+    else:
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        if unparse:
+            args = unparse(node.args)
+            returns = f" -> {unparse(node.returns)}" if node.returns else ""
+        else:
+            args = ", ".join(a.arg for a in node.args.args)
+            returns = ""
+        signature = f"{prefix} {node.name}({args}){returns}"
+    signature = _IMPLIED_ARG.sub("(", signature, count=1)  # self/cls are implied for methods, and not worth the tokens
+    return signature if len(signature) <= _MAX_SIGNATURE else signature[:_MAX_SIGNATURE - 3] + "..."
+
+
+def python_symbols(source: str) -> List[Symbol]:
+    """Classes, functions, methods and UPPER_CASE constants of a Python module. Raises SyntaxError."""
+    tree = ast.parse(source)
+    lines = source.split("\n")  # as ast counts them; splitlines() also breaks at form feeds
+    symbols: List[Symbol] = []
+
+    def visit(body, depth):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append(("function", node.name, _signature(node, lines), node.lineno, depth))
+            elif isinstance(node, ast.ClassDef):
+                symbols.append(("class", node.name, _signature(node, lines), node.lineno, depth))
+                visit(node.body, depth + 1)
+            elif depth == 0 and isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and target.id.isupper():
+                        symbols.append(("constant", target.id, target.id, node.lineno, depth))
+
+    visit(tree.body, 0)
+    return symbols
+
+
+def regex_symbols(source: str, patterns: List[Tuple[str, re.Pattern]]) -> List[Symbol]:
+    symbols: List[Symbol] = []
+    for number, line in enumerate(source.splitlines(), 1):
+        for kind, pattern in patterns:
+            m = pattern.match(line)
+            if m:
+                signature = line.strip().rstrip("{").strip()
+                if len(signature) > _MAX_SIGNATURE:
+                    signature = signature[:_MAX_SIGNATURE - 3] + "..."
+                depth = 1 if line[:1].isspace() else 0
+                symbols.append((kind, m.group(1), signature, number, depth))
+                break
+    return symbols
+
+
+class RepoMap:
+    """
+    Compact map of the classes, functions and signatures defined in a project.
+
+    Python files are parsed with `ast` (falling back to regexes on syntax
+    errors); a few other languages get regex matching. Symbols and identifier
+    counts are cached per file and re-parsed only when the file's contents
+    change: an mtime/size change triggers a hash check, and only a different
+    hash a parse. Symbols are ranked by how often their name is referenced
+    elsewhere in the project and rendered within a token budget. The cache is
+    loaded on the first `update()`, and `update()`/`render()` are thread-safe,
+    so the map can be built in the background.
+    """
+
+    def __init__(self, root_dir: Path, cache_path: Optional[Path] = None, max_file_bytes: int = 256 * 1024):
+        self.root_dir = root_dir
+        self.cache_path = cache_path
+        self.max_file_bytes = max_file_bytes
+        # path -> {"mtime": int, "size": int, "hash": str, "symbols": [Symbol], "refs": {symbol name: count}}
+        self.files: Dict[str, dict] = {}
+        self.parsed = 0  # files parsed by the last update(), for profiling
+        self._loaded = False
+        self._refs: Optional[Counter] = None
+        self._lock = threading.Lock()
+
+    def supports(self, rel_path: str) -> bool:
+        ext = os.path.splitext(rel_path)[1]
+        return ext == ".py" or ext in _REGEX_SYMBOLS
+
+    def update(self, paths: Iterable[str]) -> int:
+        """Re-parses new or modified source files and drops deleted ones. Returns the number of files changed."""
+        with self._lock:
+            return self._update(paths)
+
+    def _update(self, paths: Iterable[str]) -> int:
+        if not self._loaded:
+            self.files = self._load()
+            self._loaded = True
+        changed = 0
+        counts: Dict[str, Counter] = {}
+        self.parsed = 0
+        previously_defined = self._defined()
+        seen = set()
+        for rel_path in paths:
+            if not self.supports(rel_path):
+                continue
+            seen.add(rel_path)
+            try:
+                st = os.stat(self.root_dir / rel_path)
+            except OSError:
+                continue
+            cached = self.files.get(rel_path)
+            if cached and cached["mtime"] == st.st_mtime_ns and cached["size"] == st.st_size:
+                continue
+            if st.st_size > self.max_file_bytes:
+                data = b""
+            else:
+                try:
+                    with open(self.root_dir / rel_path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+            digest = hashlib.sha1(data).hexdigest()
+            if cached and cached["hash"] == digest:
+                # Touched but not changed (checkout, formatter no-op): keep the parse.
+                cached.update(mtime=st.st_mtime_ns, size=st.st_size)
+            else:
+                symbols, counts[rel_path] = self._parse(rel_path, data)
+                self.files[rel_path] = {"mtime": st.st_mtime_ns, "size": st.st_size, "hash": digest, "symbols": symbols}
+                self.parsed += 1
+            changed += 1
+        for rel_path in [p for p in self.files if p not in seen]:
+            del self.files[rel_path]
+            changed += 1
+        if counts:
+            # Only names defined somewhere in the project are ever ranked, so only their counts are kept.
+            defined = self._defined()
+            for rel_path, file_counts in counts.items():
+                self.files[rel_path]["refs"] = {name: n for name, n in file_counts.items() if name in defined}
+            # Unchanged files were counted before these names were defined.
+            added = defined - previously_defined
+            if added:
+                self._recount(added, skip=counts)
+        if changed:
+            self._refs = None
+            self._save()
+        return changed
+
+    def _defined(self) -> Set[str]:
+        return {symbol[1] for entry in self.files.values() for symbol in entry["symbols"]}
+
+    def _recount(self, names: Set[str], skip: Iterable[str]):
+        """Counts references to newly defined `names` in the files not in `skip`, with one regex pass per file."""
+        pattern = re.compile(r"\b(?:%s)\b" % "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True)))
+        skip = set(skip)
+        for rel_path, entry in self.files.items():
+            if rel_path in skip:
+                continue
+            refs = entry.setdefault("refs", {})
+            for name in names:
+                refs.pop(name, None)
+            if entry["size"] > self.max_file_bytes:
+                continue
+            try:
+                with open(self.root_dir / rel_path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            if b"\0" in data[:1024]:
+                continue
+            refs.update(Counter(pattern.findall(data.decode("utf-8", errors="replace"))))
+
+    def _parse(self, rel_path: str, data: bytes) -> Tuple[list, Counter]:
+        """The file's symbols and how often each identifier occurs in it."""
+        if not data or b"\0" in data[:1024]:
+            return [], Counter()
+        source = data.decode("utf-8", errors="replace")
+        ext = os.path.splitext(rel_path)[1]
+        symbols: List[Symbol] = []
+        if ext == ".py":
+            try:
+                symbols = python_symbols(source)
+            except (SyntaxError, ValueError, RecursionError):
+                symbols = regex_symbols(source, [
+                    ("class", re.compile(r"^\s*class\s+([A-Za-z_]\w*)")),
+                    ("function", re.compile(r"^\s*(?:async\s+)?def\s+([A-Za-z_]\w*)")),
+                ])
+        else:
+            symbols = regex_symbols(source, _REGEX_SYMBOLS[ext])
+        return [list(s) for s in symbols], Counter(_IDENTIFIER.findall(source))
+
+    def reference_counts(self) -> Counter:
+        """How often each defined name occurs across the project, minus its own definitions."""
+        if self._refs is None:
+            refs: Counter = Counter()
+            for entry in self.files.values():
+                refs.update(entry["refs"])
+            for entry in self.files.values():
+                for _, name, *_ in entry["symbols"]:
+                    refs[name] -= 1
+            self._refs = refs
+        return self._refs
+
+    def render(self, token_budget: int = 1000, query: str = "", path_prefix: str = "") -> str:
+        """
+        Renders the best-ranked symbols, grouped by file, within `token_budget`.
+
+        Symbols rank by reference count; those whose name matches a word of
+        `query` come first. `path_prefix` limits the map to a file or
+        directory. Methods are listed under their class, which is always
+        included when one of its methods is.
+        """
+        with self._lock:
+            return self._render(token_budget, query, path_prefix)
+
+    def _render(self, token_budget: int, query: str, path_prefix: str) -> str:
+        refs = self.reference_counts()
+        terms = query_terms(query)
+        ranked = []
+        for rel_path, entry in self.files.items():
+            if path_prefix and rel_path != path_prefix and not rel_path.startswith(path_prefix + "/"):
+                continue
+            for index, (_, name, _, _, _) in enumerate(entry["symbols"]):
+                relevant = bool(terms) and not terms.isdisjoint(tokenize(name))
+                ranked.append((not relevant, -max(refs.get(name, 0), 0), rel_path, index))
+        ranked.sort()
+
+        chosen: Dict[str, set] = {}
+        used = skipped = 0
+        for _, _, rel_path, index in ranked:
+            symbols = self.files[rel_path]["symbols"]
+            picked = chosen.get(rel_path, set())
+            needed = [i for i in self._with_parents(symbols, index) if i not in picked]
+            cost = sum(estimate_tokens(symbols[i][2]) + 1 for i in needed)
+            if rel_path not in chosen:
+                cost += estimate_tokens(rel_path) + 1
+            if used + cost > token_budget:
+                # A smaller symbol further down may still fit; give up after a while on large projects.
+                skipped += 1
+                if skipped >= _MAX_SKIPS:
+                    break
+                continue
+            used += cost
+            chosen.setdefault(rel_path, set()).update(needed)
+
+        lines = []
+        for rel_path in sorted(chosen):
+            lines.append(f"{rel_path}:")
+            for i in sorted(chosen[rel_path], key=lambda i: self.files[rel_path]["symbols"][i][3]):
+                _, _, signature, _, depth = self.files[rel_path]["symbols"][i]
+                lines.append("  " * (depth + 1) + signature)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _with_parents(symbols: list, index: int) -> List[int]:
+        """The symbol plus the enclosing classes needed to show it in context."""
+        indexes = [index]
+        depth = symbols[index][4]
+        for i in range(index - 1, -1, -1):
+            if depth == 0:
+                break
+            if symbols[i][4] < depth and symbols[i][0] == "class":
+                indexes.append(i)
+                depth = symbols[i][4]
+        return indexes
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MAP_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            # One dumps() call: json.dump() streams through the pure-Python encoder, which is several times slower.
+            data = json.dumps({"version": MAP_VERSION, "files": self.files}, separators=(",", ":"))
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
@@ -0,0 +1,118 @@
+# octo_cl/response_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from octo_cl.editing import atomic_write
+
+
+def is_deterministic(options: Dict[str, Any]) -> bool:
+    """True when Ollama will produce the same output for the same input: temperature 0 or a fixed seed."""
+    return options.get("temperature") == 0 or options.get("seed") is not None
+
+
+def cache_key(model: str, options: Dict[str, Any], messages: List[Dict[str, str]]) -> str:
+    payload = json.dumps({"model": model, "options": options, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of complete model responses.
+
+    Each response is stored as `<sha256>.json` holding the streamed chunks, so
+    a hit can be replayed chunk by chunk. A file's mtime doubles as its last
+    access time: hits touch it, and once the directory grows past `max_bytes`
+    the least recently used files are deleted.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # computed on first store
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Returns the cached chunks for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                chunks = json.load(f)["chunks"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return chunks
+
+    def put(self, key: str, chunks: List[str], model: str = ""):
+        data = json.dumps({"model": model, "chunks": chunks}, ensure_ascii=False)
+        path = self._path(key)
+        try:
+            with self._lock:
+                size = self._current_size()
+                old = path.stat().st_size if path.exists() else 0
+                atomic_write(path, data)
+                self._size = size - old + len(data.encode("utf-8"))
+                self.stores += 1
+                if self._size > self.max_bytes:
+                    self._evict()
+        except OSError:
+            pass  # caching is best effort
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        return self._size
+
+    def _entries(self) -> List[os.DirEntry]:
+        try:
+            return [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self):
+        # Down to 90% of the cap, so a full cache doesn't rescan the directory on every store.
+        target = int(self.max_bytes * 0.9)
+        entries: List[Tuple[float, int, str]] = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        size = sum(size for _, size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,244 @@
+# octo_cl/retrieval.py
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDEX_VERSION = 1
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lower-cased identifier tokens.
+
+    Each identifier is kept whole and also split on snake_case and camelCase
+    boundaries, so `getDirectoryTree` matches a query for "directory tree".
+    """
+    tokens = []
+    for ident in _IDENTIFIER.findall(text):
+        lowered = ident.lower()
+        if len(lowered) > 1:
+            tokens.append(lowered)
+        parts = [p.lower() for chunk in ident.split("_") for p in _CAMEL_PART.findall(chunk)]
+        if len(parts) > 1:
+            tokens.extend(p for p in parts if len(p) > 1)
+    return tokens
+
+
+class RetrievalIndex:
+    """
+    BM25 inverted index over fixed-size line chunks of the project's text files.
+
+    Files are re-indexed only when their (mtime, size) changes, and the
+    per-file term counts are persisted so later sessions start warm. The
+    index file is loaded on the first `update()`. Changes are appended to a
+    journal next to it, which is folded back into the index file once it
+    grows past half the index's size, so a one-file change doesn't rewrite
+    everything.
+
+    `update()` builds the new file table and postings on the side and swaps
+    them in at once, so `search()` never waits for indexing; it sees either
+    the old index or the new one.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path,
+        index_path: Optional[Path] = None,
+        chunk_lines: int = 40,
+        max_file_bytes: int = 256 * 1024,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.root_dir = root_dir
+        self.index_path = index_path
+        self.chunk_lines = chunk_lines
+        self.max_file_bytes = max_file_bytes
+        self.k1 = k1
+        self.b = b
+        # path -> {"mtime": int, "size": int, "chunks": [[start, end, length, {term: tf}]]}
+        # Replaced, never modified, once published, like the postings and stats built from it.
+        self.files: Dict[str, dict] = {}
+        self.ready = False  # set once the first update() has finished
+        self._postings: Dict[str, List[Tuple[str, int, int]]] = {}
+        self._stats: Tuple[int, float] = (0, 0.0)  # (number of chunks, average chunk length)
+        self._lock = threading.Lock()  # guards swapping and reading the published index
+        self._update_lock = threading.Lock()  # one update at a time
+        self._rewrite = False  # the index file on disk can't be extended with a journal
+
+    @property
+    def journal_path(self) -> Optional[Path]:
+        return self.index_path.with_suffix(".log") if self.index_path else None
+
+    def update(self, paths: Iterable[str]) -> int:
+        """Re-indexes new or modified files and drops deleted ones. Returns the number of files changed."""
+        with self._update_lock:
+            files = self.files if self.ready else self._load()
+            changed, files = self._update(files, paths)
+            if changed or not self.ready:
+                # Done here, usually on a background thread, rather than on the next search.
+                postings, stats = self._build_postings(files)
+                with self._lock:
+                    self.files, self._postings, self._stats = files, postings, stats
+            self.ready = True
+            if changed:
+                self._save(changed)
+            return len(changed)
+
+    def _update(self, files: Dict[str, dict], paths: Iterable[str]) -> Tuple[List[str], Dict[str, dict]]:
+        """Returns (changed paths, the new file table); `files` itself is left as it is."""
+        changed: List[str] = []
+        updated: Dict[str, dict] = {}
+        seen = set()
+        for rel_path in paths:
+            seen.add(rel_path)
+            try:
+                st = os.stat(self.root_dir / rel_path)
+            except OSError:
+                continue
+            cached = files.get(rel_path)
+            if cached and cached["mtime"] == st.st_mtime_ns and cached["size"] == st.st_size:
+                continue
+            updated[rel_path] = {"mtime": st.st_mtime_ns, "size": st.st_size, "chunks": self._index_file(rel_path, st.st_size)}
+            changed.append(rel_path)
+        removed = [p for p in files if p not in seen]
+        changed.extend(removed)
+        if not changed:
+            return changed, files
+        files = dict(files)
+        files.update(updated)
+        for rel_path in removed:
+            del files[rel_path]
+        return changed, files
+
+    def search(self, query: str, top_k: int = 5, min_score: float = 0.0) -> List[Tuple[float, str, int, int]]:
+        """
+        Returns up to `top_k` (score, path, start_line, end_line) chunks ranked by BM25, scoring at least `min_score`.
+
+        Scores are BM25 divided by the most one query term can score in this
+        index (a term found only in that chunk, at saturation), so each query
+        term adds at most 1 and `min_score` means the same thing whatever the
+        size of the project: 1.0 is roughly one distinctive term matched well.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            files, postings, (total_chunks, avg_len) = self.files, self._postings, self._stats
+        if not terms or not total_chunks:
+            return []
+
+        scores: Dict[Tuple[str, int], float] = {}
+        for term in terms:
+            hits = postings.get(term)
+            if not hits:
+                continue
+            idf = math.log(1 + (total_chunks - len(hits) + 0.5) / (len(hits) + 0.5))
+            for rel_path, chunk_no, tf in hits:
+                length = files[rel_path]["chunks"][chunk_no][2]
+                norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_len))
+                scores[(rel_path, chunk_no)] = scores.get((rel_path, chunk_no), 0.0) + idf * norm
+
+        term_max = (self.k1 + 1) * math.log(1 + (total_chunks - 0.5) / 1.5)
+        ranked = sorted(((key, score / term_max) for key, score in scores.items()), key=lambda item: -item[1])
+        results = []
+        for (rel_path, chunk_no), score in ranked[:top_k]:
+            if score < min_score:
+                break
+            start, end = files[rel_path]["chunks"][chunk_no][:2]
+            results.append((score, rel_path, start, end))
+        return results
+
+    def snippet(self, rel_path: str, start: int, end: int) -> str:
+        """Returns lines start..end (1-based, inclusive) of a file."""
+        try:
+            with open(self.root_dir / rel_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return ""
+        return "\n".join(lines[start - 1:end])
+
+    def _index_file(self, rel_path: str, size: int) -> list:
+        if size > self.max_file_bytes:
+            return []
+        try:
+            with open(self.root_dir / rel_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return []
+        if b"\0" in data[:1024]:
+            return []
+        lines = data.decode("utf-8", errors="replace").splitlines()
+        chunks = []
+        for start in range(0, len(lines), self.chunk_lines):
+            tokens = tokenize("\n".join(lines[start:start + self.chunk_lines]))
+            if tokens:
+                end = min(start + self.chunk_lines, len(lines))
+                chunks.append([start + 1, end, len(tokens), dict(Counter(tokens))])
+        return chunks
+
+    @staticmethod
+    def _build_postings(files: Dict[str, dict]) -> Tuple[Dict[str, List[Tuple[str, int, int]]], Tuple[int, float]]:
+        postings: Dict[str, List[Tuple[str, int, int]]] = {}
+        total_chunks = total_length = 0
+        for rel_path, entry in files.items():
+            for chunk_no, chunk in enumerate(entry["chunks"]):
+                total_chunks += 1
+                total_length += chunk[2]
+                for term, tf in chunk[3].items():
+                    postings.setdefault(term, []).append((rel_path, chunk_no, tf))
+        return postings, (total_chunks, total_length / max(total_chunks, 1))
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.index_path or not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self._rewrite = True
+            return {}
+        if data.get("version") != INDEX_VERSION or data.get("chunk_lines") != self.chunk_lines:
+            self._rewrite = True
+            return {}
+        files = data.get("files", {})
+        try:
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["entry"] is None:
+                        files.pop(record["path"], None)
+                    else:
+                        files[record["path"]] = record["entry"]
+        except (OSError, ValueError, KeyError):
+            pass  # no journal, or a line cut short by an interrupted write: the rest is re-indexed
+        return files
+
+    def _save(self, changed: List[str]):
+        if not self.index_path:
+            return
+        try:
+            journal = self.journal_path
+            index_size = self.index_path.stat().st_size if self.index_path.exists() else 0
+            journal_size = journal.stat().st_size if journal.exists() else 0
+            records = "".join(json.dumps({"path": p, "entry": self.files.get(p)}) + "\n" for p in changed)
+            if index_size and not self._rewrite and journal_size + len(records) <= index_size // 2:
+                with open(journal, "a") as f:
+                    f.write(records)
+                return
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            data = json.dumps({"version": INDEX_VERSION, "chunk_lines": self.chunk_lines, "files": self.files})
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.index_path)
+            self._rewrite = False
+            if journal_size:
+                journal.unlink()
+        except OSError:
+            pass
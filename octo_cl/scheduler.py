@@ -0,0 +1,71 @@
+# octo_cl/scheduler.py
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from octo_cl.tools import READ_ONLY_TOOLS, ToolRegistry
+
+
+class ToolScheduler:
+    """
+    Runs the tool calls of one response.
+
+    Read-only tools run concurrently on a thread pool. Mutating tools
+    (`write_file`, `run_shell`, ...) act as barriers: they wait for every
+    earlier call to finish and run one at a time, in order, so later reads see
+    their effects. Results always come back in the original call order.
+    """
+
+    def __init__(self, tools: ToolRegistry, max_workers: int = 4):
+        self.tools = tools
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    @staticmethod
+    def is_read_only(name: str) -> bool:
+        return name in READ_ONLY_TOOLS
+
+    def submit(self, call: Dict[str, Any]) -> Future:
+        """Starts a read-only call in the background."""
+        return self._pool.submit(self.tools.execute, call["name"], **call["params"])
+
+    def run(
+        self,
+        calls: List[Dict[str, Any]],
+        confirm: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        started: Optional[Dict[int, Future]] = None,
+    ) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        Executes `calls` and returns (call, observation) pairs in call order.
+
+        `confirm` is asked (on the calling thread) before each mutating call; a
+        denied call gets a None observation. `started` maps call indexes to
+        futures already submitted while the response was streaming.
+        """
+        futures: Dict[int, Future] = dict(started or {})
+        results: Dict[int, Optional[str]] = {}
+        for i, call in enumerate(calls):
+            if self.is_read_only(call["name"]):
+                if i not in futures:
+                    futures[i] = self.submit(call)
+                continue
+
+            # Barrier: reads issued before this call must not observe its effects.
+            for j in list(futures):
+                results[j] = futures.pop(j).result()
+            if confirm is not None and not confirm(call):
+                results[i] = None
+                continue
+            results[i] = self.tools.execute(call["name"], **call["params"])
+
+        for j, future in futures.items():
+            results[j] = future.result()
+        return [(call, results[i]) for i, call in enumerate(calls)]
@@ -0,0 +1,96 @@
+# octo_cl/telemetry.py
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+# Fields of Ollama's final `done` chunk; durations are in nanoseconds.
+OLLAMA_STAT_KEYS = (
+    "total_duration",
+    "load_duration",
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+)
+
+
+class SessionTelemetry:
+    """
+    Collects per-turn performance data for a chat session.
+
+    A turn is one model response plus the tools it called. Each turn combines
+    the server-side counters from Ollama with client-side timings (time to first
+    token, rendering, tool-call parsing, tool execution) and is optionally
+    appended to a JSONL trace file for offline profiling.
+    """
+
+    def __init__(self, model: str = "", trace_path: Optional[str] = None):
+        self.model = model
+        self.trace_path = trace_path
+        self.turns: List[Dict[str, Any]] = []
+        # Background model load at session start: {"wall_s", "load_duration"}.
+        self.warmup: Optional[Dict[str, Any]] = None
+
+    def record_warmup(self, stats: Optional[Dict[str, Any]]):
+        if stats:
+            self.warmup = dict(stats)
+
+    def record_turn(
+        self,
+        llm_stats: Dict[str, Any],
+        render_s: float = 0.0,
+        parse_s: float = 0.0,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        turn = {
+            "ts": time.time(),
+            "model": self.model,
+            "turn": len(self.turns) + 1,
+            **{k: llm_stats[k] for k in OLLAMA_STAT_KEYS if k in llm_stats},
+            "cache_hit": bool(llm_stats.get("cache_hit")),
+            "ttft_s": llm_stats.get("ttft_s"),
+            "wall_s": llm_stats.get("wall_s"),
+            "render_s": render_s,
+            "parse_s": parse_s,
+            "tools": tools or [],
+        }
+        self.turns.append(turn)
+        if self.trace_path:
+            try:
+                with open(self.trace_path, "a") as f:
+                    f.write(json.dumps(turn) + "\n")
+            except OSError:
+                pass
+        return turn
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregates all turns: token counts, rates and where the time went."""
+        def total(key):
+            return sum(t.get(key) or 0 for t in self.turns)
+
+        prompt_tokens, prompt_ns = total("prompt_eval_count"), total("prompt_eval_duration")
+        eval_tokens, eval_ns = total("eval_count"), total("eval_duration")
+        ttfts = [t["ttft_s"] for t in self.turns if t.get("ttft_s") is not None]
+        tool_s: Dict[str, float] = {}
+        for turn in self.turns:
+            for call in turn["tools"]:
+                tool_s[call["tool"]] = tool_s.get(call["tool"], 0.0) + call["seconds"]
+        return {
+            "turns": len(self.turns),
+            "cached_turns": sum(1 for t in self.turns if t.get("cache_hit")),
+            "prompt_tokens": prompt_tokens,
+            "prompt_eval_s": prompt_ns / 1e9,
+            "prompt_tokens_per_s": prompt_tokens / (prompt_ns / 1e9) if prompt_ns else 0.0,
+            "eval_tokens": eval_tokens,
+            "eval_s": eval_ns / 1e9,
+            "eval_tokens_per_s": eval_tokens / (eval_ns / 1e9) if eval_ns else 0.0,
+            "load_s": total("load_duration") / 1e9,
+            "avg_ttft_s": sum(ttfts) / len(ttfts) if ttfts else 0.0,
+            "wall_s": total("wall_s"),
+            "render_s": total("render_s"),
+            "parse_s": total("parse_s"),
+            "tool_s": tool_s,
+            "warmup_s": self.warmup["wall_s"] if self.warmup else None,
+            "warmup_load_s": self.warmup.get("load_duration", 0) / 1e9 if self.warmup else None,
+        }
@@ -0,0 +1,98 @@
+# octo_cl/tool_parser.py
+
+import re
+from typing import Any, Dict, List, Optional
+
+OPEN_TAG = "<tool_call:"
+_NAME = re.compile(r"(\w+)\s")
+_PARAM = re.compile(r'(\w+)="([^"]*)"')
+
+
+def parse_params(params_str: str) -> Dict[str, str]:
+    return {m.group(1): m.group(2) for m in _PARAM.finditer(params_str)}
+
+
+class StreamingToolParser:
+    """
+    Incremental parser for `<tool_call:...>` tags in a streamed response.
+
+    Feed it chunks as they arrive; `feed` returns every call whose closing
+    `/>` or `</tool_call:name>` has been seen, in document order. Only the
+    unfinished tail of the stream is buffered. Each call records `end`, its
+    end offset in the full stream.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._offset = 0  # stream position of self._buffer[0]
+        self._pending: Optional[Dict[str, Any]] = None  # open tag awaiting its closing tag
+        self.calls: List[Dict[str, Any]] = []
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._buffer += chunk
+        completed = []
+        while True:
+            call = self._next_call()
+            if call is None:
+                break
+            completed.append(call)
+        self.calls.extend(completed)
+        return completed
+
+    def _next_call(self) -> Optional[Dict[str, Any]]:
+        if self._pending is not None:
+            return self._close_pending()
+
+        start = self._buffer.find(OPEN_TAG)
+        if start == -1:
+            # Keep just enough of the tail to recognise a tag split across chunks.
+            self._consume(max(0, len(self._buffer) - (len(OPEN_TAG) - 1)))
+            return None
+        self._consume(start)
+
+        name_match = _NAME.match(self._buffer, len(OPEN_TAG))
+        if name_match is None:
+            if re.fullmatch(r"\w*", self._buffer[len(OPEN_TAG):]):
+                return None  # the name is still streaming in
+            self._consume(len(OPEN_TAG))
+            return self._next_call()
+
+        end = self._tag_end(name_match.end())
+        if end == -1:
+            return None
+        name = name_match.group(1)
+        open_tag = self._buffer[:end + 1]
+        self._consume(end + 1)
+        if open_tag.endswith("/>"):
+            params_str = open_tag[name_match.end():-2]
+            return {"name": name, "params": parse_params(params_str), "full_match": open_tag, "end": self._offset}
+
+        self._pending = {"name": name, "params_str": open_tag[name_match.end():-1], "open_tag": open_tag}
+        return self._close_pending()
+
+    def _tag_end(self, pos: int) -> int:
+        """Index of the `>` ending the open tag, ignoring any inside quoted values; -1 if not yet seen."""
+        in_quotes = False
+        for i in range(pos, len(self._buffer)):
+            char = self._buffer[i]
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ">" and not in_quotes:
+                return i
+        return -1
+
+    def _close_pending(self) -> Optional[Dict[str, Any]]:
+        closing = f"</tool_call:{self._pending['name']}>"
+        end = self._buffer.find(closing)
+        if end == -1:
+            return None
+        pending, self._pending = self._pending, None
+        content = self._buffer[:end]
+        self._consume(end + len(closing))
+        params = parse_params(pending["params_str"])
+        params["content"] = content
+        return {"name": pending["name"], "params": params, "full_match": pending["open_tag"] + content + closing, "end": self._offset}
+
+    def _consume(self, count: int):
+        self._buffer = self._buffer[count:]
+        self._offset += count
@@ -1,38 +1,159 @@
 # octo_cl/tools.py
 
 import os
+import re
+import signal
 import subprocess
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, List, Optional
+from octo_cl.file_cache import BinaryFileError, FileCache, shared_cache
+from octo_cl.editing import EditError, apply_edits, atomic_write, parse_edits
+from octo_cl.file_tracker import FileTracker
+
+# Tools without side effects; these may run early or concurrently.
+READ_ONLY_TOOLS = {"read_file", "list_files", "repo_map", "search_code"}
+
+class BoundedOutput:
+    """
+    Keeps the head and tail of a command's output within byte and line caps.
+
+    The first half of the budget holds the beginning of the output; the rest
+    is a ring buffer holding the most recent lines. Everything in between is
+    counted and replaced by a single marker line.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024, max_lines: int = 400):
+        self.head_bytes = max_bytes // 2
+        self.tail_bytes = max_bytes - self.head_bytes
+        self.head_lines = max_lines // 2
+        self.tail_lines = max_lines - self.head_lines
+        self.head: List[str] = []
+        self.tail: deque = deque()
+        self._head_size = 0
+        self._tail_size = 0
+        self.dropped_lines = 0
+        self.dropped_bytes = 0
+        self.total_lines = 0
+        self.last_line = ""
+
+    def append(self, line: str):
+        self.total_lines += 1
+        self.last_line = line
+        size = len(line)
+        if not self.tail and len(self.head) < self.head_lines and self._head_size + size <= self.head_bytes:
+            self.head.append(line)
+            self._head_size += size
+            return
+        self.tail.append(line)
+        self._tail_size += size
+        while self.tail and (len(self.tail) > self.tail_lines or self._tail_size > self.tail_bytes):
+            dropped = self.tail.popleft()
+            self._tail_size -= len(dropped)
+            self.dropped_lines += 1
+            self.dropped_bytes += len(dropped)
+
+    def text(self) -> str:
+        parts = list(self.head)
+        if self.dropped_lines:
+            parts.append(f"[... {self.dropped_lines:,} lines ({self.dropped_bytes:,} bytes) omitted ...]\n")
+        parts.extend(self.tail)
+        return "".join(parts)
 
 class ToolRegistry:
-    def __init__(self, root_dir: str = "."):
+    def __init__(
+        self,
+        root_dir: str = ".",
+        shell_timeout: float = 120.0,
+        max_output_bytes: int = 32 * 1024,
+        max_output_lines: int = 400,
+        progress: Optional[Callable[[Optional[str]], None]] = None,
+        file_cache: Optional[FileCache] = None,
+        max_read_bytes: int = 64 * 1024,
+        repo_map: Optional[Callable[..., str]] = None,
+        repo_map_tokens: int = 3000,
+        search_code: Optional[Callable[..., str]] = None,
+        max_search_results: int = 50,
+        file_tracker: Optional[FileTracker] = None,
+    ):
         self.root_dir = Path(root_dir).resolve()
+        self.file_cache = file_cache or shared_cache
+        self.max_read_bytes = max_read_bytes
+        # Versions of the files the model has seen, so later changes can be sent as diffs.
+        self.file_tracker = file_tracker or FileTracker(self.root_dir, self.file_cache)
+        self.timings: List[Dict[str, Any]] = []
+        self.shell_timeout = shell_timeout
+        self.max_output_bytes = max_output_bytes
+        self.max_output_lines = max_output_lines
+        # Called with a one-line status while a shell command runs, and with None when it ends.
+        self.progress = progress
         self.tools: Dict[str, Callable] = {
             "read_file": self.read_file,
             "write_file": self.write_file,
+            "edit_file": self.edit_file,
             "run_shell": self.run_shell,
             "list_files": self.list_files
         }
+        # Renders the project's symbol map; see ContextBuilder.get_repo_map.
+        self._repo_map = repo_map
+        self.repo_map_tokens = repo_map_tokens
+        if repo_map is not None:
+            self.tools["repo_map"] = self.repo_map
+        # Searches non-ignored project files; see ContextBuilder.search_code.
+        self._search_code = search_code
+        self.max_search_results = max_search_results
+        if search_code is not None:
+            self.tools["search_code"] = self.search_code
 
     def execute(self, tool_name: str, **kwargs) -> str:
         if tool_name not in self.tools:
             return f"Error: Tool '{tool_name}' not found."
+        start = time.perf_counter()
         try:
             return self.tools[tool_name](**kwargs)
         except Exception as e:
             return f"Error executing '{tool_name}': {str(e)}"
+        finally:
+            self.timings.append({"tool": tool_name, "seconds": time.perf_counter() - start})
+
+    def drain_timings(self) -> List[Dict[str, Any]]:
+        """Returns and clears the execution times recorded since the last call."""
+        timings, self.timings = self.timings, []
+        return timings
 
     def _is_safe_path(self, path: str) -> bool:
         full_path = (self.root_dir / path).resolve()
         return str(full_path).startswith(str(self.root_dir))
 
-    def read_file(self, path: str) -> str:
+    def read_file(self, path: str, start_line: Optional[str] = None, end_line: Optional[str] = None) -> str:
         if not self._is_safe_path(path):
             return f"Error: Access denied to {path}"
+        full_path = self.root_dir / path
         try:
-            with open(self.root_dir / path, "r") as f:
-                return f.read()
+            if start_line is not None or end_line is not None:
+                start = int(start_line) if start_line else 1
+                end = int(end_line) if end_line else None
+                text, total = self.file_cache.read_lines(full_path, start, end)
+                shown_end = total if end is None else min(end, total)
+                return f"[{path}: lines {start}-{shown_end} of {total}]\n{text}"
+
+            if os.stat(full_path).st_size <= self.max_read_bytes:
+                content = self.file_cache.read_text(full_path)
+                self.file_tracker.record(path, content)
+                return content
+            # Only the part that is shown gets decoded, however large the file is.
+            head, total = self.file_cache.read_head(full_path, self.max_read_bytes)
+            shown = head.count("\n")
+            return (
+                f"{head}\n[Truncated: showing lines 1-{shown} of {total}. "
+                f"Use start_line/end_line to read the rest.]"
+            )
+        except BinaryFileError:
+            return f"Error: {path} is a binary file."
+        except ValueError:
+            return "Error: start_line and end_line must be integers."
         except Exception as e:
             return f"Error reading {path}: {str(e)}"
 
@@ -43,24 +164,143 @@ class ToolRegistry:
             (self.root_dir / path).parent.mkdir(parents=True, exist_ok=True)
             with open(self.root_dir / path, "w") as f:
                 f.write(content)
+            self.file_cache.invalidate(self.root_dir / path)
+            self.file_tracker.record(path, content)
             return f"Successfully wrote to {path}."
         except Exception as e:
             return f"Error writing to {path}: {str(e)}"
 
+    def edit_file(self, path: str, content: str) -> str:
+        """Applies SEARCH/REPLACE blocks or a unified diff to an existing file."""
+        if not self._is_safe_path(path):
+            return f"Error: Access denied to {path}"
+        full_path = self.root_dir / path
+        try:
+            original = full_path.read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            return f"Error: File {path} not found. Use write_file to create it."
+        except UnicodeDecodeError:
+            return f"Error: {path} is not a UTF-8 text file."
+        except Exception as e:
+            return f"Error reading {path}: {str(e)}"
+
+        crlf = "\r\n" in original
+        text = original.replace("\r\n", "\n") if crlf else original
+        try:
+            edits = parse_edits(content)
+            updated = apply_edits(text, edits)
+        except EditError as e:
+            return f"Error editing {path}: {str(e)}\nNo changes were written."
+        if crlf:
+            updated = updated.replace("\n", "\r\n")
+        if updated == original:
+            return f"No changes: the edits to {path} leave it unchanged."
+
+        try:
+            atomic_write(full_path, updated)
+        except Exception as e:
+            return f"Error writing to {path}: {str(e)}"
+        self.file_cache.invalidate(full_path)
+        self.file_tracker.record(path, updated)
+        return f"Successfully edited {path}: applied {len(edits)} edit(s)."
+
     def run_shell(self, command: str) -> str:
+        output = BoundedOutput(self.max_output_bytes, self.max_output_lines)
         try:
-            result = subprocess.run(
-                command, 
-                shell=True, 
-                capture_output=True, 
-                text=True, 
-                cwd=self.root_dir
+            if os.name == "posix":
+                # A new session makes the shell the leader of its own process group,
+                # so a timeout can kill everything it spawned.
+                group_kwargs = {"start_new_session": True}
+            else:
+                group_kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                cwd=self.root_dir,
+                **group_kwargs,
             )
-            output = result.stdout + result.stderr
-            return f"Command: {command}\nExit Code: {result.returncode}\nOutput:\n{output}"
         except Exception as e:
             return f"Error running command '{command}': {str(e)}"
 
+        reader = threading.Thread(target=self._read_output, args=(process.stdout, output), daemon=True)
+        reader.start()
+        start = time.monotonic()
+        timed_out = False
+        try:
+            while True:
+                try:
+                    process.wait(timeout=0.2)
+                    break
+                except subprocess.TimeoutExpired:
+                    elapsed = time.monotonic() - start
+                    if self.progress:
+                        self.progress(f"{command} ({elapsed:.0f}s, {output.total_lines:,} lines) {output.last_line.strip()[:80]}")
+                    if self.shell_timeout and elapsed > self.shell_timeout:
+                        timed_out = True
+                        self._kill_group(process)
+                        break
+        finally:
+            if self.progress:
+                self.progress(None)
+        # Background children may keep the pipe open after the shell exits; don't wait on them forever.
+        reader.join(timeout=1.0)
+
+        result = f"Command: {command}\nExit Code: {process.returncode}\nOutput:\n{output.text()}"
+        if timed_out:
+            result += f"\n[Timed out after {self.shell_timeout:g}s; the process group was killed.]"
+        return result
+
+    def _read_output(self, stream, output: BoundedOutput):
+        with stream:
+            # Bounded reads so a single enormous line can't exhaust memory.
+            for line in iter(lambda: stream.readline(8192), b""):
+                output.append(line.decode("utf-8", errors="replace"))
+
+    def _kill_group(self, process: subprocess.Popen):
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGTERM)
+                try:
+                    process.wait(timeout=2.0)
+                except subprocess.TimeoutExpired:
+                    os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            process.wait(timeout=2.0)
+        except (ProcessLookupError, subprocess.TimeoutExpired):
+            pass
+
+    def repo_map(self, path: str = "", query: str = "") -> str:
+        if path and not self._is_safe_path(path):
+            return f"Error: Access denied to {path}"
+        result = self._repo_map(query=query, path=path, token_budget=self.repo_map_tokens)
+        return result or f"No classes or functions found under '{path or '.'}'."
+
+    def search_code(self, pattern: str, path: str = "", literal: str = "false", ignore_case: str = "false", context: str = "2") -> str:
+        if path and not self._is_safe_path(path):
+            return f"Error: Access denied to {path}"
+        if not pattern:
+            return "Error: search_code needs a pattern."
+        try:
+            context_lines = max(0, min(int(context), 10))
+        except ValueError:
+            return "Error: context must be an integer."
+        try:
+            result = self._search_code(
+                pattern,
+                path=path,
+                literal=str(literal).lower() == "true",
+                ignore_case=str(ignore_case).lower() == "true",
+                context_lines=context_lines,
+                max_results=self.max_search_results,
+            )
+        except re.error as e:
+            return f"Error: invalid regex {pattern!r}: {e}. Use literal=\"true\" to search for the text as is."
+        return result or f"No matches for {pattern!r} under '{path or '.'}'."
+
     def list_files(self, path: str = ".") -> str:
         if not self._is_safe_path(path):
             return f"Error: Access denied to {path}"
@@ -0,0 +1,176 @@
+# octo_cl/tree_cache.py
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pathspec
+
+CACHE_VERSION = 1
+
+# A chain of (base directory relative to root, spec) pairs, outermost first.
+IgnoreChain = List[Tuple[str, pathspec.PathSpec]]
+
+
+def is_ignored(chain: IgnoreChain, rel_path: str, is_dir: bool) -> bool:
+    """
+    Applies a chain of gitignore specs to a root-relative POSIX path.
+
+    Patterns are evaluated outermost file first and in file order, so the last
+    matching pattern wins, just like git (including `!negations` in nested files).
+    """
+    ignored = False
+    for base, spec in chain:
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            sub_path = rel_path[len(base) + 1:]
+        else:
+            sub_path = rel_path
+        if is_dir:
+            sub_path += "/"
+        for pattern in spec.patterns:
+            if pattern.include is not None and pattern.match_file(sub_path):
+                ignored = pattern.include
+    return ignored
+
+
+class TreeSnapshot:
+    """
+    Persistent snapshot of the ignore-filtered project tree.
+
+    Each directory entry is keyed by the directory's own mtime and the mtimes of
+    every `.gitignore` that applies to it, so a warm refresh only stats
+    directories and rescans the ones that actually changed.
+    """
+
+    def __init__(self, root_dir: Path, base_spec: pathspec.PathSpec, cache_path: Optional[Path] = None):
+        self.root_dir = root_dir
+        self.base_spec = base_spec
+        self.cache_path = cache_path
+        self.entries: Dict[str, dict] = {}
+        self.stats = {"scanned": 0, "reused": 0}
+
+    def refresh(self) -> Dict[str, dict]:
+        """Brings the snapshot up to date with the file system and persists it."""
+        previous = self._load()
+        if self.cache_path:
+            # Create the cache directory up front so it doesn't bump the root's mtime afterwards.
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                pass
+        self.stats = {"scanned": 0, "reused": 0}
+        entries: Dict[str, dict] = {}
+        self._visit("", [("", self.base_spec)], self._gitignore_sig(self.root_dir, ""), previous, entries)
+        self.entries = entries
+        if self.cache_path and self.stats["scanned"]:
+            self._save()
+        return entries
+
+    def render(self) -> List[str]:
+        """Returns the tree as indented lines: files first, then subdirectories."""
+        if not self.entries:
+            self.refresh()
+        lines: List[str] = []
+        self._render("", 0, lines)
+        return lines
+
+    def iter_files(self) -> Iterator[str]:
+        """Yields every non-ignored file as a root-relative POSIX path."""
+        if not self.entries:
+            self.refresh()
+        for rel_dir, entry in self.entries.items():
+            for name in entry["files"]:
+                yield f"{rel_dir}/{name}" if rel_dir else name
+
+    def _render(self, rel_dir: str, depth: int, lines: List[str]):
+        entry = self.entries.get(rel_dir)
+        if entry is None:
+            return
+        if rel_dir:
+            lines.append(f"{'  ' * depth}{rel_dir.rsplit('/', 1)[-1]}/")
+        indent = "  " * (depth + 1)
+        lines.extend(f"{indent}{name}" for name in entry["files"])
+        for name in entry["dirs"]:
+            self._render(f"{rel_dir}/{name}" if rel_dir else name, depth + 1, lines)
+
+    def _gitignore_sig(self, abs_dir: Path, rel_dir: str) -> str:
+        try:
+            return f"{rel_dir}:{os.stat(abs_dir / '.gitignore').st_mtime_ns};"
+        except OSError:
+            return ""
+
+    def _visit(self, rel_dir: str, chain: IgnoreChain, sig: str, previous: Dict[str, dict], entries: Dict[str, dict]):
+        abs_dir = self.root_dir / rel_dir if rel_dir else self.root_dir
+        try:
+            mtime = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            return
+
+        cached = previous.get(rel_dir)
+        if cached and cached["mtime"] == mtime and cached["sig"] == sig:
+            entry = cached
+            self.stats["reused"] += 1
+        else:
+            entry = self._scan(abs_dir, rel_dir, chain, mtime, sig)
+            self.stats["scanned"] += 1
+        entries[rel_dir] = entry
+
+        for name in entry["dirs"]:
+            child_rel = f"{rel_dir}/{name}" if rel_dir else name
+            child_abs = abs_dir / name
+            child_chain, child_sig = chain, sig
+            local_sig = self._gitignore_sig(child_abs, child_rel)
+            if local_sig:
+                child_chain = chain + [(child_rel, self._load_spec(child_abs / ".gitignore"))]
+                child_sig = sig + local_sig
+            self._visit(child_rel, child_chain, child_sig, previous, entries)
+
+    def _scan(self, abs_dir: Path, rel_dir: str, chain: IgnoreChain, mtime: int, sig: str) -> dict:
+        dirs: List[str] = []
+        files: List[str] = []
+        try:
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    if is_ignored(chain, rel_path, is_dir):
+                        continue
+                    (dirs if is_dir else files).append(entry.name)
+        except OSError:
+            pass
+        return {"mtime": mtime, "sig": sig, "dirs": sorted(dirs), "files": sorted(files)}
+
+    def _load_spec(self, gitignore_path: Path) -> pathspec.PathSpec:
+        try:
+            with open(gitignore_path, "r") as f:
+                return pathspec.PathSpec.from_lines("gitwildmatch", f.read().splitlines())
+        except OSError:
+            return pathspec.PathSpec.from_lines("gitwildmatch", [])
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION or data.get("root") != str(self.root_dir):
+            return {}
+        return data.get("entries", {})
+
+    def _save(self):
+        try:
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"version": CACHE_VERSION, "root": str(self.root_dir), "entries": self.entries}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # The snapshot is only an accelerator; a read-only checkout still works.
+            pass
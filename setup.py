@@ -13,7 +13,7 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "octo=octo_cl.main:app",
+            "octo=octo_cl.main:cli",
         ],
     },
     author="Your Name",
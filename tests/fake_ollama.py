@@ -0,0 +1,193 @@
+# octo-cl/tests/fake_ollama.py
+
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Sequence, Union
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+Responder = Union[str, Callable[[List[dict]], str]]
+
+
+class FakeOllamaServer:
+    """
+    Local stand-in for an Ollama server, for benchmarks and tests.
+
+    Speaks the `/api/tags` and streaming `/api/chat` protocol and emits the
+    scripted response word by word at `tokens_per_second`, ending with a `done`
+    chunk carrying the usual eval counters. `response` may be a string or a
+    callable that receives the request's messages. The first request that
+    needs the model waits `load_seconds` to simulate loading it; a chat request
+    without messages only loads the model, as with Ollama.
+    """
+
+    def __init__(
+        self,
+        response: Responder = "Hello from the fake Ollama server.",
+        models: Sequence[str] = ("qwen2.5-coder:7b",),
+        tokens_per_second: float = 0.0,
+        load_seconds: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.response = response
+        self.models = list(models)
+        self.tokens_per_second = tokens_per_second
+        self.load_seconds = load_seconds
+        self.loaded = False
+        self.requests: List[dict] = []
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._connections: set = set()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the server and drops open keep-alive connections, like a host going down."""
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def chat_requests(self) -> List[dict]:
+        with self._lock:
+            return [r for r in self.requests if r["path"] == "/api/chat"]
+
+    def _record(self, path: str, body: Optional[dict]):
+        with self._lock:
+            self.requests.append({"path": path, "body": body, "ts": time.time()})
+
+    def _ensure_loaded(self) -> int:
+        """Simulates loading the model; returns the load duration in nanoseconds (0 if already loaded)."""
+        with self._load_lock:
+            if self.loaded:
+                return 0
+            start = time.perf_counter()
+            time.sleep(self.load_seconds)
+            self.loaded = True
+            return int((time.perf_counter() - start) * 1e9)
+
+    def _text_for(self, messages: List[dict]) -> str:
+        return self.response(messages) if callable(self.response) else self.response
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Small streamed chunks would otherwise sit behind delayed ACKs.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake._connections.add(self.connection)
+
+            def finish(self):
+                with fake._lock:
+                    fake._connections.discard(self.connection)
+                super().finish()
+
+            def do_GET(self):
+                fake._record(self.path, None)
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": name} for name in fake.models]})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                fake._record(self.path, body)
+                if self.path == "/api/chat" and not body.get("messages"):
+                    load_ns = fake._ensure_loaded()
+                    self._send_json({
+                        "model": body.get("model"),
+                        "message": {"role": "assistant", "content": ""},
+                        "done_reason": "load",
+                        "done": True,
+                        "load_duration": load_ns,
+                    })
+                elif self.path == "/api/chat":
+                    self._stream_chat(body)
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _send_json(self, payload: dict, status: int = 200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream_chat(self, body: dict):
+                messages = body.get("messages", [])
+                tokens = _TOKEN.findall(fake._text_for(messages))
+                load_ns = fake._ensure_loaded()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                start = time.perf_counter()
+                try:
+                    for i, token in enumerate(tokens):
+                        if fake.tokens_per_second:
+                            delay = start + i / fake.tokens_per_second - time.perf_counter()
+                            if delay > 0:
+                                time.sleep(delay)
+                        self._write_line({"model": body.get("model"), "message": {"role": "assistant", "content": token}, "done": False})
+                    elapsed_ns = int((time.perf_counter() - start) * 1e9)
+                    prompt_chars = sum(len(m.get("content", "")) for m in messages)
+                    self._write_line({
+                        "model": body.get("model"),
+                        "message": {"role": "assistant", "content": ""},
+                        "done": True,
+                        "total_duration": elapsed_ns + load_ns,
+                        "load_duration": load_ns,
+                        "prompt_eval_count": prompt_chars // 4,
+                        "prompt_eval_duration": 0,
+                        "eval_count": len(tokens),
+                        "eval_duration": elapsed_ns,
+                    })
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client hung up early (e.g. it stopped at a tool call).
+                    self.close_connection = True
+
+            def _write_line(self, payload: dict):
+                data = json.dumps(payload).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
@@ -0,0 +1,78 @@
+# octo-cl/tests/test_batch.py
+
+import json
+import pytest
+from octo_cl.batch import BatchRunner, load_tasks
+from octo_cl.context_builder import ContextBuilder
+from octo_cl.llm_interface import OllamaClient
+from fake_ollama import FakeOllamaServer
+
+def docstring_agent(messages):
+    """Adds a docstring to the attached file, then stops."""
+    if messages[-1]["content"].startswith("Tool Result"):
+        return "Added the docstring."
+    prompt = next(m["content"] for m in reversed(messages) if m["content"].startswith("Add a docstring to "))
+    path = prompt.split("to ", 1)[1].split()[0]
+    return (
+        f'<tool_call:edit_file path="{path}">\n<<<<<<< SEARCH\ndef f():\n=======\n'
+        'def f():\n    """Does f."""\n>>>>>>> REPLACE\n</tool_call:edit_file>'
+    )
+
+def make_project(tmp_path, count=4):
+    for i in range(count):
+        (tmp_path / "src").mkdir(exist_ok=True)
+        (tmp_path / "src" / f"m{i}.py").write_text("def f():\n    return 1\n")
+    (tmp_path / "notes.txt").write_text("not python")
+    return ContextBuilder(str(tmp_path), use_cache=False)
+
+def test_load_tasks_from_glob_and_jsonl(tmp_path):
+    cb = make_project(tmp_path, count=2)
+    tasks = load_tasks("src/**/*.py", cb, "Add a docstring to {path}")
+    assert [t["id"] for t in tasks] == ["src/m0.py", "src/m1.py"]
+    assert tasks[0]["prompt"] == "Add a docstring to src/m0.py"
+    (tmp_path / "tasks.jsonl").write_text('{"prompt": "a"}\n\n{"id": "x", "prompt": "b"}\n')
+    assert [(t["id"], t["prompt"]) for t in load_tasks("tasks.jsonl", cb)] == [("1", "a"), ("x", "b")]
+    with pytest.raises(ValueError, match="not found: missing.jsonl"):
+        load_tasks("missing.jsonl", cb)
+
+def test_batch_runs_edits_and_resumes(tmp_path):
+    cb = make_project(tmp_path)
+    tasks = load_tasks("src/*.py", cb, "Add a docstring to {path}")
+    output = tmp_path / "out.jsonl"
+
+    with FakeOllamaServer(docstring_agent) as server:
+        runner = BatchRunner(lambda: OllamaClient(server.url), cb, concurrency=2, allowed_tools=["edit_file"])
+        summary = runner.run(tasks[:3], str(output))
+        assert summary["ok"] == 3 and summary["eval_tokens"] > 0
+        assert summary["tasks_per_min"] > 0
+
+        summary = runner.run(tasks, str(output))
+        assert (summary["skipped"], summary["ok"]) == (3, 1)
+        assert len(server.chat_requests()) == 8
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["id"] for r in results) == [f"src/m{i}.py" for i in range(4)]
+    assert all(r["status"] == "ok" and r["tool_calls"] == ["edit_file"] for r in results)
+    assert '"""Does f."""' in (tmp_path / "src" / "m3.py").read_text()
+
+def test_batch_denies_tools_not_allowed(tmp_path):
+    cb = make_project(tmp_path, count=1)
+    tasks = load_tasks("src/*.py", cb, "Add a docstring to {path}")
+    output = str(tmp_path / "out.jsonl")
+    with FakeOllamaServer(docstring_agent) as server:
+        summary = BatchRunner(lambda: OllamaClient(server.url), cb, max_turns=2).run(tasks, output)
+        assert summary["incomplete"] == 1
+        assert "Does f" not in (tmp_path / "src" / "m0.py").read_text()
+
+        # Tasks that ran out of turns are retried on resume.
+        summary = BatchRunner(lambda: OllamaClient(server.url), cb, allowed_tools=["edit_file"]).run(tasks, output)
+        assert (summary["skipped"], summary["ok"]) == (0, 1)
+
+def test_batch_records_connection_errors(tmp_path):
+    cb = make_project(tmp_path, count=1)
+    tasks = load_tasks("src/*.py", cb, "Add a docstring to {path}")
+    runner = BatchRunner(lambda: OllamaClient("http://127.0.0.1:9", max_retries=0), cb)
+    summary = runner.run(tasks, str(tmp_path / "out.jsonl"))
+    assert summary["error"] == 1
+    result = json.loads((tmp_path / "out.jsonl").read_text())
+    assert result["status"] == "error" and "Could not connect" in result["error"]
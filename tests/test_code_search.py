@@ -0,0 +1,72 @@
+# octo-cl/tests/test_code_search.py
+
+from octo_cl.code_search import CodeSearcher, compile_pattern, format_results
+from octo_cl.context_builder import ContextBuilder
+from octo_cl.tools import ToolRegistry
+
+def make_project(tmp_path):
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "core.py").write_text("import os\n\ndef load(path):\n    return open(path)\n\n\ndef save(path, data):\n    pass\n")
+    (tmp_path / "app.py").write_text("from pkg.core import load\nload('a.txt')\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "core.py").write_text("def load(): pass\n")
+    (tmp_path / "blob.bin").write_bytes(b"\0def load")
+    return ContextBuilder(str(tmp_path))
+
+def test_search_code_output(tmp_path):
+    cb = make_project(tmp_path)
+    result = cb.search_code(r"def \w+\(path", context_lines=1)
+    assert result == (
+        "pkg/core.py-2- \n"
+        "pkg/core.py:3: def load(path):\n"
+        "pkg/core.py-4-     return open(path)\n"
+        "--\n"
+        "pkg/core.py-6- \n"
+        "pkg/core.py:7: def save(path, data):\n"
+        "pkg/core.py-8-     pass"
+    )
+    # Ignored and binary files are never searched.
+    assert "build/" not in cb.search_code("load") and "blob.bin" not in cb.search_code("load")
+    assert cb.search_code("LOAD('", literal=True, ignore_case=True, context_lines=0) == "app.py:2: load('a.txt')"
+    assert cb.search_code("load", path="pkg", context_lines=0) == "pkg/core.py:3: def load(path):"
+
+def test_results_are_capped(tmp_path):
+    for i in range(5):
+        (tmp_path / f"f{i}.txt").write_text("hit\n" * 10)
+    result = ContextBuilder(str(tmp_path)).search_code("hit", context_lines=0, max_results=12)
+    lines = result.splitlines()
+    assert sum(1 for line in lines if line.endswith(": hit")) == 12
+    assert lines[-1].startswith("[Showing 12 of")
+
+def test_process_pool_matches_serial(tmp_path):
+    for i in range(40):
+        (tmp_path / f"m{i:02}.py").write_text("".join(f"value_{i}_{j} = {j}\n" for j in range(200)))
+    paths = sorted(p.name for p in tmp_path.iterdir())
+    regex = compile_pattern(r"value_\d+_1\d\b")
+    serial = CodeSearcher(tmp_path, workers=1).search(paths, regex, max_results=1000)
+    with CodeSearcher(tmp_path, workers=2, chunk_bytes=20000, parallel_min_bytes=0) as searcher:
+        parallel = searcher.search(paths, regex, max_results=1000)
+        early = searcher.search(paths, regex, max_results=15)
+    assert parallel == serial and len(serial) == 40
+    # Stopping early still returns the first matches in file order.
+    assert early == serial[:len(early)] and len(early) < len(serial)
+    assert format_results(early, 15).splitlines()[:15] == format_results(serial, 15).splitlines()[:15]
+
+def test_search_code_tool(tmp_path):
+    cb = make_project(tmp_path)
+    tools = ToolRegistry(root_dir=str(tmp_path), search_code=cb.search_code)
+    assert "pkg/core.py:3: def load(path):" in tools.execute("search_code", pattern="def load")
+    assert "invalid regex" in tools.execute("search_code", pattern="load(")
+    assert "app.py:2:" in tools.execute("search_code", pattern="load(", literal="true")
+    assert "No matches" in tools.execute("search_code", pattern="nothing_here")
+    assert "Access denied" in tools.execute("search_code", pattern="x", path="../")
+
+def test_anchored_patterns_match_every_line(tmp_path):
+    (tmp_path / "a.py").write_text("import os\n\ndef main():\n    pass\n")
+    (tmp_path / "b.py").write_bytes(b"x = 1\r\ndef run():\r\n    pass\r\n")
+    cb = ContextBuilder(str(tmp_path))
+    assert cb.search_code("^def main", context_lines=0) == "a.py:3: def main():"
+    assert cb.search_code(r"\):$", context_lines=0) == "a.py:3: def main():\n--\nb.py:2: def run():"
+    regex = compile_pattern("^    pass$")
+    assert [r[0] for r in CodeSearcher(tmp_path, workers=1).search(["a.py", "b.py"], regex, context_lines=0)] == ["a.py", "b.py"]
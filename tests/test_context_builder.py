@@ -42,3 +42,116 @@ def test_get_file_content_safety(tmp_path):
     content = cb.get_file_content("../outside.txt")
     
     assert "Error: Access denied" in content
+
+def test_nested_gitignore(tmp_path):
+    d = tmp_path / "project"
+    (d / "pkg" / "build").mkdir(parents=True)
+    (d / ".gitignore").write_text("*.log\n")
+    (d / "pkg" / ".gitignore").write_text("build/\n!keep.log\n")
+    (d / "pkg" / "build" / "out.o").write_text("")
+    (d / "pkg" / "keep.log").write_text("")
+    (d / "pkg" / "drop.log").write_text("")
+    (d / "top.log").write_text("")
+
+    tree = ContextBuilder(root_dir=str(d)).get_directory_tree()
+
+    assert "keep.log" in tree
+    assert "drop.log" not in tree
+    assert "top.log" not in tree
+    assert "build/" not in tree
+
+def test_tree_snapshot_warm_start(tmp_path):
+    d = tmp_path / "project"
+    (d / "a" / "b").mkdir(parents=True)
+    (d / "a" / "b" / "x.py").write_text("")
+
+    cold = ContextBuilder(root_dir=str(d))
+    cold_tree = cold.get_directory_tree()
+    assert (d / ".octo" / "tree_cache.json").exists()
+    assert ".octo" not in cold_tree
+
+    warm = ContextBuilder(root_dir=str(d))
+    assert warm.get_directory_tree() == cold_tree
+    assert warm.snapshot.stats["scanned"] == 0
+
+    (d / "a" / "b" / "y.py").write_text("")
+    os.utime(d / "a" / "b", ns=(1, 1))
+    tree = ContextBuilder(root_dir=str(d)).get_directory_tree()
+    assert "y.py" in tree
+    assert cold.list_files() == ["a/b/x.py"]
+
+def test_packed_tree_respects_budget(tmp_path):
+    from octo_cl.context_packer import estimate_tokens
+
+    d = tmp_path / "project"
+    (d / "src" / "gen").mkdir(parents=True)
+    (d / "src" / "main.py").write_text("")
+    for i in range(500):
+        (d / "src" / "gen" / f"model_{i}.py").write_text("")
+
+    cb = ContextBuilder(root_dir=str(d), tree_token_budget=200)
+    packed = cb.get_packed_tree()
+
+    assert estimate_tokens(packed) <= 200
+    # The large directory collapses into a one-line summary; its small sibling stays listed.
+    assert packed.splitlines() == ["  src/", "    main.py", "    gen/ (500 files)"]
+
+def test_packed_tree_folds_wide_root(tmp_path):
+    from octo_cl.context_packer import estimate_tokens
+
+    d = tmp_path / "project"
+    for i in range(600):
+        (d / f"service_{i:03}").mkdir(parents=True)
+        (d / f"service_{i:03}" / "app.py").write_text("")
+    (d / "auth").mkdir()
+    (d / "auth" / "login.py").write_text("")
+
+    cb = ContextBuilder(root_dir=str(d), tree_token_budget=200)
+    packed = cb.get_packed_tree(query="fix the auth login")
+
+    assert estimate_tokens(packed) <= 200
+    lines = packed.splitlines()
+    assert "  auth/ (1 files)" in lines
+    shown = sum(1 for line in lines if line.startswith("  service_"))
+    assert lines[-1] == f"  ... ({600 - shown} more dirs)"
+
+def test_packed_tree_small_project_unchanged(tmp_path):
+    d = tmp_path / "project"
+    d.mkdir()
+    (d / "a.py").write_text("")
+
+    cb = ContextBuilder(root_dir=str(d))
+    assert cb.get_packed_tree() == cb.get_directory_tree()
+    assert "a.py" in cb.build_system_prompt()
+
+def test_relevant_snippets(tmp_path):
+    d = tmp_path / "project"
+    d.mkdir()
+    (d / "parser.py").write_text("def parseToolCalls(text):\n    return []\n")
+    (d / "render.py").write_text("def draw_panel(console):\n    pass\n")
+    for i in range(20):
+        (d / f"filler{i}.py").write_text(f"value_{i} = compute_{i}(alpha, beta, gamma)\n")
+
+    cb = ContextBuilder(root_dir=str(d))
+    # The first query doesn't wait for the index; it is built in the background.
+    assert cb.get_relevant_snippets("where are tool calls parsed?", top_k=1) == ""
+    cb._index_thread.join()
+    snippets = cb.get_relevant_snippets("where are tool calls parsed?", top_k=1)
+
+    assert "--- SNIPPET: parser.py:1-2 ---" in snippets
+    assert "draw_panel" not in snippets
+    assert cb.get_relevant_snippets("where are tool calls parsed?", top_k=1, min_score=5.0) == ""
+    assert (d / ".octo" / "index.json").exists()
+
+    # A one-file change is appended to the journal rather than rewriting the index.
+    cb._index_thread.join()
+    index_json = (d / ".octo" / "index.json").read_bytes()
+    (d / "render.py").write_text("def draw_panel(console):\n    parse_tool_calls()\n")
+    os.utime(d / "render.py", ns=(1, 1))
+    assert cb.index.update(cb.list_files()) == 1
+    assert (d / ".octo" / "index.json").read_bytes() == index_json
+    assert (d / ".octo" / "index.log").exists()
+    fresh = ContextBuilder(root_dir=str(d))
+    assert "render.py:1-2" in fresh.get_relevant_snippets("draw panel tool calls", top_k=2, wait=True)
+    assert fresh.index.update(fresh.list_files()) == 0
+    assert cb.get_relevant_snippets("anything", top_k=0) == ""
@@ -0,0 +1,79 @@
+# octo-cl/tests/test_editing.py
+
+import pytest
+from octo_cl.editing import EditError, apply_edits, parse_edits
+from octo_cl.tools import ToolRegistry
+
+SOURCE = "def greet(name):\n    print('hi', name)\n\ndef leave():\n    print('bye')\n"
+
+def block(search, replace):
+    return f"<<<<<<< SEARCH\n{search}\n=======\n{replace}\n>>>>>>> REPLACE"
+
+def test_search_replace_exact():
+    edits = parse_edits(block("    print('bye')", "    print('goodbye')"))
+    assert apply_edits(SOURCE, edits) == SOURCE.replace("'bye'", "'goodbye'")
+
+def test_indentation_insensitive_anchor_reindents():
+    edits = parse_edits(block("print('hi', name)", "if name:\n    print('hi', name)"))
+    result = apply_edits(SOURCE, edits)
+    assert "    if name:\n        print('hi', name)\n" in result
+
+def test_fuzzy_anchor():
+    edits = parse_edits(block("def greet(nam):\n    print('hi', name)", "def greet(name, loud=False):\n    print('hi', name)"))
+    assert apply_edits(SOURCE, edits).startswith("def greet(name, loud=False):\n")
+
+def test_unified_diff():
+    diff = (
+        "--- a/x.py\n+++ b/x.py\n"
+        "@@ -4,2 +4,2 @@\n"
+        " def leave():\n"
+        "-    print('bye')\n"
+        "+    print('see you')\n"
+    )
+    assert apply_edits(SOURCE, parse_edits(diff)).endswith("    print('see you')\n")
+
+def test_deleting_lines_removes_their_line_breaks():
+    text = "import os\nimport sys\n\nx = 1\n"
+    expected = "import os\n\nx = 1\n"
+    assert apply_edits(text, parse_edits(block("import sys", ""))) == expected
+    assert apply_edits(text, parse_edits("@@ -1,3 +1,2 @@\n import os\n-import sys\n \n")) == expected
+    assert apply_edits("a\nb", parse_edits(block("b", ""))) == "a"
+
+def test_insert_only_hunks():
+    text = "a\nb\nc\n"
+    assert apply_edits(text, parse_edits("@@ -2,0 +3,1 @@\n+x")) == "a\nb\nx\nc\n"
+    assert apply_edits(text, parse_edits("@@ -0,0 +1,1 @@\n+top")) == "top\na\nb\nc\n"
+    # Line numbers refer to the original file, before the first hunk's insertion.
+    diff = "@@ -1,0 +2,2 @@\n+x\n+y\n@@ -3,0 +6,1 @@\n+end"
+    assert apply_edits(text, parse_edits(diff)) == "a\nx\ny\nb\nc\nend\n"
+    with pytest.raises(EditError, match="inserts at line 6"):
+        apply_edits(text, parse_edits("@@ -5,0 +6,1 @@\n+x"))
+
+def test_removed_lines_that_look_like_file_headers():
+    text = "SELECT 1;\n-- old comment\n---\nkey: v\n"
+    diff = "--- a/q.sql\n+++ b/q.sql\n@@ -1,4 +1,2 @@\n SELECT 1;\n--- old comment\n----\n key: v"
+    assert apply_edits(text, parse_edits(diff)) == "SELECT 1;\nkey: v\n"
+    # A second file's headers still end the previous hunk.
+    assert len(parse_edits(diff + "\n--- a/r.sql\n+++ b/r.sql\n@@ -1 +1 @@\n-x\n+y")) == 2
+
+def test_mismatch_reports_closest_lines():
+    edits = parse_edits(block("class Totally:\n    unrelated = True", "x"))
+    with pytest.raises(EditError, match="not found"):
+        apply_edits(SOURCE, edits)
+
+def test_ambiguous_match():
+    with pytest.raises(EditError, match="matches 2 places"):
+        apply_edits(SOURCE, parse_edits(block("print(", "echo(")))
+
+def test_edit_file_tool(tmp_path):
+    (tmp_path / "m.py").write_bytes(SOURCE.replace("\n", "\r\n").encode())
+    tr = ToolRegistry(root_dir=str(tmp_path))
+
+    result = tr.edit_file(path="m.py", content=block("    print('bye')", "    print('ciao')"))
+    assert result == "Successfully edited m.py: applied 1 edit(s)."
+    assert (tmp_path / "m.py").read_bytes() == SOURCE.replace("'bye'", "'ciao'").replace("\n", "\r\n").encode()
+    assert list(tmp_path.iterdir()) == [tmp_path / "m.py"]
+
+    failed = tr.edit_file(path="m.py", content=block("nope", "x"))
+    assert "No changes were written" in failed
+    assert "Use write_file" in tr.edit_file(path="missing.py", content=block("a", "b"))
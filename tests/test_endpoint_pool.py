@@ -0,0 +1,57 @@
+# octo-cl/tests/test_endpoint_pool.py
+
+from octo_cl.endpoint_pool import EndpointPool, parse_endpoints
+from octo_cl.llm_interface import ERROR_PREFIX
+from fake_ollama import FakeOllamaServer
+
+MODEL = "qwen2.5-coder:7b"
+HI = [{"role": "user", "content": "hi"}]
+
+def test_parse_endpoints():
+    assert parse_endpoints("http://a:1, http://b:2/ http://c:3") == ["http://a:1", "http://b:2", "http://c:3"]
+
+def test_sessions_spread_and_stick():
+    with FakeOllamaServer("from a") as a, FakeOllamaServer("from b") as b:
+        with EndpointPool([a.url, b.url], MODEL, check_interval=0) as pool:
+            first, second = pool.session(), pool.session()
+            replies = ["".join(first.chat(HI)) for _ in range(3)]
+            other = "".join(second.chat(HI))
+            assert len(set(replies)) == 1 and other != replies[0]
+            assert first.last_stats["endpoint"] == first.endpoint.url
+            first.close()
+            assert sum(e["sessions"] for e in pool.status()) == 1
+
+def test_routes_to_least_outstanding_and_skips_missing_model():
+    with FakeOllamaServer("a") as a, FakeOllamaServer("b") as b, FakeOllamaServer("c", models=["llama3.1:8b"]) as c:
+        pool = EndpointPool([a.url, b.url, c.url], MODEL, check_interval=0)
+        pool.check()
+        busy = pool.endpoints[0]
+        pool.begin_request(busy)
+        pool.begin_request(busy)
+        assert "".join(pool.session().chat(HI)) == "b"
+        pool.end_request(busy)
+        pool.end_request(busy)
+        assert "".join(pool.session().chat(HI)) == "a"
+        assert not c.chat_requests()
+        pool.close()
+
+def test_fails_over_on_connection_error():
+    a, b = FakeOllamaServer("from a").start(), FakeOllamaServer("from b").start()
+    with b, EndpointPool([a.url, b.url], MODEL, check_interval=0) as pool:
+        session = pool.session()
+        assert "".join(session.chat(HI)) == "from a"
+        a.stop()
+        assert "".join(session.chat(HI)) == "from b"
+        assert session.endpoint.url == b.url
+        assert [e["healthy"] for e in pool.status()] == [False, True]
+        pool.check()
+        assert [e["healthy"] for e in pool.status()] == [False, True]
+
+def test_reports_when_no_endpoint_is_usable():
+    with FakeOllamaServer(models=["other:latest"]) as a:
+        pool = EndpointPool([a.url, "http://127.0.0.1:9"], MODEL, check_interval=0)
+        session = pool.session()
+        assert session.preflight() == (True, False)
+        reply = "".join(session.chat(HI))
+        assert reply.startswith(ERROR_PREFIX) and "No reachable Ollama endpoint" in reply
+        pool.close()
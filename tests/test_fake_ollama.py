@@ -0,0 +1,44 @@
+# octo-cl/tests/test_fake_ollama.py
+
+import io
+from rich.console import Console
+import octo_cl.main as octo_main
+from octo_cl.llm_interface import OllamaClient
+from octo_cl.telemetry import SessionTelemetry
+from octo_cl.tools import ToolRegistry
+from fake_ollama import FakeOllamaServer
+
+def test_fake_server_preflight_and_stream():
+    with FakeOllamaServer("one two three", models=["qwen2.5-coder:7b"]) as server:
+        with OllamaClient(server.url, "qwen2.5-coder") as client:
+            assert client.preflight() == (True, True)
+            chunks = list(client.chat([{"role": "user", "content": "hi"}]))
+
+    assert "".join(chunks) == "one two three"
+    assert client.last_stats["eval_count"] == 3
+    assert server.chat_requests()[0]["body"]["messages"][0]["content"] == "hi"
+
+def test_fake_server_drives_tool_loop(tmp_path, monkeypatch):
+    (tmp_path / "app.py").write_text("answer = 42\n")
+
+    def respond(messages):
+        if messages[-1]["content"].startswith("Tool Result"):
+            return "Done."
+        return 'Reading.\n<tool_call:read_file path="app.py" />'
+
+    monkeypatch.setattr(octo_main, "console", Console(file=io.StringIO()))
+    telemetry = SessionTelemetry()
+    messages = [{"role": "user", "content": "What is in app.py?"}]
+    with FakeOllamaServer(respond) as server, OllamaClient(server.url) as client:
+        octo_main.process_ai_response(client, messages, ToolRegistry(root_dir=str(tmp_path)), plain=True, telemetry=telemetry)
+
+    assert len(server.chat_requests()) == 2
+    assert "answer = 42" in messages[2]["content"]
+    assert messages[-1] == {"role": "assistant", "content": "Done."}
+    assert telemetry.summary()["turns"] == 2
+
+def test_warm_up_takes_the_model_load():
+    with FakeOllamaServer("hi", load_seconds=0.05) as server, OllamaClient(server.url) as client:
+        assert client.warm_up()["load_duration"] >= 50_000_000
+        "".join(client.chat([{"role": "user", "content": "hello"}]))
+    assert client.last_stats["load_duration"] == 0
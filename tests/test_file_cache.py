@@ -0,0 +1,55 @@
+# octo-cl/tests/test_file_cache.py
+
+import pytest
+from octo_cl.file_cache import BinaryFileError, FileCache
+
+def test_cache_hits_until_file_changes(tmp_path):
+    f = tmp_path / "a.py"
+    f.write_text("one\n")
+    cache = FileCache()
+
+    assert cache.read_text(f) == "one\n"
+    assert cache.read_text(f) == "one\n"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    f.write_text("two!\n")
+    assert cache.read_text(f) == "two!\n"
+    assert cache.misses == 2
+
+def test_eviction_is_bounded_by_bytes(tmp_path):
+    cache = FileCache(max_bytes=250, max_entry_bytes=100)
+    for i in range(5):
+        (tmp_path / f"{i}.txt").write_text("x" * 100)
+        cache.read_text(tmp_path / f"{i}.txt")
+
+    assert cache._size <= 250
+    assert len(cache._entries) == 2
+
+@pytest.mark.parametrize("max_entry_bytes", [None, 10])
+def test_read_lines(tmp_path, max_entry_bytes):
+    f = tmp_path / "lines.txt"
+    f.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    # max_entry_bytes=10 forces the uncached, mmap-backed path.
+    cache = FileCache(max_entry_bytes=max_entry_bytes, mmap_threshold=0)
+
+    assert cache.read_lines(f, 2, 3) == ("line 2\nline 3\n", 100)
+    assert cache.read_lines(f, 99) == ("line 99\nline 100\n", 100)
+    assert cache.read_lines(f, 200, 300) == ("", 100)
+
+def test_binary_files_are_rejected(tmp_path):
+    f = tmp_path / "image.png"
+    f.write_bytes(b"\x89PNG\0\0\0")
+    with pytest.raises(BinaryFileError):
+        FileCache().read_text(f)
+    with pytest.raises(BinaryFileError):
+        FileCache(mmap_threshold=0).read_text(f)
+
+def test_read_head(tmp_path):
+    f = tmp_path / "big.txt"
+    f.write_text("".join(f"line {i}\n" for i in range(1, 101)) + "last")
+    cache = FileCache()
+
+    assert cache.read_head(f, 20) == ("line 1\nline 2\n", 101)
+    assert cache.read_head(f, 10000) == (f.read_text(), 101)
+    # The head is decoded straight from the file and never cached.
+    assert cache.misses == 0 and not cache._entries
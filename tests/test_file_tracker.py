@@ -0,0 +1,55 @@
+# octo-cl/tests/test_file_tracker.py
+
+import os
+from octo_cl.file_cache import FileCache
+from octo_cl.file_tracker import FileTracker
+from octo_cl.tools import ToolRegistry
+
+def bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+def test_poll_sends_diffs_of_external_changes(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("".join(f"line {i}\n" for i in range(20)))
+    tools = ToolRegistry(root_dir=str(tmp_path), file_cache=FileCache())
+    tools.read_file(path="app.py")
+    assert tools.file_tracker.poll() == ""
+
+    bump_mtime(path)
+    assert tools.file_tracker.poll() == ""  # touched but unchanged
+
+    path.write_text(path.read_text().replace("line 10\n", "line ten\n"))
+    bump_mtime(path)
+    changes = tools.file_tracker.poll()
+    assert "--- a/app.py\n+++ b/app.py\n@@ -9,5 +9,5 @@" in changes
+    assert "-line 10\n+line ten" in changes and "line 3" not in changes
+    assert tools.file_tracker.poll() == ""  # the new version is now the one the model has
+
+    path.unlink()
+    assert tools.file_tracker.poll().endswith("app.py was deleted.")
+    assert tools.file_tracker.files == {}
+
+def test_own_writes_are_not_reported(tmp_path):
+    tools = ToolRegistry(root_dir=str(tmp_path), file_cache=FileCache())
+    tools.write_file(path="a.py", content="x = 1\n")
+    tools.edit_file(path="a.py", content="<<<<<<< SEARCH\nx = 1\n=======\nx = 2\n>>>>>>> REPLACE\n")
+    assert "a.py" in tools.file_tracker.files
+    assert tools.file_tracker.poll() == ""
+
+    tools.run_shell(command="echo 'y = 3' >> a.py")
+    assert "+y = 3" in tools.file_tracker.poll()
+
+def test_large_changes_and_untracked_files(tmp_path):
+    (tmp_path / "big.txt").write_text("a\n" * 10)
+    (tmp_path / "other.txt").write_text("b\n")
+    tracker = FileTracker(tmp_path, FileCache(), max_diff_lines=20)
+    tracker.record("big.txt")
+    tracker.record("../outside.txt")
+    (tmp_path / "big.txt").write_text("c\n" * 50)
+    (tmp_path / "other.txt").write_text("changed\n")
+    assert tracker.poll() == (
+        "Files you have seen changed on disk since you last read them:\n"
+        "big.txt changed substantially (63 diff lines); read it again before relying on it."
+    )
+    assert tracker.files == {}
@@ -0,0 +1,65 @@
+# octo-cl/tests/test_history.py
+
+from octo_cl.history import HistoryManager, SUMMARY_PREFIX
+
+def make_session(turns):
+    messages = [{"role": "system", "content": "You are octo-cl."}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i}"})
+        messages.append({"role": "assistant", "content": f'Reading.\n<tool_call:read_file path="f{i}.py" />'})
+        messages.append({"role": "user", "content": "Tool Result (read_file):\n" + "x = 1\n" * 300})
+    return messages
+
+def test_under_budget_is_untouched():
+    messages = make_session(1)
+    snapshot = [dict(m) for m in messages]
+    assert HistoryManager(token_budget=100000).compact(messages) is None
+    assert messages == snapshot
+
+def test_old_tool_results_are_elided():
+    messages = make_session(3)
+    history = HistoryManager(token_budget=1000, keep_recent=3, target_ratio=1.0, max_message_chars=200)
+    before, after = history.compact(messages)
+
+    assert after < before
+    assert "characters elided" in messages[3]["content"]
+    assert "characters elided" not in messages[-1]["content"]
+
+def test_older_turns_are_summarized():
+    messages = make_session(10)
+    system = messages[0]["content"]
+    history = HistoryManager(token_budget=3000, keep_recent=3)
+    _, after = history.compact(messages)
+
+    assert after <= 3000
+    assert messages[0]["content"] == system
+    assert messages[1]["content"].startswith(SUMMARY_PREFIX)
+    assert 'read_file(path="f0.py")' in messages[1]["content"]
+    assert len(messages) == 5
+
+def test_large_recent_result_is_cut_and_summary_stays_stable():
+    messages = make_session(10)
+    messages.append({"role": "user", "content": "Tool Result (read_file):\n" + "y = 2\n" * 10000})
+    history = HistoryManager(token_budget=3000, keep_recent=3)
+    _, after = history.compact(messages)
+
+    assert after <= 3000 * 0.6
+    assert "characters elided" in messages[-1]["content"]
+    summary = messages[1]["content"]
+
+    # The next turns fit again, so the summary (and the cached prompt prefix) is left alone.
+    messages.append({"role": "assistant", "content": "Done."})
+    messages.append({"role": "user", "content": "thanks"})
+    assert history.compact(messages) is None
+    assert messages[1]["content"] == summary
+
+def test_summary_is_not_rewritten_without_new_older_turns():
+    messages = make_session(10)
+    history = HistoryManager(token_budget=3000, keep_recent=3)
+    history.compact(messages)
+    summary = messages[1]["content"]
+    messages[-1] = {"role": "user", "content": "Tool Result (read_file):\n" + "z = 3\n" * 10000}
+
+    history.compact(messages)
+    assert messages[1]["content"] == summary
+    assert len(messages) == 5
@@ -0,0 +1,82 @@
+# octo-cl/tests/test_llm_interface.py
+
+import asyncio
+import json
+import httpx
+from octo_cl.llm_interface import AsyncOllamaClient, OllamaClient
+
+TAGS = {"models": [{"name": "qwen2.5-coder:7b"}, {"name": "llama3.1:latest"}]}
+
+def chat_body(*parts):
+    lines = [json.dumps({"message": {"content": p}, "done": False}) for p in parts]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True, "eval_count": len(parts), "eval_duration": 1000}))
+    return "\n".join(lines)
+
+def make_transport(requests, fail_first=0):
+    def handler(request):
+        requests.append(request.url.path)
+        if len(requests) <= fail_first:
+            return httpx.Response(503)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json=TAGS)
+        return httpx.Response(200, text=chat_body("Hello", " world"))
+    return handler
+
+def test_preflight_uses_single_request():
+    requests = []
+    client = OllamaClient(model="llama3.1", transport=httpx.MockTransport(make_transport(requests)))
+    assert client.preflight() == (True, True)
+    assert requests == ["/api/tags"]
+
+def test_preflight_missing_model():
+    client = OllamaClient(model="mistral", transport=httpx.MockTransport(make_transport([])))
+    assert client.preflight() == (True, False)
+
+def test_unreachable_server():
+    def refuse(request):
+        raise httpx.ConnectError("refused")
+    client = OllamaClient(transport=httpx.MockTransport(refuse), max_retries=1, backoff=0)
+    assert client.preflight() == (False, False)
+    assert "Could not connect" in "".join(client.chat([]))
+
+def test_chat_retries_transient_errors():
+    requests = []
+    client = OllamaClient(transport=httpx.MockTransport(make_transport(requests, fail_first=2)), backoff=0)
+    assert "".join(client.chat([{"role": "user", "content": "hi"}])) == "Hello world"
+    assert requests == ["/api/chat"] * 3
+
+def test_async_client():
+    async def run():
+        transport = httpx.MockTransport(make_transport([]))
+        async with AsyncOllamaClient(model="qwen2.5-coder:7b", transport=transport) as client:
+            ready = await client.preflight()
+            chunks = [c async for c in client.chat([])]
+        return ready, chunks
+    ready, chunks = asyncio.run(run())
+    assert ready == (True, True)
+    assert "".join(chunks) == "Hello world"
+
+def test_chat_records_stream_stats():
+    client = OllamaClient(transport=httpx.MockTransport(make_transport([])))
+    "".join(client.chat([]))
+    assert client.last_stats["eval_count"] == 2
+    assert client.last_stats["eval_duration"] == 1000
+    assert 0 <= client.last_stats["ttft_s"] <= client.last_stats["wall_s"]
+
+def test_model_options_sent_with_every_request():
+    bodies = []
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        if bodies[-1]["messages"]:
+            return httpx.Response(200, text=chat_body("ok"))
+        return httpx.Response(200, json={"done": True, "done_reason": "load", "load_duration": 5_000_000})
+    client = OllamaClient(transport=httpx.MockTransport(handler), keep_alive="30m", options={"num_ctx": 8192})
+    assert client.warm_up()["load_duration"] == 5_000_000
+    "".join(client.chat([{"role": "user", "content": "hi"}]))
+    assert [(b["keep_alive"], b["options"], b["stream"]) for b in bodies] == [("30m", {"num_ctx": 8192}, False), ("30m", {"num_ctx": 8192}, True)]
+    assert bodies[0]["messages"] == []
+
+def test_warm_up_failure_is_quiet():
+    client = OllamaClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    assert client.warm_up() is None
+    assert "keep_alive" not in client._chat_payload([]) and "options" not in client._chat_payload([])
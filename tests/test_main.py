@@ -1,5 +1,6 @@
 # octo-cl/tests/test_main.py
 
+import threading
 import pytest
 from octo_cl.main import parse_tool_calls
 
@@ -22,12 +23,9 @@ def test_parse_content_tool_call():
 
 def test_parse_multiple_tool_calls():
     text = (
-        'Let me check the files first.
-'
-        '<tool_call:list_files path="src" />
-'
-        'Now I will write a new file.
-'
+        'Let me check the files first.\n'
+        '<tool_call:list_files path="src" />\n'
+        'Now I will write a new file.\n'
         '<tool_call:write_file path="src/new.py">print("new")</tool_call:write_file>'
     )
     calls = parse_tool_calls(text)
@@ -45,3 +43,92 @@ def test_parse_with_unmatched_tags():
     text = "An incomplete tag <tool_call:read_file"
     calls = parse_tool_calls(text)
     assert len(calls) == 0
+
+class FakeClient:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def chat(self, messages):
+        yield from self.responses.pop(0)
+
+def test_read_only_tool_runs_during_stream(tmp_path):
+    from octo_cl.main import process_ai_response
+    from octo_cl.tools import ToolRegistry
+
+    (tmp_path / "notes.txt").write_text("remember the milk")
+    tools = ToolRegistry(root_dir=str(tmp_path))
+    started = threading.Event()
+    execute = tools.execute
+    tools.execute = lambda name, **params: started.set() or execute(name, **params)
+
+    def first_response():
+        yield '<tool_call:read_file path="notes.txt" />'
+        # The read starts while the model is still talking.
+        assert started.wait(timeout=5)
+        yield ' Waiting for the result.'
+
+    client = FakeClient([first_response(), iter(["All done."])])
+    messages = [{"role": "user", "content": "read notes"}]
+    process_ai_response(client, messages, tools)
+
+    assert messages[2]['content'] == "Tool Result (read_file):\nremember the milk"
+    assert messages[-1] == {"role": "assistant", "content": "All done."}
+
+def test_stop_on_tool_call_closes_stream(tmp_path):
+    from octo_cl.main import process_ai_response
+    from octo_cl.tools import ToolRegistry
+
+    (tmp_path / "a.txt").write_text("A")
+    closed = []
+
+    def chatty_response():
+        try:
+            yield 'Checking. <tool_call:read_file path="a.txt" /> The file'
+            yield ' says B.'
+            raise AssertionError("generation continued after the tool call")
+        finally:
+            closed.append(True)
+
+    client = FakeClient([chatty_response(), iter(["It says A."])])
+    messages = []
+    process_ai_response(client, messages, ToolRegistry(root_dir=str(tmp_path)), stop_on_tool_call=True)
+
+    assert closed == [True]
+    assert messages[0]['content'] == 'Checking. <tool_call:read_file path="a.txt" />'
+    assert messages[1]['content'] == "Tool Result (read_file):\nA"
+
+def test_parse_edit_file_call():
+    text = (
+        'Fixing the typo.\n'
+        '<tool_call:edit_file path="a.py">\n'
+        '<<<<<<< SEARCH\nprnt(1)\n=======\nprint(1)\n>>>>>>> REPLACE\n'
+        '</tool_call:edit_file>'
+    )
+    calls = parse_tool_calls(text)
+
+    assert len(calls) == 1
+    assert calls[0]['name'] == 'edit_file'
+    assert calls[0]['params']['path'] == 'a.py'
+    assert '>>>>>>> REPLACE' in calls[0]['params']['content']
+
+def test_heavy_imports_are_deferred(tmp_path):
+    import os
+    import subprocess
+    import sys
+    code = (
+        "import sys, octo_cl.main\n"
+        "heavy = {'httpx', 'rich.markdown', 'rich.live', 'rich.table', 'dotenv', 'multiprocessing'}\n"
+        "print(sorted(heavy & set(sys.modules)))"
+    )
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=repo_root)
+    # Run outside the repo so a developer's .env doesn't pull in python-dotenv.
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_model_options_from_flags():
+    from octo_cl.main import model_options
+    options = model_options(num_ctx=8192, pairs=["temperature=0.2", "seed=42", "stop=[\"</tool_call\"]", "mirostat = off"])
+    assert options == {"num_ctx": 8192, "temperature": 0.2, "seed": 42, "stop": ["</tool_call"], "mirostat": "off"}
+    with pytest.raises(Exception):
+        model_options(pairs=["temperature"])
@@ -0,0 +1,40 @@
+# octo-cl/tests/test_renderer.py
+
+import io
+from rich.console import Console
+from octo_cl.renderer import StreamRenderer
+
+TEXT = "Intro paragraph.\n\n```python\ndef f():\n\n    return 1\n```\nAfter the code.\n\nTail"
+
+def make_console():
+    return Console(file=io.StringIO(), width=80, force_terminal=False)
+
+def test_blocks_freeze_outside_fences():
+    renderer = StreamRenderer(make_console(), min_interval=0, max_pending_chars=1)
+    frozen = []
+    with renderer:
+        for char in TEXT:
+            renderer.feed(char)
+            frozen.append(renderer.text[:renderer._frozen_upto])
+
+    boundaries = sorted(set(frozen))
+    assert "Intro paragraph.\n\n" in boundaries
+    # The blank line inside the code block must not end a block.
+    assert not any(b.endswith("def f():\n\n") for b in boundaries)
+    assert "```python\ndef f():\n\n    return 1\n```\n" in boundaries[-1]
+
+def test_final_output_contains_everything():
+    console = make_console()
+    with StreamRenderer(console) as renderer:
+        for i in range(0, len(TEXT), 3):
+            renderer.feed(TEXT[i:i + 3])
+    output = console.file.getvalue()
+    for fragment in ["Intro paragraph.", "return 1", "After the code.", "Tail"]:
+        assert fragment in output
+
+def test_plain_mode_writes_raw_chunks():
+    console = make_console()
+    with StreamRenderer(console, plain=True) as renderer:
+        renderer.feed("**not** ")
+        renderer.feed("rendered")
+    assert console.file.getvalue() == "**not** rendered\n"
@@ -0,0 +1,108 @@
+# octo-cl/tests/test_repo_map.py
+
+import os
+from octo_cl.context_builder import ContextBuilder
+from octo_cl.repo_map import RepoMap, python_symbols
+from octo_cl.tools import ToolRegistry
+
+def test_python_symbols():
+    source = (
+        "MAX_SIZE = 10\n"
+        "class Cache(Base):\n"
+        "    def get(self, key: str) -> int:\n"
+        "        pass\n"
+        "async def fetch(url, *, timeout=5):\n"
+        "    pass\n"
+    )
+    assert [(s[0], s[2], s[4]) for s in python_symbols(source)] == [
+        ("constant", "MAX_SIZE", 0),
+        ("class", "class Cache(Base)", 0),
+        ("function", "def get(key: str) -> int", 1),
+        ("function", "async def fetch(url, *, timeout=5)", 0),
+    ]
+
+def make_project(tmp_path):
+    (tmp_path / "core.py").write_text("class Engine:\n    def run(self):\n        pass\n\ndef helper():\n    pass\n")
+    (tmp_path / "app.py").write_text("from core import Engine\nEngine().run()\nEngine().run()\n")
+    (tmp_path / "broken.py").write_text("def ok(x):\n    return (\n")
+    (tmp_path / "web.ts").write_text("export class Widget {\n}\nexport function renderWidget(w: Widget) {\n}\n")
+    return ContextBuilder(str(tmp_path))
+
+def test_map_ranks_by_references_and_fits_budget(tmp_path):
+    cb = make_project(tmp_path)
+    full = cb.get_repo_map(token_budget=1000)
+    assert "core.py:\n  class Engine\n    def run()" in full
+    assert "def ok(x):" in full  # regex fallback for a file that doesn't parse
+    assert "export class Widget" in full and "export function renderWidget(w: Widget)" in full
+
+    small = cb.get_repo_map(token_budget=12)
+    assert "class Engine" in small and "helper" not in small
+    assert cb.get_repo_map(query="render", token_budget=20).startswith("web.ts:\n  export function renderWidget")
+    assert cb.get_repo_map(path="web.ts").startswith("web.ts:")
+
+def test_map_cache_reparses_only_changed_files(tmp_path):
+    cb = make_project(tmp_path)
+    cb.get_repo_map()
+    assert cb.repo_map.parsed == 4
+
+    warm = ContextBuilder(str(tmp_path))
+    warm.get_repo_map()
+    assert warm.repo_map.parsed == 0
+
+    core = tmp_path / "core.py"
+    os.utime(core, ns=(core.stat().st_atime_ns, core.stat().st_mtime_ns + 10**9))
+    warm.get_repo_map()
+    assert warm.repo_map.parsed == 0  # same content, so the hash check skips the parse
+
+    core.write_text(core.read_text() + "\ndef added():\n    pass\n")
+    assert "def added()" in warm.get_repo_map()
+    assert warm.repo_map.parsed == 1
+
+def test_repo_map_tool(tmp_path):
+    cb = make_project(tmp_path)
+    tools = ToolRegistry(root_dir=str(tmp_path), repo_map=cb.get_repo_map)
+    assert "class Engine" in tools.execute("repo_map", path="core.py")
+    assert "No classes or functions" in tools.execute("repo_map", path="missing")
+    assert "repo_map" not in ToolRegistry(root_dir=str(tmp_path)).tools
+
+def test_system_prompt_includes_map(tmp_path):
+    cb = make_project(tmp_path)
+    # The first prompt doesn't wait for the map; it is built in the background and included once ready.
+    assert "Repository Map" not in cb.build_system_prompt()
+    cb._map_thread.join()
+    assert cb.repo_map_ready
+    assert "Repository Map" in cb.build_system_prompt()
+    assert "Repository Map" in make_project(tmp_path).build_system_prompt(wait_for_map=True)
+    no_map = ContextBuilder(str(tmp_path), map_token_budget=0)
+    assert "Repository Map" not in no_map.build_system_prompt(wait_for_map=True)
+    assert no_map._map_thread is None
+
+def test_reference_counts_exclude_definitions(tmp_path):
+    make_project(tmp_path)
+    repo_map = RepoMap(tmp_path)
+    repo_map.update(["core.py", "app.py"])
+    refs = repo_map.reference_counts()
+    assert refs["Engine"] == 3 and refs["helper"] == 0
+    # Only names defined in the project are counted and cached.
+    assert repo_map.files["app.py"]["refs"] == {"Engine": 3, "run": 2}
+
+def test_new_definitions_are_counted_in_unchanged_files(tmp_path):
+    make_project(tmp_path)
+    (tmp_path / "main.py").write_text("from core import start\nstart()\nstart()\n")
+    repo_map = RepoMap(tmp_path)
+    repo_map.update(["core.py", "app.py", "main.py"])
+    assert repo_map.reference_counts()["start"] == 0
+
+    (tmp_path / "core.py").write_text("def start():\n    pass\n")
+    repo_map.update(["core.py", "app.py", "main.py"])
+    assert repo_map.files["main.py"]["refs"]["start"] == 3
+    assert repo_map.reference_counts()["start"] == 3
+
+def test_render_fills_the_budget_past_a_symbol_that_does_not_fit(tmp_path):
+    (tmp_path / "a.py").write_text(
+        "def long_function_name(alpha, beta, gamma, delta, epsilon, zeta):\n    pass\n\n"
+        "def b():\n    pass\n\nlong_function_name()\n"
+    )
+    repo_map = RepoMap(tmp_path)
+    repo_map.update(["a.py"])
+    assert repo_map.render(token_budget=10) == "a.py:\n  def b()"
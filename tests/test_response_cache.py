@@ -0,0 +1,60 @@
+# octo-cl/tests/test_response_cache.py
+
+import os
+from octo_cl.llm_interface import OllamaClient
+from octo_cl.response_cache import ResponseCache, cache_key, is_deterministic
+from fake_ollama import FakeOllamaServer
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+def test_key_covers_model_options_and_messages():
+    base = cache_key("m", {"seed": 1}, MESSAGES)
+    assert base == cache_key("m", {"seed": 1}, [dict(MESSAGES[0])])
+    assert base != cache_key("m2", {"seed": 1}, MESSAGES)
+    assert base != cache_key("m", {"seed": 2}, MESSAGES)
+    assert base != cache_key("m", {"seed": 1}, MESSAGES + [{"role": "user", "content": "more"}])
+
+def test_is_deterministic():
+    assert is_deterministic({"temperature": 0})
+    assert is_deterministic({"seed": 42, "temperature": 0.7})
+    assert not is_deterministic({})
+    assert not is_deterministic({"temperature": 0.2})
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=400)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, ["x" * 80])
+        os.utime(tmp_path / f"{key}.json", (i, i))
+    assert cache.get("a") == ["x" * 80]  # touching "a" makes "b" the oldest
+    cache.put("d", ["x" * 80])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert cache.evictions >= 1
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+def test_client_replays_cached_stream(tmp_path):
+    cache = ResponseCache(tmp_path)
+    with FakeOllamaServer("one two three") as server:
+        with OllamaClient(server.url, options={"temperature": 0}, response_cache=cache) as client:
+            first = list(client.chat(MESSAGES))
+            second = list(client.chat(MESSAGES))
+            assert client.last_stats["cache_hit"] and "eval_count" not in client.last_stats
+        assert len(server.chat_requests()) == 1
+    assert first == second and "".join(second) == "one two three"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_client_skips_cache_when_sampling_is_random(tmp_path):
+    cache = ResponseCache(tmp_path)
+    with FakeOllamaServer("one two") as server, OllamaClient(server.url, response_cache=cache) as client:
+        list(client.chat(MESSAGES))
+        list(client.chat(MESSAGES))
+        assert len(server.chat_requests()) == 2
+    assert cache.stats()["misses"] == 0 and not list(tmp_path.iterdir())
+
+def test_interrupted_stream_is_not_cached(tmp_path):
+    cache = ResponseCache(tmp_path)
+    with FakeOllamaServer("one two three") as server, OllamaClient(server.url, options={"seed": 7}, response_cache=cache) as client:
+        stream = client.chat(MESSAGES)
+        next(stream)
+        stream.close()
+    assert cache.stores == 0
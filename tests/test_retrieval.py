@@ -0,0 +1,49 @@
+# octo-cl/tests/test_retrieval.py
+
+from octo_cl.retrieval import RetrievalIndex, tokenize
+
+def test_tokenize_splits_identifiers():
+    tokens = tokenize("def getDirectoryTree(root_dir): pass")
+    assert "getdirectorytree" in tokens
+    assert "directory" in tokens
+    assert "root_dir" in tokens
+    assert "root" in tokens
+
+def test_search_ranks_matching_chunk(tmp_path):
+    (tmp_path / "a.py").write_text("\n".join(f"x{i} = {i}" for i in range(100)) + "\nretry_backoff = 2\n")
+    (tmp_path / "b.bin").write_bytes(b"\0retry_backoff")
+
+    index = RetrievalIndex(tmp_path, chunk_lines=40)
+    index.update(["a.py", "b.bin"])
+    results = index.search("retry backoff")
+
+    assert len(results) == 1
+    _, path, start, end = results[0]
+    assert (path, start, end) == ("a.py", 81, 101)
+    assert "retry_backoff" in index.snippet(path, start, end)
+
+def test_search_does_not_wait_for_an_update(tmp_path):
+    import threading
+
+    (tmp_path / "a.py").write_text("def retry_backoff():\n    pass\n")
+    index = RetrievalIndex(tmp_path)
+    index.update(["a.py"])
+    before = index.search("retry backoff")
+    assert 0 < before[0][0] <= 2  # at most 1 per query term
+
+    # A search during a slow re-index answers from the index as it was.
+    indexing, release = threading.Event(), threading.Event()
+    index_file = index._index_file
+    def slow_index_file(*args):
+        indexing.set()
+        release.wait(5)
+        return index_file(*args)
+    index._index_file = slow_index_file
+    (tmp_path / "b.py").write_text("retry_backoff = 2\n")
+    updater = threading.Thread(target=index.update, args=(["a.py", "b.py"],))
+    updater.start()
+    assert indexing.wait(5)
+    assert index.search("retry backoff") == before
+    release.set()
+    updater.join()
+    assert {path for _, path, _, _ in index.search("retry backoff")} == {"a.py", "b.py"}
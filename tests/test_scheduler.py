@@ -0,0 +1,41 @@
+# octo-cl/tests/test_scheduler.py
+
+import threading
+from octo_cl.scheduler import ToolScheduler
+from octo_cl.tools import ToolRegistry
+
+def call(name, **params):
+    return {"name": name, "params": params}
+
+def test_read_only_calls_run_concurrently(tmp_path):
+    tr = ToolRegistry(root_dir=str(tmp_path))
+    # Both reads must be in flight at the same time to get past the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+    tr.tools["read_file"] = lambda path: f"{path}:{barrier.wait()}"
+
+    with ToolScheduler(tr) as scheduler:
+        results = scheduler.run([call("read_file", path="a"), call("read_file", path="b")])
+
+    assert [obs.split(":")[0] for _, obs in results] == ["a", "b"]
+
+def test_writes_are_barriers(tmp_path):
+    (tmp_path / "f.txt").write_text("old")
+    tr = ToolRegistry(root_dir=str(tmp_path))
+    calls = [
+        call("read_file", path="f.txt"),
+        call("write_file", path="f.txt", content="new"),
+        call("read_file", path="f.txt"),
+    ]
+
+    with ToolScheduler(tr) as scheduler:
+        results = scheduler.run(calls)
+
+    assert [obs for _, obs in results] == ["old", "Successfully wrote to f.txt.", "new"]
+
+def test_denied_calls(tmp_path):
+    tr = ToolRegistry(root_dir=str(tmp_path))
+    with ToolScheduler(tr) as scheduler:
+        results = scheduler.run([call("write_file", path="x", content="y")], confirm=lambda c: False)
+
+    assert results[0][1] is None
+    assert not (tmp_path / "x").exists()
@@ -0,0 +1,32 @@
+# octo-cl/tests/test_telemetry.py
+
+import json
+from octo_cl.telemetry import SessionTelemetry
+
+DONE = {
+    "prompt_eval_count": 200,
+    "prompt_eval_duration": 500_000_000,
+    "eval_count": 50,
+    "eval_duration": 2_000_000_000,
+    "load_duration": 1_000_000_000,
+    "ttft_s": 0.6,
+    "wall_s": 2.7,
+}
+
+def test_summary_and_trace(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    telemetry = SessionTelemetry(model="m", trace_path=str(trace))
+    telemetry.record_turn(DONE, render_s=0.1, parse_s=0.01, tools=[{"tool": "read_file", "seconds": 0.2}])
+    telemetry.record_turn({**DONE, "load_duration": 0, "ttft_s": 0.2}, tools=[{"tool": "read_file", "seconds": 0.3}])
+
+    stats = telemetry.summary()
+    assert stats["turns"] == 2
+    assert stats["prompt_tokens_per_s"] == 400.0
+    assert stats["eval_tokens_per_s"] == 25.0
+    assert stats["load_s"] == 1.0
+    assert abs(stats["avg_ttft_s"] - 0.4) < 1e-9
+    assert abs(stats["tool_s"]["read_file"] - 0.5) < 1e-9
+
+    records = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert [r["turn"] for r in records] == [1, 2]
+    assert records[0]["eval_count"] == 50
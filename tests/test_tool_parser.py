@@ -0,0 +1,43 @@
+# octo-cl/tests/test_tool_parser.py
+
+from octo_cl.tool_parser import StreamingToolParser
+
+RESPONSE = (
+    'First I will look around. <tool_call:list_files path="src" />\n'
+    'Then write: <tool_call:write_file path="a.py">x = "<b>"\n</tool_call:write_file>\n'
+    'And run <tool_call:run_shell command="ls > out.txt" /> done.'
+)
+
+def test_calls_complete_as_soon_as_closed():
+    parser = StreamingToolParser()
+    completed_at = []
+    for i, char in enumerate(RESPONSE):
+        for call in parser.feed(char):
+            completed_at.append((call['name'], i))
+
+    names = [name for name, _ in completed_at]
+    assert names == ['list_files', 'write_file', 'run_shell']
+    # list_files is available right at its closing "/>", long before the stream ends.
+    assert completed_at[0][1] == RESPONSE.index('/>') + 1
+
+def test_streamed_params_and_content():
+    parser = StreamingToolParser()
+    for start in range(0, len(RESPONSE), 7):
+        parser.feed(RESPONSE[start:start + 7])
+
+    list_call, write_call, shell_call = parser.calls
+    assert list_call['params'] == {'path': 'src'}
+    assert write_call['params'] == {'path': 'a.py', 'content': 'x = "<b>"\n'}
+    assert shell_call['params'] == {'command': 'ls > out.txt'}
+    assert write_call['full_match'].startswith('<tool_call:write_file')
+
+def test_incomplete_call_is_not_emitted():
+    parser = StreamingToolParser()
+    assert parser.feed('<tool_call:read_file path="a.py"') == []
+    assert parser.feed(' and <tool_call: nonsense') == []
+
+def test_call_end_offsets():
+    parser = StreamingToolParser()
+    parser.feed(RESPONSE)
+    for call in parser.calls:
+        assert RESPONSE[:call['end']].endswith(call['full_match'])
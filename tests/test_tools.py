@@ -1,6 +1,7 @@
 # octo-cl/tests/test_tools.py
 
 import os
+import time
 from octo_cl.tools import ToolRegistry
 
 def test_read_write_file(tmp_path):
@@ -33,3 +34,36 @@ def test_list_files(tmp_path):
     result = tr.list_files(path=".")
     assert "a.py" in result
     assert "b.txt" in result
+
+def test_run_shell_output_is_bounded(tmp_path):
+    tr = ToolRegistry(root_dir=str(tmp_path), max_output_lines=10)
+    result = tr.run_shell(command="seq 1 1000")
+
+    assert "Exit Code: 0" in result
+    lines = result.split("Output:\n", 1)[1].splitlines()
+    assert lines[:2] == ["1", "2"]
+    assert lines[-1] == "1000"
+    assert "[... 990 lines" in result
+
+def test_run_shell_timeout_kills_process_group(tmp_path):
+    progress = []
+    tr = ToolRegistry(root_dir=str(tmp_path), shell_timeout=0.5, progress=progress.append)
+    start = time.monotonic()
+    result = tr.run_shell(command="echo started; sleep 30 & sleep 30")
+
+    assert time.monotonic() - start < 10
+    assert "started" in result
+    assert "Timed out after 0.5s" in result
+    assert progress[-1] is None
+    assert any("sleep 30" in p for p in progress[:-1])
+
+def test_read_file_line_range_and_caps(tmp_path):
+    tr = ToolRegistry(root_dir=str(tmp_path), max_read_bytes=50)
+    (tmp_path / "big.py").write_text("".join(f"x{i} = {i}\n" for i in range(1, 101)))
+    (tmp_path / "blob.bin").write_bytes(b"\0\1\2")
+
+    assert tr.read_file(path="big.py", start_line="3", end_line="4") == "[big.py: lines 3-4 of 100]\nx3 = 3\nx4 = 4\n"
+    truncated = tr.read_file(path="big.py")
+    assert truncated.startswith("x1 = 1\n")
+    assert "[Truncated: showing lines 1-7 of 100." in truncated
+    assert "binary file" in tr.read_file(path="blob.bin")